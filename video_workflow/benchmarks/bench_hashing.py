@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Hashing Benchmark for Automated Video Workflow
+
+Compares the original upload-tab hashing (4 KB MD5 reads, one file at a
+time) against the hash service (large aligned reads or mmap, parallel
+files) and its tree hash for a single large file.
+
+Usage:
+    python benchmarks/bench_hashing.py --files 8 --size-mb 256
+    python benchmarks/bench_hashing.py --dir /path/to/MASTER
+
+Note that repeated runs over the same generated files are served from the
+page cache; use --dir on real media (or drop caches) for cold-read numbers.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from hash_service import HashService
+
+
+def legacy_hash(file_path):
+    """The original UploadTab.calculate_file_hash implementation."""
+    md5_hash = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(4096), b""):
+            md5_hash.update(chunk)
+    return md5_hash.hexdigest()
+
+
+def create_files(directory, count, size_mb):
+    """Create random test files."""
+    paths = []
+    block = os.urandom(1024 * 1024)
+    for i in range(count):
+        path = os.path.join(directory, f"clip_{i:03d}.mov")
+        with open(path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+        paths.append(path)
+    return paths
+
+
+def timed(label, total_bytes, func):
+    """Run func, print its throughput and return its result."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.2f}s  {total_bytes / elapsed / (1024 * 1024):9.1f} MB/s")
+    return result
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark file hashing")
+    parser.add_argument("--dir", help="Hash the video files in this directory instead of generated files")
+    parser.add_argument("--files", type=int, default=8, help="Number of generated files")
+    parser.add_argument("--size-mb", type=int, default=128, help="Size of each generated file in MB")
+    parser.add_argument("--workers", type=int, default=None, help="Hash service threads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if args.dir:
+            paths = [str(p) for p in Path(args.dir).rglob("*") if p.is_file()]
+        else:
+            print(f"Creating {args.files} files of {args.size_mb} MB...")
+            paths = create_files(temp_dir, args.files, args.size_mb)
+
+        total_bytes = sum(os.path.getsize(p) for p in paths)
+        print(f"Hashing {len(paths)} files, {total_bytes / (1024 * 1024):.0f} MB total\n")
+
+        expected = timed("legacy (4 KB reads, sequential)", total_bytes,
+                         lambda: {p: legacy_hash(p) for p in paths})
+
+        for use_mmap in (False, True):
+            service = HashService(max_workers=args.workers, use_mmap=use_mmap)
+            label = f"service ({'mmap' if use_mmap else '8 MB reads'}, {service.max_workers} threads)"
+            results = timed(label, total_bytes, lambda: service.hash_files(paths, ("md5",)))
+            assert all(results[p]["md5"] == expected[p] for p in paths), "digest mismatch"
+            service.close()
+
+        largest = max(paths, key=os.path.getsize)
+        service = HashService(max_workers=args.workers)
+        timed("sha256 single file, sequential", os.path.getsize(largest),
+              lambda: service.hash_file(largest, ("sha256",)))
+        timed("sha256 tree hash, 64 MB chunks", os.path.getsize(largest),
+              lambda: service.tree_hash(largest))
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
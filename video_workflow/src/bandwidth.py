@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Bandwidth Scheduler for Automated Video Workflow
+
+Shapes upload traffic with token buckets: one global bucket and one per
+upload host. The allowed rate follows time-of-day windows (for example
+full speed overnight and 20% during working hours) and can be changed
+while transfers are running; waiting senders pick up a new rate at once.
+A rate of 0 pauses uploads until the rate changes.
+"""
+
+import time
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+# Bytes per megabit, for converting configured Mbit/s to bytes per second
+MBIT = 1000 * 1000 / 8
+
+# Request bodies are released to the socket in slices of this size
+SLICE_SIZE = 256 * 1024
+
+# How often the time-of-day windows are re-evaluated, in seconds
+WINDOW_CHECK_INTERVAL = 5.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens are bytes. A consumer may take more than is available and run
+    the bucket into debt; later consumers wait until the debt is repaid,
+    so the long-run rate is exact regardless of request size.
+    """
+
+    def __init__(self, rate=None, burst=None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate (float, optional): Bytes per second. None means unlimited, 0 paused.
+            burst (int, optional): Maximum saved-up bytes. Defaults to a quarter
+                                   second of traffic (at least one slice).
+        """
+        self.cond = threading.Condition()
+        self.rate = None
+        self.burst = 0
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.set_rate(rate, burst)
+
+    def _refill(self, now):
+        """Add the tokens earned since the last update."""
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate, burst=None):
+        """
+        Change the rate, waking any waiting consumers.
+
+        Args:
+            rate (float): Bytes per second. None means unlimited, 0 paused.
+            burst (int, optional): Maximum saved-up bytes
+        """
+        with self.cond:
+            self._refill(time.monotonic())
+            self.rate = float(rate) if rate is not None else None
+            if burst is not None:
+                self.burst = burst
+            elif self.rate:
+                self.burst = max(SLICE_SIZE, int(self.rate / 4))
+            self.tokens = min(self.tokens, self.burst)
+            self.cond.notify_all()
+
+    def consume(self, count, timeout=None):
+        """
+        Take count bytes from the bucket, blocking until the rate allows it.
+
+        Args:
+            count (int): Number of bytes about to be sent
+            timeout (float, optional): Seconds to wait while the bucket is
+                                       paused; None waits until it resumes
+
+        Returns:
+            bool: True if the bytes were taken, False if still paused after timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.rate is None or (self.rate > 0 and self.tokens >= 0):
+                    break
+                if self.rate == 0:
+                    # Paused until the rate changes
+                    if deadline is None:
+                        self.cond.wait()
+                    elif now >= deadline:
+                        return False
+                    else:
+                        self.cond.wait(deadline - now)
+                else:
+                    # Wake up when the debt is repaid, or earlier if the rate changes
+                    self.cond.wait(-self.tokens / self.rate)
+            if self.rate is not None:
+                self.tokens -= count
+        return True
+
+
+class TimeWindow:
+    """A daily time range with its own bandwidth share."""
+
+    def __init__(self, start, end, percent=100, mbit=None, name=None):
+        """
+        Initialize the window.
+
+        Args:
+            start (str): Start time as HH:MM
+            end (str): End time as HH:MM. A window ending before it starts
+                       spans midnight.
+            percent (float, optional): Share of the configured limit allowed; 0 pauses
+            mbit (float, optional): Absolute limit in Mbit/s, overriding percent; 0 pauses
+            name (str, optional): Label used in status messages
+        """
+        self.start = self._parse(start)
+        self.end = self._parse(end)
+        self.percent = float(percent)
+        self.mbit = float(mbit) if mbit is not None else None
+        self.name = name or f"{start}-{end}"
+
+    @staticmethod
+    def _parse(value):
+        """Convert HH:MM to minutes after midnight."""
+        hours, minutes = str(value).split(":")
+        return int(hours) * 60 + int(minutes)
+
+    @classmethod
+    def from_dict(cls, settings):
+        """Create a window from a configuration entry."""
+        return cls(settings["start"], settings["end"], settings.get("percent", 100),
+                   settings.get("mbit"), settings.get("name"))
+
+    def contains(self, moment):
+        """Check whether a datetime falls inside the window."""
+        minute = moment.hour * 60 + moment.minute
+        if self.start <= self.end:
+            return self.start <= minute < self.end
+        return minute >= self.start or minute < self.end
+
+
+class ThrottledBody:
+    """
+    Request body that is released to the socket at the scheduler's pace.
+
+    http.client sends iterable bodies piece by piece, so the transfer is
+    shaped while it is in progress. Iterating again (after a retry)
+    starts over from the beginning.
+    """
+
+    def __init__(self, data, throttle, slice_size=SLICE_SIZE):
+        """
+        Initialize the body.
+
+        Args:
+            data (bytes): Full request body
+            throttle (callable): Called with each slice's size before it is sent
+            slice_size (int, optional): Bytes per slice
+        """
+        self.data = data
+        self.throttle = throttle
+        self.slice_size = slice_size
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        view = memoryview(self.data)
+        for offset in range(0, len(view), self.slice_size):
+            piece = view[offset:offset + self.slice_size]
+            self.throttle(len(piece))
+            yield piece
+
+
+class BandwidthScheduler:
+    """Global and per-host upload rate limits that follow a daily schedule."""
+
+    def __init__(self, settings=None, logger=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            settings (dict, optional): The 'upload.bandwidth' configuration section
+            logger: Logger instance for logging events
+        """
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.global_bucket = TokenBucket()
+        self.host_buckets = {}
+
+        self.limit_mbit = 0
+        self.host_limits_mbit = {}
+        self.windows = []
+        self.override_percent = None
+        self.active_window = None
+        self.last_check = 0.0
+
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        """
+        Apply new bandwidth settings. Running transfers adapt immediately.
+
+        Args:
+            settings (dict): Bandwidth settings with 'limit_mbit', 'host_limits_mbit'
+                             and 'schedule' entries
+        """
+        windows = []
+        for entry in settings.get("schedule", []):
+            try:
+                windows.append(TimeWindow.from_dict(entry))
+            except (KeyError, ValueError) as e:
+                if self.logger:
+                    self.logger.warning(f"Ignoring invalid bandwidth window {entry}: {e}")
+
+        with self.lock:
+            self.limit_mbit = float(settings.get("limit_mbit") or 0)
+            self.host_limits_mbit = {
+                host.lower(): float(mbit)
+                for host, mbit in settings.get("host_limits_mbit", {}).items()
+            }
+            self.windows = windows
+            self._apply()
+
+    def set_override(self, percent):
+        """
+        Replace the schedule with a fixed share of the limit.
+
+        Args:
+            percent (float): Share of the limit, 0 to pause, or None to follow the schedule again
+        """
+        with self.lock:
+            self.override_percent = percent
+            self._apply()
+
+    def _current_window(self, moment=None):
+        """Find the schedule window in effect, if any."""
+        moment = moment or datetime.now()
+        for window in self.windows:
+            if window.contains(moment):
+                return window
+        return None
+
+    def _scaled(self, limit_mbit, window):
+        """
+        Apply the override or window to a limit.
+
+        Returns:
+            float: Bytes per second; None for unlimited, 0 for paused
+        """
+        if self.override_percent is not None:
+            if self.override_percent <= 0:
+                return 0.0
+            return limit_mbit * self.override_percent / 100 * MBIT if limit_mbit else None
+        if window is not None and window.mbit is not None:
+            mbit = min(window.mbit, limit_mbit) if limit_mbit else window.mbit
+            return mbit * MBIT
+        if window is not None and window.percent <= 0:
+            return 0.0
+        if window is not None and limit_mbit:
+            return limit_mbit * window.percent / 100 * MBIT
+        return limit_mbit * MBIT if limit_mbit else None
+
+    def _apply(self):
+        """Recompute and set every bucket's rate. Caller holds the lock."""
+        window = self._current_window()
+        if window is not self.active_window and self.logger:
+            self.logger.info(f"Upload bandwidth window: {window.name if window else 'none'}")
+        self.active_window = window
+        self.last_check = time.monotonic()
+
+        self.global_bucket.set_rate(self._scaled(self.limit_mbit, window))
+        for host, bucket in self.host_buckets.items():
+            bucket.set_rate(self._scaled(self.host_limits_mbit.get(host, 0), window))
+
+    def _bucket_for(self, host):
+        """Get the bucket for an upload host, creating it on first use."""
+        with self.lock:
+            # Re-evaluate the schedule now and then so long runs cross windows
+            if time.monotonic() - self.last_check >= WINDOW_CHECK_INTERVAL:
+                self._apply()
+            bucket = self.host_buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self._scaled(self.host_limits_mbit.get(host, 0),
+                                                  self.active_window))
+                self.host_buckets[host] = bucket
+            return bucket
+
+    def throttle(self, endpoint, count):
+        """
+        Block until count bytes may be sent to an endpoint.
+
+        Args:
+            endpoint (str): Upload API URL
+            count (int): Number of bytes about to be sent
+        """
+        host = (urlsplit(endpoint).hostname or endpoint).lower()
+        # While paused, look at the schedule now and then so a new window resumes sending
+        while not self._bucket_for(host).consume(count, WINDOW_CHECK_INTERVAL):
+            pass
+        while not self.global_bucket.consume(count, WINDOW_CHECK_INTERVAL):
+            self._bucket_for(host)
+
+    def wrap(self, endpoint, data):
+        """
+        Wrap a request body so it is sent at the scheduled rate.
+
+        Args:
+            endpoint (str): Upload API URL
+            data (bytes): Request body
+
+        Returns:
+            ThrottledBody: Body to pass to the connection
+        """
+        return ThrottledBody(data, lambda count: self.throttle(endpoint, count))
+
+    def describe(self):
+        """Human-readable description of the current global limit."""
+        with self.lock:
+            rate = self.global_bucket.rate
+            if self.override_percent is not None:
+                source = f"manual {self.override_percent:g}%"
+            elif self.active_window is not None:
+                source = f"window {self.active_window.name}"
+            else:
+                source = "default"
+        if rate is None:
+            return f"unlimited ({source})"
+        if rate == 0:
+            return f"paused ({source})"
+        return f"{rate / MBIT:.0f} Mbit/s ({source})"
+
+
+# Process-wide shared scheduler
+_shared_scheduler = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_bandwidth_scheduler(config=None, logger=None):
+    """
+    Get the shared bandwidth scheduler, creating it on first use.
+
+    Each call given a config applies its bandwidth settings, so edits to
+    the config file reach running and later uploads without a restart.
+
+    Args:
+        config (dict, optional): Configuration dictionary with an optional
+                                 'upload.bandwidth' section
+        logger: Logger instance for logging events
+
+    Returns:
+        BandwidthScheduler: The shared scheduler
+    """
+    global _shared_scheduler
+    settings = (config or {}).get("upload", {}).get("bandwidth", {})
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = BandwidthScheduler(settings, logger)
+        elif config is not None:
+            _shared_scheduler.configure(settings)
+        return _shared_scheduler
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Bulk I/O for Automated Video Workflow
+
+Page-cache-friendly file copying for imports and export moves. Copying
+hundreds of gigabytes through ordinary reads and writes pushes
+everything else out of the page cache, including the media an editor
+has open, and lets the destination fragment as it grows.
+
+The "io" section of the configuration selects how copies behave:
+
+- mode "cached": plain reads and writes; the kernel caches everything
+- mode "streaming": the source is read with POSIX_FADV_SEQUENTIAL, and
+  every flush_interval_mb the written range is flushed and both ranges
+  are dropped from the cache with POSIX_FADV_DONTNEED
+- mode "direct": as streaming, but the source is read with O_DIRECT into
+  page-aligned buffers, bypassing the cache entirely; falls back to
+  streaming where the filesystem refuses O_DIRECT
+- preallocate: reserve each destination's full size with posix_fallocate
+  before writing, so it is laid out contiguously
+- durability "none": leave writeback to the kernel; "file": fsync each
+  file as it completes; "batch": fsync completed files together once
+  batch_mb of them have accumulated and at the end of each job
+
+The advice calls exist only on some platforms; elsewhere every mode
+behaves like "cached".
+"""
+
+import os
+import mmap
+import threading
+
+MODES = ("cached", "streaming", "direct")
+DURABILITY_LEVELS = ("none", "file", "batch")
+
+# O_DIRECT needs buffers, offsets and sizes aligned to the device block
+DIRECT_ALIGNMENT = 4096
+
+HAVE_FADVISE = hasattr(os, "posix_fadvise")
+HAVE_FALLOCATE = hasattr(os, "posix_fallocate")
+HAVE_DIRECT = hasattr(os, "O_DIRECT")
+
+
+class IOSettings:
+    """How bulk copies read, write and sync."""
+
+    def __init__(self, mode="cached", durability="none", flush_interval_mb=64,
+                 batch_mb=1024, preallocate=False):
+        """
+        Initialize the settings.
+
+        Args:
+            mode (str, optional): One of MODES
+            durability (str, optional): One of DURABILITY_LEVELS
+            flush_interval_mb (int, optional): Bytes written between cache drops, in MB
+            batch_mb (int, optional): Completed bytes per batched fsync, in MB
+            preallocate (bool, optional): Reserve destination space before writing
+
+        Raises:
+            ValueError: If mode or durability is unknown
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown I/O mode: {mode}")
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown durability level: {durability}")
+        self.mode = mode
+        self.durability = durability
+        self.flush_interval = max(1, flush_interval_mb) * 1024 * 1024
+        self.batch_bytes = max(1, batch_mb) * 1024 * 1024
+        self.preallocate = preallocate
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build settings from the "io" section of the configuration.
+
+        Args:
+            config (Mapping): Configuration snapshot
+
+        Returns:
+            IOSettings: The configured settings
+        """
+        settings = config.get('io') or {}
+        return cls(
+            mode=settings.get('mode', 'cached'),
+            durability=settings.get('durability', 'none'),
+            flush_interval_mb=settings.get('flush_interval_mb', 64),
+            batch_mb=settings.get('batch_mb', 1024),
+            preallocate=settings.get('preallocate', False)
+        )
+
+    @property
+    def drop_cache(self):
+        """Whether copied ranges are dropped from the page cache."""
+        return self.mode != "cached" and HAVE_FADVISE
+
+    def __repr__(self):
+        return (f"IOSettings(mode={self.mode!r}, durability={self.durability!r}, "
+                f"preallocate={self.preallocate})")
+
+
+def _fadvise(fd, offset, length, advice):
+    """posix_fadvise, ignoring filesystems that reject the advice."""
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+
+class SyncBatch:
+    """Completed files waiting for a shared fsync ("batch" durability)."""
+
+    def __init__(self, settings):
+        """
+        Args:
+            settings (IOSettings): Supplies the batch size
+        """
+        self.settings = settings
+        self.lock = threading.Lock()
+        self.paths = []
+        self.pending = 0
+
+    def add(self, path, size):
+        """Queue a completed file; syncs the batch once it is large enough. Thread-safe."""
+        with self.lock:
+            self.paths.append(path)
+            self.pending += size
+            full = self.pending >= self.settings.batch_bytes
+        if full:
+            self.flush()
+
+    def flush(self):
+        """fsync every queued file."""
+        with self.lock:
+            paths, self.paths, self.pending = self.paths, [], 0
+        for path in paths:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+
+class SourceReader:
+    """Reads a file front to back under the configured I/O mode."""
+
+    def __init__(self, path, settings, chunk_size):
+        """
+        Open the file.
+
+        Args:
+            path (str): File to read
+            settings (IOSettings): I/O mode
+            chunk_size (int): Bytes per read; a multiple of DIRECT_ALIGNMENT in direct mode
+        """
+        self.settings = settings
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.dropped = 0
+        self.buffer = None
+        self.file = None
+
+        if settings.mode == "direct" and HAVE_DIRECT and chunk_size % DIRECT_ALIGNMENT == 0:
+            try:
+                self.file = open(path, 'rb', buffering=0,
+                                 opener=lambda name, flags: os.open(name, flags | os.O_DIRECT))
+                # Anonymous maps are page aligned
+                self.buffer = mmap.mmap(-1, chunk_size)
+            except OSError:
+                # e.g. tmpfs; read through the cache and drop it instead
+                self.file = None
+        if self.file is None:
+            self.file = open(path, 'rb')
+            if settings.drop_cache:
+                _fadvise(self.file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+    def read(self):
+        """
+        Read the next chunk.
+
+        Returns:
+            bytes: The data; empty at the end of the file
+        """
+        if self.buffer is not None:
+            count = self.file.readinto(self.buffer)
+            chunk = self.buffer[:count]
+        else:
+            chunk = self.file.read(self.chunk_size)
+        self.offset += len(chunk)
+
+        if self.buffer is None and self.settings.drop_cache and self.offset - self.dropped >= self.settings.flush_interval:
+            _fadvise(self.file.fileno(), self.dropped, self.offset - self.dropped, os.POSIX_FADV_DONTNEED)
+            self.dropped = self.offset
+        return chunk
+
+    def close(self):
+        """Close the file, dropping what is left of it from the cache."""
+        if self.buffer is None and self.settings.drop_cache:
+            _fadvise(self.file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        self.file.close()
+        if self.buffer is not None:
+            self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TargetFile:
+    """Writes a new file under the configured I/O mode and durability."""
+
+    def __init__(self, path, settings, size=None, sync=None):
+        """
+        Create the file.
+
+        Args:
+            path (str): File to write
+            settings (IOSettings): I/O mode and durability
+            size (int, optional): Expected final size, for preallocation
+            sync (SyncBatch, optional): Batch for "batch" durability; without
+                                        one the file is synced on close
+        """
+        self.path = path
+        self.settings = settings
+        self.sync = sync
+        self.written = 0
+        self.flushed = 0
+        self.preallocated = False
+        self.file = open(path, 'wb')
+
+        if settings.preallocate and size and HAVE_FALLOCATE:
+            try:
+                os.posix_fallocate(self.file.fileno(), 0, size)
+                self.preallocated = True
+            except OSError:
+                # Not supported by this filesystem
+                pass
+
+    def write(self, chunk):
+        """Append a chunk."""
+        self.file.write(chunk)
+        self.written += len(chunk)
+        if self.settings.drop_cache and self.written - self.flushed >= self.settings.flush_interval:
+            self._drop()
+
+    def _drop(self):
+        """Write the pending range back and drop it from the cache."""
+        self.file.flush()
+        fd = self.file.fileno()
+        # Dirty pages can't be dropped until they have been written
+        os.fdatasync(fd)
+        _fadvise(fd, self.flushed, self.written - self.flushed, os.POSIX_FADV_DONTNEED)
+        self.flushed = self.written
+
+    def close(self):
+        """Finish the file: trim preallocation, sync per durability and close."""
+        durability = self.settings.durability
+        try:
+            self.file.flush()
+            fd = self.file.fileno()
+            if self.preallocated:
+                # Preallocation sets the size up front; the source may have been shorter
+                os.ftruncate(fd, self.written)
+
+            if durability == "file" or (durability == "batch" and self.sync is None):
+                os.fsync(fd)
+            if self.settings.drop_cache and self.written > self.flushed:
+                self._drop()
+        finally:
+            self.file.close()
+        if durability == "batch" and self.sync is not None:
+            self.sync.add(self.path, self.written)
+
+    def abort(self):
+        """Discard the partial file without syncing it."""
+        try:
+            if self.preallocated:
+                # Never leave the preallocated size behind, even if the remove fails
+                os.ftruncate(self.file.fileno(), self.written)
+        except OSError:
+            pass
+        finally:
+            self.file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def copy_data(source, destination, settings, sync=None, chunk_size=8 * 1024 * 1024):
+    """
+    Copy a file's contents under the configured I/O mode.
+
+    Args:
+        source (str): File to copy
+        destination (str): New file
+        settings (IOSettings): I/O mode and durability
+        sync (SyncBatch, optional): Batch for "batch" durability
+        chunk_size (int, optional): Bytes per read
+
+    Returns:
+        int: Bytes copied
+    """
+    target = TargetFile(destination, settings, os.path.getsize(source), sync)
+    try:
+        with SourceReader(source, settings, chunk_size) as reader:
+            while True:
+                chunk = reader.read()
+                if not chunk:
+                    break
+                target.write(chunk)
+    except BaseException:
+        target.abort()
+        raise
+    target.close()
+    return target.written
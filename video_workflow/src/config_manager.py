@@ -3,11 +3,90 @@
 Configuration Manager for Automated Video Workflow
 
 Handles loading, validating, and providing access to configuration settings.
+
+get_config_manager() returns one process-wide manager. It parses
+config.json once and hands out read-only snapshots, which can be shared
+between threads without copying. Updates are written atomically
+(temporary file, then rename) and pushed to subscribers, and edits made
+to the file by other programs are picked up by a polling watcher.
 """
 
 import os
 import json
+import logging
+import tempfile
+import threading
 from pathlib import Path
+from types import MappingProxyType
+
+# Project root (the directory containing config/ and src/)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Seconds between checks of config.json for external edits
+WATCH_INTERVAL = 1.0
+
+logger = logging.getLogger("video_workflow.config")
+
+
+def freeze(value):
+    """
+    Make a read-only copy of parsed JSON.
+
+    Dicts become read-only mappings and lists become tuples, so a snapshot
+    can be shared between threads and never changes under its reader.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Make a plain, mutable copy of a snapshot, e.g. to edit or serialize it."""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def merge_config(base, changes):
+    """
+    Merge changes into a plain configuration dict in place.
+
+    Nested sections are merged rather than replaced, so settings a caller
+    does not know about (e.g. upload tuning) are kept.
+    """
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            merge_config(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def get_state_dir(config=None, name=None):
+    """
+    Get the directory for persistent application state.
+
+    Args:
+        config (dict, optional): Configuration dictionary. A relative
+                                 'state_dir' is resolved against the project root.
+        name (str, optional): Subdirectory for a specific component
+
+    Returns:
+        Path: The state directory, created if it doesn't exist
+    """
+    state_dir = (config or {}).get('state_dir') or 'state'
+    state_path = Path(state_dir)
+    if not state_path.is_absolute():
+        state_path = PROJECT_ROOT / state_path
+    if name:
+        state_path = state_path / name
+    os.makedirs(state_path, exist_ok=True)
+    return state_path
+
 
 class ConfigManager:
     """Manages configuration for the video workflow application."""
@@ -20,7 +99,13 @@ class ConfigManager:
             config_path (str, optional): Path to the config file. 
                                          Defaults to '../config/config.json'.
         """
-        self.config = {}
+        self.config = freeze({})
+        self.lock = threading.RLock()
+        self.subscribers = []
+        self.file_state = None
+        self.bad_file_state = None
+        self.watch_thread = None
+        self.stop_event = threading.Event()
         
         # Set default config path if not provided
         if config_path is None:
@@ -39,18 +124,48 @@ class ConfigManager:
         try:
             if self.config_path.exists():
                 with open(self.config_path, 'r') as f:
-                    self.config = json.load(f)
+                    self.config = freeze(json.load(f))
+                self.file_state = self._stat_file()
             else:
                 # Create default config if file doesn't exist
                 self._create_default_config()
         except Exception as e:
             raise Exception(f"Failed to load configuration: {e}")
     
+    def _stat_file(self):
+        """Get (mtime, size) of the config file, or None if it is missing."""
+        try:
+            stat_result = os.stat(self.config_path)
+        except OSError:
+            return None
+        return (stat_result.st_mtime_ns, stat_result.st_size)
+    
+    def _write_file(self, config):
+        """Write config atomically: readers see either the old or the new file."""
+        os.makedirs(self.config_path.parent, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(
+            prefix='.config-', suffix='.tmp', dir=self.config_path.parent
+        )
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(config, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self.file_state = self._stat_file()
+    
     def _create_default_config(self):
         """Create a default configuration file."""
         default_config = {
             "raw_path": "",
             "master_path": "",
+            "backup_paths": [],
             "ssd_name": "",
             "video_extensions": [".mp4", ".mov"],
             "create_proxies": False,
@@ -60,29 +175,93 @@ class ConfigManager:
                 "crf": 23
             },
             "davinci_template_path": "",
+            "state_dir": "state",
+            "hashing": {
+                "workers": 4,
+                "buffer_size_mb": 8,
+                "use_mmap": True
+            },
+            "pipeline": {
+                "verify_copies": True,
+                "proxy_workers": 1,
+                "stream_proxies": True,
+                "queue_size": 4
+            },
+            "io": {
+                "mode": "streaming",
+                "durability": "batch",
+                "flush_interval_mb": 64,
+                "batch_mb": 1024,
+                "preallocate": True
+            },
+            "tuning": {
+                "enabled": True,
+                "probe_mb": 16,
+                "max_workers": 4,
+                "min_chunk_kb": 256,
+                "max_chunk_mb": 16,
+                "window_seconds": 2
+            },
+            "telemetry": {
+                "interval_seconds": 1,
+                "history": 300,
+                "bottleneck_utilisation": 90
+            },
+            "metrics": {
+                "enabled": False,
+                "host": "127.0.0.1",
+                "port": 9464
+            },
+            "upload": {
+                "chunk_size_mb": 8,
+                "max_connections": 4,
+                "max_chunks_per_file": 4,
+                "max_concurrent_files": 2,
+                "timeout_seconds": 60,
+                "max_retries": 5,
+                "bandwidth": {
+                    "limit_mbit": 0,
+                    "host_limits_mbit": {},
+                    "schedule": []
+                }
+            },
             "logging": {
                 "level": "INFO",
                 "file_path": "../logs/workflow.log",
                 "max_size_mb": 10,
-                "backup_count": 5
+                "backup_count": 5,
+                "async": True,
+                "queue_size": 10000,
+                "format": "text",
+                "compression": "gzip",
+                "rotate_interval": None
+            },
+            "daemon": {
+                "card_paths": [],
+                "poll_seconds": 5,
+                "project_name": "",
+                "folders": ["footage", "proxies", "exports", "logs"],
+                "export_watch_dir": "",
+                "dated_folders": True,
+                "rename_exports": True,
+                "upload_endpoint": "",
+                "api_key_env": "VIDEO_WORKFLOW_API_KEY",
+                "avoid_duplicates": True
             }
         }
         
-        # Create config directory if it doesn't exist
-        os.makedirs(self.config_path.parent, exist_ok=True)
-        
         # Write default config to file
-        with open(self.config_path, 'w') as f:
-            json.dump(default_config, f, indent=4)
+        self._write_file(default_config)
         
-        self.config = default_config
+        self.config = freeze(default_config)
     
     def get_config(self):
         """
         Get the current configuration.
         
         Returns:
-            dict: The configuration dictionary
+            Mapping: Read-only snapshot of the configuration; nested sections
+                     are read-only mappings and lists are tuples
         """
         return self.config
     
@@ -90,6 +269,9 @@ class ConfigManager:
         """
         Update the configuration and save to file.
         
+        Nested sections are merged into the existing ones. Subscribers are
+        notified with the new snapshot.
+        
         Args:
             new_config (dict): New configuration values
             
@@ -97,13 +279,115 @@ class ConfigManager:
             bool: True if successful, False otherwise
         """
         try:
-            # Update config dictionary
-            self.config.update(new_config)
-            
-            # Save to file
-            with open(self.config_path, 'w') as f:
-                json.dump(self.config, f, indent=4)
-            
+            with self.lock:
+                config = merge_config(thaw(self.config), thaw(new_config))
+                self._write_file(config)
+                self.config = freeze(config)
+                snapshot = self.config
+            self._notify(snapshot)
             return True
         except Exception:
             return False
+    
+    def reload(self):
+        """
+        Re-read the config file if it changed on disk.
+        
+        Returns:
+            bool: True if a new configuration was loaded
+        """
+        with self.lock:
+            file_state = self._stat_file()
+            if file_state is None or file_state == self.file_state:
+                return False
+            try:
+                with open(self.config_path, 'r') as f:
+                    config = json.load(f)
+            except (OSError, ValueError) as e:
+                # Probably caught mid-write by another program; retry on the next
+                # check, but warn only once for each version of the file
+                if file_state != self.bad_file_state:
+                    self.bad_file_state = file_state
+                    logger.warning(f"Could not reload configuration: {e}")
+                return False
+            self.file_state = file_state
+            self.bad_file_state = None
+            self.config = freeze(config)
+            snapshot = self.config
+        self._notify(snapshot)
+        return True
+    
+    def subscribe(self, callback):
+        """
+        Call callback(snapshot) whenever the configuration changes.
+        
+        Callbacks run on the thread that made the change (the caller of
+        update_config, or the watcher thread), so GUI code should forward
+        them to the GUI thread with a signal. Subscribing starts the file
+        watcher.
+        
+        Args:
+            callback (callable): Function taking the new snapshot
+        """
+        with self.lock:
+            self.subscribers.append(callback)
+        self.start_watching()
+    
+    def unsubscribe(self, callback):
+        """Stop calling callback on changes."""
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+    
+    def _notify(self, snapshot):
+        """Pass a new snapshot to every subscriber."""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.warning(f"Configuration subscriber failed: {e}", exc_info=True)
+    
+    def start_watching(self, interval=WATCH_INTERVAL):
+        """Start polling the config file for external edits, if not already running."""
+        with self.lock:
+            if self.watch_thread is not None:
+                return
+            self.stop_event.clear()
+            self.watch_thread = threading.Thread(
+                target=self._watch, args=(interval,), name="config-watch", daemon=True
+            )
+            self.watch_thread.start()
+    
+    def stop_watching(self):
+        """Stop the file watcher."""
+        self.stop_event.set()
+        with self.lock:
+            thread, self.watch_thread = self.watch_thread, None
+        if thread is not None:
+            thread.join()
+    
+    def _watch(self, interval):
+        """Watcher loop."""
+        while not self.stop_event.wait(interval):
+            self.reload()
+
+
+# Process-wide shared manager
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_config_manager():
+    """
+    Get the shared configuration manager, loading config.json on first use.
+    
+    Returns:
+        ConfigManager: The shared manager
+    """
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = ConfigManager()
+        return _shared_manager
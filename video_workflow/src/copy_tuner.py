@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+Copy Tuner for Automated Video Workflow
+
+Picks the read size and the number of files copied at once for each
+device instead of using fixed values. A UHS-I card, a CFexpress card,
+an NVMe drive and a network share each want different settings: a slow
+card gains nothing from parallel copies, a share needs several requests
+in flight, and fast flash wants large reads.
+
+The first time a device is seen it is probed with short timed reads and
+writes at a few chunk sizes. While files are copied, a CopyTuner measures
+the live throughput and adjusts with AIMD (additive increase,
+multiplicative decrease): it raises the chunk size, then the number of
+parallel copies, one step at a time while throughput improves, takes
+back a step that made no difference, and halves a setting whose last
+step made throughput drop. The best settings seen are saved
+per device, so the next time the card is inserted copying starts there.
+
+    tuner = start_tuner(sample_file, destination, settings)
+    with tuner.slot():
+        copy_file(source, dest, chunk_size=tuner.chunk_size, record=tuner.record)
+    tuner.finish()
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from bulk_io import DIRECT_ALIGNMENT, HAVE_FADVISE
+from config_manager import get_state_dir
+from logger import log_event
+
+# Chunk sizes tried when probing a new device
+PROBE_CHUNK_SIZES = (256 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024)
+
+# Each additive increase of the chunk size
+CHUNK_STEP = 1024 * 1024
+
+# Parallel reads must beat a single read by this much to start with two copies
+PARALLEL_GAIN = 1.15
+
+# Throughput changes smaller than this are noise
+TOLERANCE = 0.1
+
+# Settings the tuner adjusts, in the order they are tried
+KNOBS = ("chunk_size", "workers")
+
+# Windows to hold settled settings before probing upward again
+REPROBE_WINDOWS = 30
+
+# Where filesystems are listed by UUID
+DISK_BY_UUID = "/dev/disk/by-uuid"
+
+
+class TunerSettings:
+    """Limits and timing of the copy tuner."""
+
+    def __init__(self, enabled=True, probe_mb=16, max_workers=4, min_chunk_kb=256,
+                 max_chunk_mb=16, window_seconds=2.0):
+        """
+        Initialize the settings.
+
+        Args:
+            enabled (bool, optional): Tune copies; otherwise fixed defaults are used
+            probe_mb (int, optional): Data read and written per probe, in MB
+            max_workers (int, optional): Most files copied at once
+            min_chunk_kb (int, optional): Smallest chunk size, in KB
+            max_chunk_mb (int, optional): Largest chunk size, in MB
+            window_seconds (float, optional): Copying time per throughput measurement
+        """
+        self.enabled = enabled
+        self.probe_bytes = max(1, probe_mb) * 1024 * 1024
+        self.max_workers = max(1, max_workers)
+        self.min_chunk = _align(max(4, min_chunk_kb) * 1024)
+        self.max_chunk = max(self.min_chunk, _align(max(1, max_chunk_mb) * 1024 * 1024))
+        self.window_seconds = max(0.1, window_seconds)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Build settings from the "tuning" section of the configuration.
+
+        Args:
+            config (Mapping): Configuration snapshot
+
+        Returns:
+            TunerSettings: The configured settings
+        """
+        settings = config.get('tuning') or {}
+        return cls(
+            enabled=settings.get('enabled', True),
+            probe_mb=settings.get('probe_mb', 16),
+            max_workers=settings.get('max_workers', 4),
+            min_chunk_kb=settings.get('min_chunk_kb', 256),
+            max_chunk_mb=settings.get('max_chunk_mb', 16),
+            window_seconds=settings.get('window_seconds', 2.0)
+        )
+
+
+def _align(size):
+    """Round a chunk size down to a multiple of DIRECT_ALIGNMENT, so direct I/O can use it."""
+    return max(DIRECT_ALIGNMENT, size - size % DIRECT_ALIGNMENT)
+
+
+def _mount_source(major, minor):
+    """Get (fstype, source) of the mount with the given device number, or None."""
+    try:
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                fields = line.split()
+                if fields[2] != f"{major}:{minor}":
+                    continue
+                # Optional fields end at "-", followed by fstype and source
+                rest = fields[fields.index("-") + 1:]
+                return rest[0], rest[1]
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def device_id(path):
+    """
+    Get an identifier of the device holding a path that survives remounting.
+
+    Block devices are identified by filesystem UUID, other mounts (network
+    shares) by filesystem type and source. Where neither can be found the
+    device number is used, which only identifies the device until it is
+    removed.
+
+    Args:
+        path (str): File or directory on the device
+
+    Returns:
+        str: Device identifier
+    """
+    st_dev = os.stat(path).st_dev
+    if not hasattr(os, "major"):
+        return f"dev:{st_dev}"
+    major, minor = os.major(st_dev), os.minor(st_dev)
+
+    try:
+        with open(f"/sys/dev/block/{major}:{minor}/uevent") as f:
+            devname = next((line.split("=", 1)[1].strip() for line in f if line.startswith("DEVNAME=")), None)
+    except OSError:
+        devname = None
+    if devname:
+        node = os.path.join("/dev", devname)
+        try:
+            for uuid in os.listdir(DISK_BY_UUID):
+                if os.path.realpath(os.path.join(DISK_BY_UUID, uuid)) == node:
+                    return f"uuid:{uuid}"
+        except OSError:
+            pass
+
+    mount = _mount_source(major, minor)
+    if mount is not None:
+        fstype, source = mount
+        if not source.startswith("/dev/"):
+            return f"{fstype}:{source}"
+    return f"dev:{major}:{minor}"
+
+
+class DeviceProfile:
+    """Copy settings learned for a device."""
+
+    def __init__(self, chunk_size, workers, mbps=0.0, updated=None):
+        """
+        Args:
+            chunk_size (int): Bytes per read
+            workers (int): Files copied at once
+            mbps (float, optional): Throughput reached with these settings, in MB/s
+            updated (float, optional): When the profile was saved, as a Unix time
+        """
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.mbps = mbps
+        self.updated = updated
+
+    def to_dict(self):
+        return {"chunk_size": self.chunk_size, "workers": self.workers,
+                "mbps": round(self.mbps, 1), "updated": self.updated}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["chunk_size"], data["workers"], data.get("mbps", 0.0), data.get("updated"))
+
+    def __repr__(self):
+        return f"{self.chunk_size // 1024} KB chunks, {self.workers} workers, {self.mbps:.0f} MB/s"
+
+
+class ProfileStore:
+    """Device profiles kept in a JSON file, by source device and then destination device."""
+
+    def __init__(self, path):
+        """
+        Initialize the store.
+
+        Args:
+            path (str): JSON file; created on the first save
+        """
+        self.path = str(path)
+        self.lock = threading.Lock()
+        self.profiles = None
+
+    def _load(self):
+        if self.profiles is None:
+            try:
+                with open(self.path) as f:
+                    self.profiles = json.load(f)
+            except (OSError, ValueError):
+                self.profiles = {}
+        return self.profiles
+
+    def get(self, source_id, destination_id):
+        """
+        Get the profile for copies from one device to another.
+
+        A source copied to a different destination before starts from the
+        fastest profile recorded for it, since the card is usually the
+        slower side.
+
+        Returns:
+            DeviceProfile: The profile, or None if the source is unknown
+        """
+        with self.lock:
+            targets = self._load().get(source_id) or {}
+            data = targets.get(destination_id)
+            if data is None and targets:
+                data = max(targets.values(), key=lambda entry: entry.get("mbps", 0.0))
+            return DeviceProfile.from_dict(data) if data else None
+
+    def save(self, source_id, destination_id, profile):
+        """Record a profile and write the file atomically."""
+        with self.lock:
+            profiles = self._load()
+            profiles.setdefault(source_id, {})[destination_id] = profile.to_dict()
+            directory = os.path.dirname(self.path)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix='.profiles-', suffix='.tmp', dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(profiles, f, indent=4)
+                os.replace(temp_path, self.path)
+            except Exception:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+
+
+# Shared profile store
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_profile_store(config=None):
+    """
+    Get the shared device profile store, creating it on first use.
+
+    Args:
+        config (dict, optional): Configuration dictionary used to locate the state directory
+
+    Returns:
+        ProfileStore: The shared store
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ProfileStore(get_state_dir(config) / "device_profiles.json")
+        return _shared_store
+
+
+def _timed_read(path, offset, length, chunk_size):
+    """Read a range of a file from the device, bypassing the cache; returns seconds taken."""
+    with open(path, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        if HAVE_FADVISE:
+            try:
+                os.posix_fadvise(fd, offset, length, os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+        f.seek(offset)
+        start = time.monotonic()
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        return time.monotonic() - start
+
+
+def _timed_write(directory, length, chunk_size):
+    """Write and sync a scratch file; returns seconds taken."""
+    fd, path = tempfile.mkstemp(prefix='.probe-', dir=directory)
+    try:
+        block = bytes(chunk_size)
+        start = time.monotonic()
+        written = 0
+        while written < length:
+            written += os.write(fd, block[:min(chunk_size, length - written)])
+        os.fsync(fd)
+        return time.monotonic() - start
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+
+def probe(sample_file, destination, settings):
+    """
+    Measure a source and destination with short timed reads and writes.
+
+    Each chunk size in PROBE_CHUNK_SIZES (within the settings' limits) is
+    timed reading sample_file and writing a scratch file in destination;
+    the one with the best throughput on the slower side wins. Reading two
+    ranges at once then decides whether to start with parallel copies.
+
+    Args:
+        sample_file (str): A large file on the source device
+        destination (str): Existing directory on the destination device
+        settings (TunerSettings): Probe size and limits
+
+    Returns:
+        DeviceProfile: Starting settings
+    """
+    size = os.path.getsize(sample_file)
+    length = min(settings.probe_bytes, size)
+    sizes = [chunk for chunk in PROBE_CHUNK_SIZES if settings.min_chunk <= chunk <= settings.max_chunk]
+    sizes = sizes or [settings.min_chunk]
+    if length == 0:
+        return DeviceProfile(sizes[0], 1)
+
+    best_chunk, best_rate = sizes[0], 0.0
+    for chunk_size in sizes:
+        read_seconds = _timed_read(sample_file, 0, length, chunk_size)
+        write_seconds = _timed_write(destination, length, chunk_size)
+        rate = length / max(read_seconds, write_seconds, 1e-6)
+        if rate > best_rate:
+            best_chunk, best_rate = chunk_size, rate
+
+    workers = 1
+    if settings.max_workers > 1 and size >= 2 * length:
+        single = _timed_read(sample_file, 0, length, best_chunk)
+        threads = [threading.Thread(target=_timed_read, args=(sample_file, offset, length, best_chunk))
+                   for offset in (0, length)]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if single / max(time.monotonic() - start, 1e-6) * 2 > PARALLEL_GAIN:
+            workers = 2
+
+    return DeviceProfile(best_chunk, workers, best_rate / (1024 * 1024), time.time())
+
+
+class CopyTuner:
+    """Adjusts chunk size and copy concurrency from live throughput."""
+
+    def __init__(self, profile, settings, source_id=None, destination_id=None, store=None, log=None):
+        """
+        Initialize the tuner.
+
+        Args:
+            profile (DeviceProfile): Starting settings
+            settings (TunerSettings): Limits and measurement window
+            source_id (str, optional): Source device, for saving the profile
+            destination_id (str, optional): Destination device, for saving the profile
+            store (ProfileStore, optional): Where finish() saves the best settings
+            log (callable, optional): Receives messages
+        """
+        self.settings = settings
+        self.source_id = source_id
+        self.destination_id = destination_id
+        self.store = store
+        self.log = log
+        self.chunk_size = min(max(_align(profile.chunk_size), settings.min_chunk), settings.max_chunk)
+        self.workers = min(max(1, profile.workers), settings.max_workers)
+        self.initial = profile
+        self.best = DeviceProfile(self.chunk_size, self.workers)
+
+        self.cond = threading.Condition()
+        self.active = 0
+        self.busy = 0.0
+        self.busy_since = None
+        self.window_bytes = 0
+        self.window_busy = 0.0
+        self.last_rate = None
+        # The setting raised in the last window, those that stopped gaining,
+        # and the highest value of each before throughput last dropped
+        self.raised = None
+        self.settled = set()
+        self.ceiling = {}
+        self.held = 0
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the current number of parallel copies for the duration of a copy."""
+        with self.cond:
+            while self.active >= self.workers:
+                self.cond.wait()
+            if self.active == 0:
+                self.busy_since = time.monotonic()
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.active -= 1
+                if self.active == 0:
+                    self.busy += time.monotonic() - self.busy_since
+                    self.busy_since = None
+                self.cond.notify_all()
+
+    def _busy_time(self):
+        """Seconds during which at least one copy was running."""
+        if self.busy_since is None:
+            return self.busy
+        return self.busy + time.monotonic() - self.busy_since
+
+    def record(self, nbytes):
+        """
+        Count copied bytes; adjusts the settings at the end of each window.
+
+        Throughput is measured over the time copies were actually running,
+        so waiting on later stages does not count as the device slowing down.
+        """
+        with self.cond:
+            self.window_bytes += nbytes
+            elapsed = self._busy_time() - self.window_busy
+            if elapsed < self.settings.window_seconds:
+                return
+            rate = self.window_bytes / elapsed / (1024 * 1024)
+            self.window_bytes = 0
+            self.window_busy = self._busy_time()
+            self._adjust(rate)
+            self.cond.notify_all()
+
+    def _adjust(self, rate):
+        """One AIMD step given the throughput of the last window, in MB/s."""
+        if rate > self.best.mbps * (1 + TOLERANCE):
+            self.best = DeviceProfile(self.chunk_size, self.workers, rate)
+
+        if self.raised is not None and self.last_rate is not None:
+            if rate < self.last_rate * (1 - TOLERANCE):
+                # Raising it hurt: back off multiplicatively, then climb back
+                # additively no further than the last good value
+                self._step_back(self.raised)
+                self.ceiling[self.raised] = getattr(self, self.raised)
+                self._decrease(self.raised)
+                self.raised = None
+                self.last_rate = None
+                return
+            if rate <= self.last_rate * (1 + TOLERANCE):
+                # It made no difference: take the step back
+                self._step_back(self.raised)
+            else:
+                # Still gaining: keep raising the same setting
+                self.last_rate = rate
+                if self._increase(self.raised):
+                    return
+                self.settled.add(self.raised)
+                self.raised = None
+                return
+            self.settled.add(self.raised)
+            self.raised = None
+            # Measure the reduced settings before the next step
+            self.last_rate = None
+            return
+
+        self.last_rate = rate
+        self.raised = next((knob for knob in KNOBS if knob not in self.settled and self._increase(knob)), None)
+        if self.raised is None:
+            # Settled: hold, then start probing upward again in case conditions changed
+            self.held += 1
+            if self.held >= REPROBE_WINDOWS:
+                self.held = 0
+                self.settled.clear()
+                self.ceiling.clear()
+
+    def _increase(self, knob):
+        """Raise a setting by one step; returns False if it is at its limit."""
+        if knob == "workers":
+            if self.workers >= self.ceiling.get(knob, self.settings.max_workers):
+                return False
+            self.workers += 1
+        else:
+            limit = self.ceiling.get(knob, self.settings.max_chunk)
+            if self.chunk_size >= limit:
+                return False
+            self.chunk_size = min(limit, self.chunk_size + CHUNK_STEP)
+        return True
+
+    def _step_back(self, knob):
+        """Undo one _increase() of a setting."""
+        if knob == "workers":
+            self.workers = max(1, self.workers - 1)
+        else:
+            self.chunk_size = max(self.settings.min_chunk, self.chunk_size - CHUNK_STEP)
+
+    def _decrease(self, knob):
+        """Halve a setting."""
+        if knob == "workers":
+            self.workers = max(1, self.workers // 2)
+        else:
+            self.chunk_size = max(self.settings.min_chunk, _align(self.chunk_size // 2))
+
+    def finish(self):
+        """
+        Save the best settings seen for the device.
+
+        If too little was copied to measure, the starting profile is saved,
+        so a probed device is not probed again.
+
+        Returns:
+            DeviceProfile: The best settings
+        """
+        best = self.best if self.best.mbps > 0 else self.initial
+        best = DeviceProfile(best.chunk_size, best.workers, best.mbps, time.time())
+        if self.store is not None and self.source_id and best.mbps > 0:
+            try:
+                self.store.save(self.source_id, self.destination_id, best)
+            except OSError as e:
+                if self.log:
+                    self.log(f"Could not save copy profile: {e}")
+            log_event("import", f"Copy profile for {self.source_id}: {best}")
+        return best
+
+
+def start_tuner(sample_file, destination, settings, store=None, log=None):
+    """
+    Create a tuner for copies from sample_file's device into destination.
+
+    A device with a saved profile starts from it; a new one is probed.
+
+    Args:
+        sample_file (str): A large file on the source device
+        destination (str): Existing directory on the destination device
+        settings (TunerSettings): Limits and probe size
+        store (ProfileStore, optional): Defaults to the shared store
+        log (callable, optional): Receives messages
+
+    Returns:
+        CopyTuner: The tuner
+    """
+    store = store or get_profile_store()
+    source_id = device_id(sample_file)
+    destination_id = device_id(destination)
+
+    profile = store.get(source_id, destination_id)
+    if profile is not None:
+        if log:
+            log(f"Using saved copy profile for {source_id}: {profile}")
+    else:
+        profile = probe(sample_file, destination, settings)
+        if log:
+            log(f"Probed {source_id}: {profile}")
+        log_event("import", f"Probed {source_id} to {destination_id}: {profile}")
+    return CopyTuner(profile, settings, source_id, destination_id, store, log)
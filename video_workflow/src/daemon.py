@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Ingest Daemon for Automated Video Workflow
+
+Runs the workflow unattended on an always-on ingest machine, without
+PyQt6 (`main.py --daemon`). Two threads poll continuously:
+
+- cards: each newly inserted card gets a dated project folder under
+  raw_path, and its clips stream through import (also into the same
+  project layout under each of backup_paths), verification and, if
+  create_proxies is set, proxy generation (see workflow.ingest_files)
+- exports: files appearing in the export watch directory are moved into
+  master_path once their size stops changing, then uploaded if an upload
+  endpoint is configured
+
+Settings come from the "daemon" section of the configuration and are
+re-read for every card and export, so edits to the config file apply
+without a restart. The upload API key is read from the environment
+variable named by api_key_env rather than stored in the config file.
+"""
+
+import os
+import signal
+import logging
+import threading
+from datetime import datetime
+
+from bulk_io import IOSettings
+from config_manager import get_config_manager
+from disk_monitor import get_disk_monitor
+from logger import log_event, new_job_id
+from progress import get_progress_bus
+import workflow
+
+DEFAULT_SETTINGS = {
+    "card_paths": [],
+    "poll_seconds": 5,
+    "project_name": "",
+    "folders": list(workflow.DEFAULT_FOLDERS),
+    "export_watch_dir": "",
+    "dated_folders": True,
+    "rename_exports": True,
+    "upload_endpoint": "",
+    "api_key_env": "VIDEO_WORKFLOW_API_KEY",
+    "avoid_duplicates": True
+}
+
+
+class IngestDaemon:
+    """Watches for cards and exports and runs every workflow stage on them."""
+
+    def __init__(self, config_manager=None, logger=None, disk_monitor=None):
+        """
+        Initialize the daemon.
+
+        Args:
+            config_manager (ConfigManager, optional): Defaults to the shared manager
+            logger (logging.Logger, optional): Logger for daemon events
+            disk_monitor (DiskMonitor, optional): Card detection and device
+                                                  telemetry; defaults to the shared monitor
+        """
+        self.config_manager = config_manager or get_config_manager()
+        self.logger = logger
+        self.disk_monitor = disk_monitor or get_disk_monitor(self.config_manager.get_config(), logger)
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def settings(self):
+        """
+        Get the current configuration and daemon settings.
+
+        Returns:
+            tuple: (configuration snapshot, daemon settings dict)
+        """
+        config = self.config_manager.get_config()
+        settings = dict(DEFAULT_SETTINGS)
+        settings.update(config.get('daemon') or {})
+        return config, settings
+
+    def log(self, stage, job_id=None):
+        """Message callable for workflow steps that records to the structured log."""
+        return lambda message: log_event(stage, message, job_id=job_id)
+
+    def run(self):
+        """Run until stop() is called or SIGINT/SIGTERM is received."""
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda signum, frame: self.stop())
+
+        # Pick up edits to the config file while running
+        self.config_manager.start_watching()
+
+        self.stop_event.clear()
+        self.threads = [
+            threading.Thread(target=self.watch_cards, name="daemon-cards", daemon=True),
+            threading.Thread(target=self.watch_exports, name="daemon-exports", daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+        log_event("import", "Ingest daemon started")
+
+        # Sleep in short waits so signals are handled promptly
+        while not self.stop_event.wait(0.5):
+            pass
+        for thread in self.threads:
+            thread.join()
+        log_event("import", "Ingest daemon stopped")
+
+    def stop(self):
+        """Ask the daemon to stop after the file in progress."""
+        self.stop_event.set()
+
+    def detect_cards(self, settings):
+        """
+        List the mounted cards.
+
+        Detected devices that are not mounted directories are ignored;
+        card_paths adds mount points to treat as cards while they exist.
+
+        Returns:
+            set: Card directories
+        """
+        cards = {path for path in self.disk_monitor.detect_sd_cards() if os.path.isdir(path)}
+        cards.update(path for path in settings["card_paths"] if os.path.isdir(path))
+        return cards
+
+    def watch_cards(self):
+        """Import each card once while it stays inserted."""
+        seen = set()
+        while not self.stop_event.is_set():
+            _, settings = self.settings()
+            try:
+                cards = self.detect_cards(settings)
+                for card in sorted(cards - seen):
+                    if self.stop_event.is_set():
+                        break
+                    try:
+                        self.ingest_card(card)
+                    except Exception as e:
+                        log_event("import", f"Error ingesting card {card}: {e}", level=logging.ERROR)
+                    seen.add(card)
+
+                # A removed card is imported again when reinserted
+                seen &= cards
+            except Exception as e:
+                log_event("import", f"Error detecting SD cards: {e}", level=logging.WARNING)
+            self.stop_event.wait(settings["poll_seconds"])
+
+    def ingest_card(self, card):
+        """
+        Import a card into a new project and generate its proxies.
+
+        Args:
+            card (str): Mount point of the card
+
+        Returns:
+            str: The project directory, or None if nothing was imported
+        """
+        config, settings = self.settings()
+        raw_path = config.get('raw_path')
+        if not raw_path:
+            log_event("import", f"Ignoring card {card}: raw_path is not configured")
+            return None
+
+        extensions = config.get('video_extensions') or workflow.VIDEO_EXTENSIONS
+        files = sorted(workflow.scan_video_files(card, extensions))
+        log_event("import", f"Found {len(files)} video files on {card}")
+        if not files:
+            return None
+
+        # Projects are named after the card unless a name is configured
+        project_name = settings["project_name"] or os.path.basename(os.path.normpath(card)) or "card"
+        project_dir = workflow.create_project_structure(
+            raw_path, datetime.now().strftime("%Y-%m-%d"), project_name, settings["folders"],
+            config.get('davinci_template_path') or None,
+            log=self.log("structure"), is_cancelled=self.stop_event.is_set
+        )
+        if project_dir is None:
+            return None
+
+        # Each clip is verified and proxied while the next one is copied;
+        # backup copies are written from the same read
+        footage = os.path.join(project_dir, "footage")
+        job_id = new_job_id("import")
+        job = get_progress_bus().start("import", job_id=job_id, total=len(files))
+        ingested = workflow.ingest_files(
+            files, footage, job, job_id=job_id,
+            log=self.log("import", job_id), is_cancelled=self.stop_event.is_set,
+            skip_existing=True, backups=workflow.backup_dirs(config, footage, raw_path),
+            **workflow.ingest_options(config, proxy_dir=os.path.join(project_dir, "proxies"))
+        )
+        imported = sum(1 for item in ingested if item.copy and not item.error)
+        log_event("import", f"Imported {imported} of {len(files)} files from {card} into {project_dir}",
+                  job_id=job_id)
+
+        return project_dir
+
+    def watch_exports(self):
+        """Move new exports into master storage once they are complete."""
+        known = None
+        pending = {}
+        watch_dir = None
+        while not self.stop_event.is_set():
+            config, settings = self.settings()
+            if settings["export_watch_dir"] != watch_dir:
+                # Files already present when watching starts are left alone, as in the GUI
+                watch_dir = settings["export_watch_dir"]
+                known = None
+                pending = {}
+
+            try:
+                if watch_dir and os.path.isdir(watch_dir):
+                    current = workflow.list_files(watch_dir)
+                    if known is None:
+                        known = current
+                        log_event("export", f"Watching {watch_dir} ({len(current)} existing files)")
+
+                    # An export is complete once its size is unchanged for a whole poll
+                    ready = []
+                    for path in current - known:
+                        size = os.path.getsize(path)
+                        if pending.get(path) == size:
+                            ready.append(path)
+                        else:
+                            pending[path] = size
+
+                    if ready:
+                        self.handle_exports(sorted(ready), config, settings)
+                    for path in ready:
+                        pending.pop(path, None)
+                    known = (known & current) | set(ready)
+            except Exception as e:
+                log_event("export", f"Error watching directory: {e}", level=logging.WARNING)
+            self.stop_event.wait(settings["poll_seconds"])
+
+    def handle_exports(self, files, config, settings):
+        """
+        Move finished exports into master storage and upload them.
+
+        Args:
+            files (list): Exported files
+            config (Mapping): Configuration snapshot
+            settings (dict): Daemon settings
+
+        Returns:
+            list: Paths the files were moved to
+        """
+        master_path = config.get('master_path')
+        if not master_path:
+            log_event("export", "Ignoring exports: master_path is not configured")
+            return []
+
+        job_id = new_job_id("export")
+        moved = []
+        for path in files:
+            try:
+                moved.append(workflow.move_export(
+                    path, master_path, settings["dated_folders"], settings["rename_exports"],
+                    job_id=job_id, log=self.log("export", job_id), io=IOSettings.from_config(config)
+                ))
+            except Exception as e:
+                log_event("export", f"Error moving file {path}: {e}", level=logging.ERROR, job_id=job_id)
+
+        endpoint = settings["upload_endpoint"]
+        if moved and endpoint:
+            api_key = os.environ.get(settings["api_key_env"], "")
+            if not api_key:
+                log_event("upload", f"Not uploading: ${settings['api_key_env']} is not set")
+                return moved
+
+            job_id = new_job_id("upload")
+            job = get_progress_bus().start("upload", job_id=job_id, total=len(moved))
+            try:
+                workflow.upload_files(
+                    moved, endpoint, api_key, config, job, job_id=job_id,
+                    log=self.log("upload", job_id), avoid_duplicates=settings["avoid_duplicates"],
+                    cancel_event=self.stop_event
+                )
+            except Exception as e:
+                log_event("upload", f"Error during upload: {e}", level=logging.ERROR, job_id=job_id)
+
+        return moved
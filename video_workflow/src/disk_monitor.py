@@ -2,27 +2,116 @@
 """
 Disk Monitor for Automated Video Workflow
 
-Handles detection of external drives and SD cards.
+Handles detection of external drives and SD cards, and measures how hard
+the devices behind a running job are working.
+
+Jobs register the paths they read and write with track(). While any
+path is tracked, a background thread samples /sys/block/<dev>/stat of
+each device involved (Linux only) and keeps a short time series of read
+and write MB/s, IOPS, average queue depth and utilisation. A device busy
+for nearly the whole interval is flagged as the bottleneck, which tells
+a slow card or reader apart from a slow destination SSD.
 """
 
 import os
-import platform
 import subprocess
+import threading
 import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
 from pathlib import Path
 
+# /sys/block stat counts sectors of 512 bytes regardless of the device
+SECTOR_SIZE = 512
+
+TELEMETRY_INTERVAL = 1.0
+TELEMETRY_HISTORY = 300
+
+# Percentage of the interval a device was busy above which it limits the job
+BOTTLENECK_UTILISATION = 90.0
+
+
+class DeviceSample(namedtuple("DeviceSample", [
+        "time", "device", "read_mbps", "write_mbps", "iops", "queue_depth", "utilisation", "bottleneck"])):
+    """Activity of one block device over one sampling interval."""
+
+    __slots__ = ()
+
+    def format(self):
+        """Short description for status lines."""
+        flag = " BOTTLENECK" if self.bottleneck else ""
+        return (f"{self.device} R {self.read_mbps:.0f} W {self.write_mbps:.0f} MB/s "
+                f"{self.iops:.0f} IOPS q{self.queue_depth:.1f} {self.utilisation:.0f}%{flag}")
+
+
+def block_device(path):
+    """
+    Get the /sys/block name of the disk holding a path.
+
+    Partitions resolve to their disk. Paths not on a local block device
+    (network shares, tmpfs) and other platforms give None.
+
+    Args:
+        path (str): File or directory
+
+    Returns:
+        str: Device name such as "sda" or "mmcblk0", or None
+    """
+    try:
+        st_dev = os.stat(path).st_dev
+        sys_path = os.path.realpath(f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}")
+    except (OSError, AttributeError):
+        return None
+    if not os.path.isdir(sys_path):
+        return None
+    if os.path.exists(os.path.join(sys_path, "partition")):
+        sys_path = os.path.dirname(sys_path)
+    name = os.path.basename(sys_path)
+    return name if os.path.exists(f"/sys/block/{name}/stat") else None
+
+
+def _read_block_stat(device):
+    """
+    Read the counters of a block device.
+
+    Returns:
+        tuple: (read I/Os, read sectors, write I/Os, write sectors, busy ms,
+               weighted queue ms), or None if the device is gone
+    """
+    try:
+        with open(f"/sys/block/{device}/stat") as f:
+            fields = [int(value) for value in f.read().split()]
+    except (OSError, ValueError):
+        return None
+    return fields[0], fields[2], fields[4], fields[6], fields[9], fields[10]
+
+
 class DiskMonitor:
     """Monitors for external drives and SD cards."""
     
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, interval=TELEMETRY_INTERVAL, history=TELEMETRY_HISTORY,
+                 bottleneck_utilisation=BOTTLENECK_UTILISATION):
         """
         Initialize the disk monitor.
         
         Args:
             logger: Logger instance for logging events
+            interval (float, optional): Seconds between device samples
+            history (int, optional): Samples kept per device
+            bottleneck_utilisation (float, optional): Utilisation percentage
+                                                      flagged as a bottleneck
         """
         self.logger = logger
-        self.system = platform.system()
+        # Same names as platform.system(), without importing platform
+        self.system = "Windows" if os.name == "nt" else os.uname().sysname
+
+        self.interval = interval
+        self.bottleneck_utilisation = bottleneck_utilisation
+        self.telemetry_lock = threading.Lock()
+        self.tracked = {}
+        self.series = {}
+        self.history = history
+        self.sampler_stop = None
     
     def is_drive_mounted(self, drive_name):
         """
@@ -248,3 +337,149 @@ class DiskMonitor:
                 self.logger.error(f"Error detecting SD cards on Linux: {e}")
         
         return sd_cards
+
+    @contextmanager
+    def track(self, paths):
+        """
+        Sample the devices holding some paths for the duration of a job.
+
+        Paths may be missing or on devices without block statistics; those
+        are ignored. Tracking is reference counted, so overlapping jobs on
+        the same device share its samples.
+
+        Args:
+            paths (iterable): Files or directories the job reads or writes
+        """
+        devices = {device for device in map(block_device, (path for path in paths if path)) if device}
+        with self.telemetry_lock:
+            for device in devices:
+                if device not in self.tracked:
+                    self.series.setdefault(device, deque(maxlen=self.history))
+                self.tracked[device] = self.tracked.get(device, 0) + 1
+            if devices and self.sampler_stop is None:
+                # Each sampler has its own stop event, so one that is still
+                # finishing its last wait never overlaps a new one
+                self.sampler_stop = threading.Event()
+                threading.Thread(target=self._sample_devices, args=(self.sampler_stop,),
+                                 name="disk-telemetry", daemon=True).start()
+        try:
+            yield devices
+        finally:
+            with self.telemetry_lock:
+                for device in devices:
+                    self.tracked[device] -= 1
+                    if self.tracked[device] == 0:
+                        del self.tracked[device]
+                if not self.tracked and self.sampler_stop is not None:
+                    self.sampler_stop.set()
+                    self.sampler_stop = None
+
+    def _sample_devices(self, stop):
+        """Sampling loop; runs while any device is tracked."""
+        previous = {}
+        while True:
+            now = time.monotonic()
+            with self.telemetry_lock:
+                devices = list(self.tracked)
+            for device in devices:
+                counters = _read_block_stat(device)
+                if counters is None:
+                    continue
+                if device in previous:
+                    self._record(device, previous[device], (now, counters))
+                previous[device] = (now, counters)
+            if stop.wait(self.interval):
+                break
+
+    def _record(self, device, before, after):
+        """Turn two counter readings into a sample."""
+        elapsed = after[0] - before[0]
+        if elapsed <= 0:
+            return
+        delta = [new - old for new, old in zip(after[1], before[1])]
+        read_ios, read_sectors, write_ios, write_sectors, busy_ms, queue_ms = delta
+        utilisation = min(100.0, busy_ms / (elapsed * 10))
+        sample = DeviceSample(
+            time=time.time(),
+            device=device,
+            read_mbps=read_sectors * SECTOR_SIZE / elapsed / (1024 * 1024),
+            write_mbps=write_sectors * SECTOR_SIZE / elapsed / (1024 * 1024),
+            iops=(read_ios + write_ios) / elapsed,
+            queue_depth=queue_ms / (elapsed * 1000),
+            utilisation=utilisation,
+            bottleneck=utilisation >= self.bottleneck_utilisation
+        )
+        with self.telemetry_lock:
+            series = self.series.setdefault(device, deque(maxlen=self.history))
+            was_bottleneck = bool(series) and series[-1].bottleneck
+            series.append(sample)
+        if sample.bottleneck and not was_bottleneck and self.logger:
+            self.logger.info(f"Device {device} is the bottleneck: {sample.format()}")
+
+    def telemetry(self, device):
+        """
+        Get the recorded samples of a device, oldest first.
+
+        Returns:
+            list: DeviceSample for each interval
+        """
+        with self.telemetry_lock:
+            return list(self.series.get(device, ()))
+
+    def latest(self):
+        """
+        Get the most recent sample of each device being tracked.
+
+        Returns:
+            dict: Device name to DeviceSample
+        """
+        with self.telemetry_lock:
+            return {device: self.series[device][-1]
+                    for device in self.tracked if self.series.get(device)}
+
+    def bottlenecks(self):
+        """
+        Get the tracked devices that were nearly always busy in their last sample.
+
+        Returns:
+            list: Device names
+        """
+        return sorted(device for device, sample in self.latest().items() if sample.bottleneck)
+
+    def format_telemetry(self):
+        """
+        Describe the tracked devices in one line, for the GUI and console.
+
+        Returns:
+            str: Latest sample of each device, or "" while none are tracked
+        """
+        return " | ".join(sample.format() for _, sample in sorted(self.latest().items()))
+
+
+# Shared monitor, so the GUI and console read the samples jobs collect
+_shared_monitor = None
+_shared_monitor_lock = threading.Lock()
+
+
+def get_disk_monitor(config=None, logger=None):
+    """
+    Get the shared disk monitor, creating it on first use.
+
+    Args:
+        config (dict, optional): Configuration dictionary with a "telemetry" section
+        logger: Logger instance for logging events
+
+    Returns:
+        DiskMonitor: The shared monitor
+    """
+    global _shared_monitor
+    with _shared_monitor_lock:
+        if _shared_monitor is None:
+            settings = (config or {}).get('telemetry') or {}
+            _shared_monitor = DiskMonitor(
+                logger,
+                interval=settings.get('interval_seconds', TELEMETRY_INTERVAL),
+                history=settings.get('history', TELEMETRY_HISTORY),
+                bottleneck_utilisation=settings.get('bottleneck_utilisation', BOTTLENECK_UTILISATION)
+            )
+        return _shared_monitor
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Duplicate Checker for Automated Video Workflow
+
+Decides which files were already uploaded without one request per file:
+
+1. Digests we uploaded ourselves are kept in a local store and resolve
+   as duplicates immediately.
+2. The server's Bloom filter of known digests is fetched once per run;
+   a digest it does not contain is definitely new.
+3. Only the remaining "maybe" digests are sent, in batches, to the
+   lookup endpoint. If the server has no lookup endpoint or the lookup
+   keeps failing, they are treated as new and uploaded.
+"""
+
+import time
+import json
+import math
+import base64
+import sqlite3
+import threading
+import http.client
+
+from config_manager import get_state_dir
+from upload_engine import UploadError
+
+
+class BloomFilter:
+    """Bloom filter over hex digests of cryptographic hashes."""
+
+    def __init__(self, size_bits=8 * 1024 * 1024, num_hashes=7, data=None):
+        """
+        Initialize the Bloom filter.
+
+        Args:
+            size_bits (int, optional): Number of bits in the filter
+            num_hashes (int, optional): Bit positions set per item
+            data (bytes, optional): Existing filter contents
+        """
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(data) if data is not None else bytearray(-(-size_bits // 8))
+
+    @classmethod
+    def for_capacity(cls, capacity, false_positive_rate=0.01):
+        """
+        Create a filter sized for an expected number of items.
+
+        Args:
+            capacity (int): Expected number of items
+            false_positive_rate (float, optional): Target false positive rate
+
+        Returns:
+            BloomFilter: An empty filter
+        """
+        capacity = max(1, capacity)
+        size_bits = int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))
+        num_hashes = max(1, round(size_bits / capacity * math.log(2)))
+        return cls(max(64, size_bits), num_hashes)
+
+    def _positions(self, hex_digest):
+        """Derive bit positions from the digest itself (double hashing)."""
+        raw = bytes.fromhex(hex_digest)
+        h1 = int.from_bytes(raw[:8], "big")
+        h2 = int.from_bytes(raw[8:16], "big") | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.num_hashes)]
+
+    def add(self, hex_digest):
+        """Add a digest to the filter."""
+        for position in self._positions(hex_digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, hex_digest):
+        """Check whether a digest may be in the filter."""
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(hex_digest))
+
+    def to_dict(self):
+        """Serialize the filter for transport as JSON."""
+        return {
+            "bits": self.size_bits,
+            "hashes": self.num_hashes,
+            "data": base64.b64encode(bytes(self.bits)).decode("ascii")
+        }
+
+    @classmethod
+    def from_dict(cls, payload):
+        """Deserialize a filter produced by to_dict."""
+        return cls(int(payload["bits"]), int(payload["hashes"]), base64.b64decode(payload["data"]))
+
+
+class KnownDigestStore:
+    """Persistent set of digests known to be on the server."""
+
+    def __init__(self, db_path):
+        """
+        Initialize the store and load its digests into memory.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS known_digests ("
+            "endpoint TEXT NOT NULL, digest TEXT NOT NULL, file_name TEXT, added REAL, "
+            "PRIMARY KEY (endpoint, digest))"
+        )
+        self.conn.commit()
+        self._cache = {}
+
+    def _digests(self, endpoint):
+        """Get the in-memory digest set for an endpoint, loading it on first use."""
+        digests = self._cache.get(endpoint)
+        if digests is None:
+            rows = self.conn.execute(
+                "SELECT digest FROM known_digests WHERE endpoint=?", (endpoint,)
+            ).fetchall()
+            digests = {row[0] for row in rows}
+            self._cache[endpoint] = digests
+        return digests
+
+    def contains(self, endpoint, digest):
+        """Check whether a digest is known for an endpoint."""
+        with self.lock:
+            return digest in self._digests(endpoint)
+
+    def add_many(self, endpoint, digests, file_name=None):
+        """Record digests as present on an endpoint."""
+        now = time.time()
+        with self.lock:
+            known = self._digests(endpoint)
+            new = [d for d in digests if d not in known]
+            if not new:
+                return
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO known_digests (endpoint, digest, file_name, added) "
+                "VALUES (?, ?, ?, ?)",
+                [(endpoint, d, file_name, now) for d in new]
+            )
+            self.conn.commit()
+            known.update(new)
+
+    def add(self, endpoint, digest, file_name=None):
+        """Record a single digest as present on an endpoint."""
+        self.add_many(endpoint, [digest], file_name)
+
+
+class DuplicateChecker:
+    """Batch duplicate detection against an upload endpoint."""
+
+    def __init__(self, pool, api_key, known_store=None, algorithm="md5",
+                 batch_size=1000, bloom_max_age=300, retry=None, logger=None):
+        """
+        Initialize the duplicate checker.
+
+        Args:
+            pool (ConnectionPool): Connection pool for the upload endpoint
+            api_key (str): Bearer token sent with every request
+            known_store (KnownDigestStore, optional): Local store of known digests
+            algorithm (str, optional): Digest algorithm the server indexes
+            batch_size (int, optional): Digests per lookup request
+            bloom_max_age (int, optional): Seconds before the server filter is refetched
+            retry (callable, optional): Called as retry(func, *args) to resend failed
+                                        requests with backoff, e.g. UploadEngine.with_retries
+            logger: Logger instance for logging events
+        """
+        self.pool = pool
+        self.api_key = api_key
+        self.known_store = known_store
+        self.algorithm = algorithm
+        self.batch_size = batch_size
+        self.bloom_max_age = bloom_max_age
+        self.retry = retry
+        self.logger = logger
+        self.endpoint = f"{pool.scheme}://{pool.host}:{pool.port or ''}{pool.base_path}"
+
+        self.bloom = None
+        self.bloom_fetched = 0
+        self.bloom_supported = True
+        self.lookup_supported = True
+
+        # How each digest was resolved, for reporting
+        self.stats = {"local": 0, "bloom": 0, "lookup": 0, "unchecked": 0, "requests": 0}
+
+    def _request(self, method, path, payload=None):
+        """Send a JSON request and decode the JSON response."""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        status, data = self.pool.request(method, path, body=body, headers={
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+        self.stats["requests"] += 1
+        if status >= 400:
+            raise UploadError(f"HTTP {status} from {path}", status)
+        return json.loads(data) if data else {}
+
+    def _refresh_bloom(self):
+        """Fetch the server's Bloom filter if it is missing or stale."""
+        if not self.bloom_supported:
+            return
+        if self.bloom is not None and time.monotonic() - self.bloom_fetched < self.bloom_max_age:
+            return
+        try:
+            payload = self._request("GET", f"/digests/bloom?algorithm={self.algorithm}")
+            self.bloom = BloomFilter.from_dict(payload)
+            self.bloom_fetched = time.monotonic()
+        except UploadError as e:
+            if e.status in (404, 405, 501):
+                # The server has no filter endpoint; fall back to lookups only
+                self.bloom_supported = False
+            elif self.logger:
+                self.logger.warning(f"Could not fetch duplicate filter: {e}")
+        except (OSError, ValueError, KeyError) as e:
+            if self.logger:
+                self.logger.warning(f"Could not fetch duplicate filter: {e}")
+
+    def check_many(self, digests):
+        """
+        Check which digests are already on the server.
+
+        Args:
+            digests (iterable): Hex digests to check
+
+        Returns:
+            dict: Mapping of digest to True (duplicate) or False (new)
+        """
+        results = {}
+        pending = []
+
+        for digest in dict.fromkeys(d for d in digests if d):
+            if self.known_store and self.known_store.contains(self.endpoint, digest):
+                results[digest] = True
+                self.stats["local"] += 1
+            else:
+                pending.append(digest)
+
+        if pending:
+            self._refresh_bloom()
+            if self.bloom is not None:
+                maybe = []
+                for digest in pending:
+                    if digest in self.bloom:
+                        maybe.append(digest)
+                    else:
+                        results[digest] = False
+                        self.stats["bloom"] += 1
+                pending = maybe
+
+        # Ask the server about what is left, in as few requests as possible
+        for start in range(0, len(pending) if self.lookup_supported else 0, self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            payload = {"algorithm": self.algorithm, "digests": batch}
+            try:
+                if self.retry is not None:
+                    response = self.retry(self._request, "POST", "/digests/lookup", payload)
+                else:
+                    response = self._request("POST", "/digests/lookup", payload)
+            except UploadError as e:
+                if e.status in (404, 405, 501):
+                    # The server has no lookup endpoint; upload whatever is left
+                    self.lookup_supported = False
+                elif self.logger:
+                    self.logger.warning(f"Duplicate lookup failed, uploading remaining files: {e}")
+                break
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                if self.logger:
+                    self.logger.warning(f"Duplicate lookup failed, uploading remaining files: {e}")
+                break
+            existing = set(response.get("existing", []))
+            for digest in batch:
+                results[digest] = digest in existing
+            self.stats["lookup"] += len(batch)
+            if existing and self.known_store:
+                self.known_store.add_many(self.endpoint, existing)
+
+        # Digests the server could not be asked about are treated as new
+        for digest in pending:
+            if digest not in results:
+                results[digest] = False
+                self.stats["unchecked"] += 1
+
+        return results
+
+    def record_uploaded(self, digest, file_name=None):
+        """Remember a digest after a successful upload."""
+        if self.known_store and digest:
+            self.known_store.add(self.endpoint, digest, file_name)
+        if self.bloom is not None and digest:
+            self.bloom.add(digest)
+
+    def summary(self):
+        """Human-readable summary of how digests were resolved."""
+        summary = (f"{self.stats['local']} known locally, {self.stats['bloom']} ruled out by filter, "
+                   f"{self.stats['lookup']} looked up in {self.stats['requests']} requests")
+        if self.stats["unchecked"]:
+            summary += f", {self.stats['unchecked']} not checked"
+        return summary
+
+
+# Process-wide shared store
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_known_digests(config=None):
+    """
+    Get the shared store of known uploaded digests.
+
+    Args:
+        config (dict, optional): Configuration dictionary used to locate the state directory
+
+    Returns:
+        KnownDigestStore: The shared store
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = KnownDigestStore(get_state_dir(config) / "known_digests.sqlite3")
+        return _shared_store
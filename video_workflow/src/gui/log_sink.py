@@ -0,0 +1,94 @@
+"""
+Log Sink for the Video Workflow Application
+
+Buffers log lines written from any thread and appends them to a log view
+in one batch at most every FLUSH_INTERVAL_MS. The view keeps a bounded
+number of lines, and lines that would be trimmed before they are ever
+shown are dropped while still buffered; the number dropped is reported
+in the view. This keeps the GUI responsive when workers log thousands of
+lines per second.
+"""
+
+import time
+import threading
+from collections import deque
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Minimum time between two appends to the view
+FLUSH_INTERVAL_MS = 100
+
+# Lines kept in a tab's log view
+MAX_LOG_LINES = 5000
+
+
+class LogSink(QObject):
+    """Thread-safe, coalescing writer for a QPlainTextEdit log view."""
+
+    # Emitted when the buffer becomes non-empty, to schedule a flush on the GUI thread
+    _pending_signal = pyqtSignal()
+
+    def __init__(self, view, flush_interval_ms=FLUSH_INTERVAL_MS, max_pending=None):
+        """
+        Initialize the sink.
+
+        Args:
+            view (QPlainTextEdit): Log view to append to
+            flush_interval_ms (int, optional): Minimum time between appends
+            max_pending (int, optional): Lines buffered between flushes; defaults
+                                         to the view's maximum block count
+        """
+        super().__init__(view)
+        self.view = view
+        self.max_pending = max_pending or view.maximumBlockCount() or MAX_LOG_LINES
+
+        self.lock = threading.Lock()
+        self.pending = deque()
+        self.scheduled = False
+        self.dropped = 0
+        self.total_dropped = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(flush_interval_ms)
+        self.timer.timeout.connect(self.flush)
+        self._pending_signal.connect(self._schedule)
+
+    def write(self, message):
+        """
+        Queue a message for the view; safe to call from any thread.
+
+        Args:
+            message (str): Message, shown with the current time
+        """
+        line = f"[{time.strftime('%H:%M:%S')}] {message}"
+        with self.lock:
+            if len(self.pending) >= self.max_pending:
+                # The view would trim it before it is ever seen
+                self.pending.popleft()
+                self.dropped += 1
+            self.pending.append(line)
+            if self.scheduled:
+                return
+            self.scheduled = True
+        self._pending_signal.emit()
+
+    def _schedule(self):
+        """Start the flush timer (GUI thread)."""
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """Append all buffered lines to the view in one batch (GUI thread)."""
+        with self.lock:
+            lines = list(self.pending)
+            self.pending.clear()
+            dropped = self.dropped
+            self.dropped = 0
+            self.scheduled = False
+
+        if dropped:
+            self.total_dropped += dropped
+            lines.insert(0, f"--- {dropped} log lines dropped ---")
+        if lines:
+            self.view.appendPlainText("\n".join(lines))
@@ -4,6 +4,7 @@ Main Window for the Video Workflow Application
 
 import os
 import sys
+import importlib
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
@@ -25,14 +26,63 @@ from gui.ui_template import (
     show_error, show_question, create_button
 )
 
-# Import tab screens for each workflow phase
-from gui.tabs.config_tab import ConfigTab
-from gui.tabs.sd_detection_tab import SDDetectionTab
-from gui.tabs.folder_structure_tab import FolderStructureTab
-from gui.tabs.proxy_generator_tab import ProxyGeneratorTab
-from gui.tabs.export_watcher_tab import ExportWatcherTab
-from gui.tabs.upload_tab import UploadTab
-from gui.tabs.log_viewer_tab import LogViewerTab
+from config_manager import get_config_manager
+from logger import setup_logger
+from metrics import start_metrics_server
+import startup_timing
+
+# Tab screens for each workflow phase: (attribute, title, module, class).
+# Tab modules pull in the workflow engines, so each is imported and built
+# the first time its tab is shown.
+TABS = [
+    ("config_tab", "Configuration", "gui.tabs.config_tab", "ConfigTab"),
+    ("sd_detection_tab", "SD Card Detection", "gui.tabs.sd_detection_tab", "SDDetectionTab"),
+    ("folder_structure_tab", "Folder Structure", "gui.tabs.folder_structure_tab", "FolderStructureTab"),
+    ("proxy_generator_tab", "Proxy Generator", "gui.tabs.proxy_generator_tab", "ProxyGeneratorTab"),
+    ("export_watcher_tab", "Export Watcher", "gui.tabs.export_watcher_tab", "ExportWatcherTab"),
+    ("upload_tab", "Upload", "gui.tabs.upload_tab", "UploadTab"),
+    ("log_viewer_tab", "Logs", "gui.tabs.log_viewer_tab", "LogViewerTab"),
+]
+
+
+class LazyTab(QWidget):
+    """Placeholder page that builds its tab the first time it is shown."""
+    
+    def __init__(self, module_name, class_name, parent=None):
+        """
+        Initialize the placeholder.
+        
+        Args:
+            module_name (str): Module defining the tab
+            class_name (str): Tab class
+            parent (QWidget, optional): Parent widget
+        """
+        super().__init__(parent)
+        self.module_name = module_name
+        self.class_name = class_name
+        self.tab = None
+        
+        self.page_layout = QVBoxLayout(self)
+        self.page_layout.setContentsMargins(0, 0, 0, 0)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.page_layout.addWidget(self.loading_label)
+    
+    def create(self):
+        """
+        Import and build the tab if it does not exist yet.
+        
+        Returns:
+            QWidget: The tab
+        """
+        if self.tab is None:
+            module = importlib.import_module(self.module_name)
+            self.tab = getattr(module, self.class_name)()
+            self.page_layout.removeWidget(self.loading_label)
+            self.loading_label.deleteLater()
+            self.page_layout.addWidget(self.tab)
+        return self.tab
+
 
 class MainWindow(QMainWindow):
     """Main application window with tabbed interface for all workflow phases."""
@@ -86,36 +136,59 @@ class MainWindow(QMainWindow):
         
         # Connect signals
         self.connect_signals()
+        
+        self.first_paint_done = False
     
     def init_tabs(self):
-        """Initialize all tabs for the workflow phases."""
-        # Configuration tab
-        self.config_tab = ConfigTab()
-        self.tab_widget.addTab(self.config_tab, "Configuration")
-        
-        # SD Card Detection tab
-        self.sd_detection_tab = SDDetectionTab()
-        self.tab_widget.addTab(self.sd_detection_tab, "SD Card Detection")
-        
-        # Folder Structure tab
-        self.folder_structure_tab = FolderStructureTab()
-        self.tab_widget.addTab(self.folder_structure_tab, "Folder Structure")
-        
-        # Proxy Generator tab
-        self.proxy_generator_tab = ProxyGeneratorTab()
-        self.tab_widget.addTab(self.proxy_generator_tab, "Proxy Generator")
+        """Add a placeholder for each workflow phase; tabs are built on first activation."""
+        for attribute, title, module_name, class_name in TABS:
+            self.tab_widget.addTab(LazyTab(module_name, class_name), title)
+    
+    def get_tab(self, index):
+        """
+        Get the tab at index, building it if needed.
         
-        # Export Watcher tab
-        self.export_watcher_tab = ExportWatcherTab()
-        self.tab_widget.addTab(self.export_watcher_tab, "Export Watcher")
+        Args:
+            index (int): Tab index
         
-        # Upload tab
-        self.upload_tab = UploadTab()
-        self.tab_widget.addTab(self.upload_tab, "Upload")
+        Returns:
+            QWidget: The tab, or None if index is out of range
+        """
+        placeholder = self.tab_widget.widget(index)
+        if placeholder is None:
+            return None
+        if placeholder.tab is None:
+            tab = placeholder.create()
+            # Keep the per-tab attributes (self.upload_tab, ...) for existing callers
+            setattr(self, TABS[index][0], tab)
+        return placeholder.tab
+    
+    def created_tabs(self):
+        """List the tabs that have been built so far."""
+        tabs = []
+        for i in range(self.tab_widget.count()):
+            tab = self.tab_widget.widget(i).tab
+            if tab is not None:
+                tabs.append(tab)
+        return tabs
+    
+    def paintEvent(self, event):
+        """Build the first tab once the window has been painted."""
+        super().paintEvent(event)
+        if not self.first_paint_done:
+            self.first_paint_done = True
+            startup_timing.mark("first_paint")
+            QTimer.singleShot(0, self.on_first_paint)
+    
+    def on_first_paint(self):
+        """Build the visible tab after the window is on screen."""
+        self.get_tab(self.tab_widget.currentIndex())
+        startup_timing.mark("first_tab_ready")
+        startup_timing.report()
         
-        # Log Viewer tab
-        self.log_viewer_tab = LogViewerTab()
-        self.tab_widget.addTab(self.log_viewer_tab, "Logs")
+        # A --profile-startup run ends once the window is usable
+        if startup_timing.exit_requested():
+            QApplication.instance().quit()
     
     def create_button_bar(self):
         """Create the bottom button bar."""
@@ -158,7 +231,7 @@ class MainWindow(QMainWindow):
     def run_workflow(self):
         """Run the workflow."""
         # Get current tab
-        current_tab = self.tab_widget.currentWidget()
+        current_tab = self.get_tab(self.tab_widget.currentIndex())
         
         # Run the current tab's workflow
         if hasattr(current_tab, 'run'):
@@ -173,7 +246,7 @@ class MainWindow(QMainWindow):
     def stop_workflow(self):
         """Stop the workflow."""
         # Get current tab
-        current_tab = self.tab_widget.currentWidget()
+        current_tab = self.get_tab(self.tab_widget.currentIndex())
         
         # Stop the current tab's workflow
         if hasattr(current_tab, 'stop'):
@@ -187,6 +260,10 @@ class MainWindow(QMainWindow):
     
     def on_tab_changed(self, index):
         """Handle tab changed event."""
+        # Build the tab on first activation
+        if self.first_paint_done:
+            self.get_tab(index)
+        
         # Reset buttons
         self.run_button.setEnabled(True)
         self.stop_button.setEnabled(False)
@@ -200,9 +277,8 @@ class MainWindow(QMainWindow):
         # Ask for confirmation if any workflow is running
         if self.stop_button.isEnabled():
             if show_question(self, "Confirm Exit", "A workflow is currently running. Are you sure you want to exit?"):
-                # Stop all workflows
-                for i in range(self.tab_widget.count()):
-                    tab = self.tab_widget.widget(i)
+                # Stop all workflows; tabs never built have nothing running
+                for tab in self.created_tabs():
                     if hasattr(tab, 'stop'):
                         try:
                             tab.stop()
@@ -217,8 +293,21 @@ class MainWindow(QMainWindow):
 
 def run_gui():
     """Run the GUI application."""
+    # Set up file logging so every tab's messages reach the log
+    logger = None
+    try:
+        logger = setup_logger(get_config_manager().get_config())
+    except Exception as e:
+        sys.stderr.write(f"Warning: could not set up logging: {e}\n")
+    startup_timing.mark("logging_ready")
+    
+    # Optional scrape endpoint; serves until the process exits
+    start_metrics_server(get_config_manager().get_config(), logger)
+    
     app = QApplication(sys.argv)
+    startup_timing.mark("app_created")
     window = MainWindow()
+    startup_timing.mark("window_created")
     window.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,109 @@
+"""
+Progress Sampler for the Video Workflow Application
+
+Polls the progress bus on a single GUI timer and copies the state of
+tracked jobs into their progress bars and labels. Workers never touch
+widgets or emit per-item signals; the widgets update at most
+SAMPLE_INTERVAL_MS apart however fast the work goes, and the timer
+stops while nothing is being tracked.
+"""
+
+import sys
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QTimer
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from progress import get_progress_bus
+from disk_monitor import get_disk_monitor
+
+# 10 Hz
+SAMPLE_INTERVAL_MS = 100
+
+
+class ProgressSampler(QObject):
+    """Copies job progress into widgets on the GUI thread."""
+
+    def __init__(self, interval_ms=SAMPLE_INTERVAL_MS, parent=None):
+        """
+        Initialize the sampler.
+
+        Args:
+            interval_ms (int, optional): Time between samples
+            parent (QObject, optional): Parent object
+        """
+        super().__init__(parent)
+        self.bindings = {}
+        self.device_labels = {}
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.sample)
+
+    def track(self, job, progress_bar, label=None):
+        """
+        Show a job's progress until it finishes (GUI thread).
+
+        Args:
+            job (JobProgress): Job to follow
+            progress_bar (QProgressBar): Bar showing the completed percentage
+            label (QLabel, optional): Label showing what the job is doing
+        """
+        # A bar follows one job at a time
+        self.bindings[id(progress_bar)] = (job, progress_bar, label, [None, None])
+        if not self.timer.isActive():
+            self.timer.start()
+        self.sample()
+
+    def show_devices(self, label):
+        """
+        Show the activity of the devices behind running jobs in a label (GUI thread).
+
+        The label is updated while any job is tracked and keeps its last text.
+
+        Args:
+            label (QLabel): Label showing throughput, utilisation and bottlenecks
+        """
+        self.device_labels[id(label)] = (label, [None])
+
+    def sample(self):
+        """Update the widgets of every tracked job."""
+        for key, (job, progress_bar, label, shown) in list(self.bindings.items()):
+            snapshot = job.snapshot()
+            if snapshot.percent != shown[0]:
+                progress_bar.setValue(snapshot.percent)
+                shown[0] = snapshot.percent
+
+            # The tab sets its own completion text once the job has finished
+            if (label is not None and not snapshot.finished and snapshot.current
+                    and snapshot.current != shown[1]):
+                label.setText(snapshot.current)
+                shown[1] = snapshot.current
+
+            if snapshot.finished:
+                del self.bindings[key]
+
+        if self.device_labels:
+            text = get_disk_monitor().format_telemetry()
+            for label, shown in self.device_labels.values():
+                if text and text != shown[0]:
+                    label.setText(text)
+                    shown[0] = text
+
+        if not self.bindings:
+            self.timer.stop()
+
+
+_sampler = None
+
+
+def get_progress_sampler():
+    """
+    Get the application's progress sampler; call from the GUI thread.
+
+    Returns:
+        ProgressSampler: The shared sampler
+    """
+    global _sampler
+    if _sampler is None:
+        _sampler = ProgressSampler()
+    return _sampler
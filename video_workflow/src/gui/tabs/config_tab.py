@@ -3,7 +3,7 @@ Configuration Tab for the Video Workflow Application
 """
 
 import os
-import json
+import sys
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
@@ -18,11 +18,16 @@ from ..ui_template import (
     create_checkbox, create_button, show_info, show_error, create_horizontal_separator
 )
 
+# Import the shared configuration service
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from config_manager import get_config_manager
+
 class ConfigTab(QWidget):
     """Configuration tab for setting up paths and preferences."""
     
     # Signals
-    config_saved = pyqtSignal(dict)
+    config_saved = pyqtSignal(object)
+    config_changed_signal = pyqtSignal(object)
     
     def __init__(self):
         super().__init__()
@@ -32,6 +37,10 @@ class ConfigTab(QWidget):
         
         # Load existing configuration if available
         self.load_config()
+        
+        # Refresh the form when the configuration changes, e.g. the file is edited
+        self.config_changed_signal.connect(self.load_config)
+        get_config_manager().subscribe(self.config_changed_signal.emit)
     
     def init_ui(self):
         """Initialize the UI components."""
@@ -179,7 +188,7 @@ class ConfigTab(QWidget):
         
         # Connect buttons
         self.save_button.clicked.connect(self.save_config)
-        self.reset_button.clicked.connect(self.load_config)
+        self.reset_button.clicked.connect(lambda: self.load_config())
     
     def browse_directory(self, label, caption):
         """Open directory browser dialog."""
@@ -197,46 +206,41 @@ class ConfigTab(QWidget):
         """Show or hide proxy settings based on checkbox state."""
         self.proxy_container.setVisible(state == Qt.CheckState.Checked)
     
-    def load_config(self):
-        """Load configuration from file."""
+    def load_config(self, config=None):
+        """Load configuration from the shared configuration service."""
         try:
-            # Get the config file path
-            script_dir = Path(__file__).resolve().parent.parent.parent.parent
-            config_path = script_dir / 'config' / 'config.json'
+            if config is None:
+                config = get_config_manager().get_config()
+            
+            # Set UI values from config
+            self.raw_path_label.setText(config.get('raw_path', 'No directory selected'))
+            self.master_path_label.setText(config.get('master_path', 'No directory selected'))
+            self.ssd_name_input.setText(config.get('ssd_name', ''))
+            
+            # Set video extensions
+            extensions = config.get('video_extensions', [])
+            self.extensions_input.setText(', '.join(extensions))
+            
+            # Set proxy settings
+            create_proxies = config.get('create_proxies', False)
+            self.create_proxies_checkbox.setChecked(create_proxies)
+            self.proxy_container.setVisible(create_proxies)
             
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                
-                # Set UI values from config
-                self.raw_path_label.setText(config.get('raw_path', 'No directory selected'))
-                self.master_path_label.setText(config.get('master_path', 'No directory selected'))
-                self.ssd_name_input.setText(config.get('ssd_name', ''))
-                
-                # Set video extensions
-                extensions = config.get('video_extensions', [])
-                self.extensions_input.setText(', '.join(extensions))
-                
-                # Set proxy settings
-                create_proxies = config.get('create_proxies', False)
-                self.create_proxies_checkbox.setChecked(create_proxies)
-                self.proxy_container.setVisible(create_proxies)
-                
-                proxy_settings = config.get('proxy_settings', {})
-                self.proxy_resolution_input.setText(proxy_settings.get('resolution', '1280x720'))
-                self.proxy_codec_input.setText(proxy_settings.get('codec', 'h264'))
-                self.proxy_crf_input.setText(str(proxy_settings.get('crf', 23)))
-                
-                # Set DaVinci template path
-                self.template_path_label.setText(config.get('davinci_template_path', 'No file selected'))
-                
-                # Set logging settings
-                logging_config = config.get('logging', {})
-                self.log_level_input.setText(logging_config.get('level', 'INFO'))
-                
-                log_path = logging_config.get('file_path', '../logs/workflow.log')
-                log_dir = os.path.dirname(log_path)
-                self.log_path_label.setText(log_dir if log_dir else 'No directory selected')
+            proxy_settings = config.get('proxy_settings', {})
+            self.proxy_resolution_input.setText(proxy_settings.get('resolution', '1280x720'))
+            self.proxy_codec_input.setText(proxy_settings.get('codec', 'h264'))
+            self.proxy_crf_input.setText(str(proxy_settings.get('crf', 23)))
+            
+            # Set DaVinci template path
+            self.template_path_label.setText(config.get('davinci_template_path', 'No file selected'))
+            
+            # Set logging settings
+            logging_config = config.get('logging', {})
+            self.log_level_input.setText(logging_config.get('level', 'INFO'))
+            
+            log_path = logging_config.get('file_path', '../logs/workflow.log')
+            log_dir = os.path.dirname(log_path)
+            self.log_path_label.setText(log_dir if log_dir else 'No directory selected')
         except Exception as e:
             show_error(self, "Error", f"Failed to load configuration: {e}")
     
@@ -264,19 +268,14 @@ class ConfigTab(QWidget):
                 }
             }
             
-            # Get the config file path
-            script_dir = Path(__file__).resolve().parent.parent.parent.parent
-            config_path = script_dir / 'config' / 'config.json'
-            
-            # Create config directory if it doesn't exist
-            os.makedirs(config_path.parent, exist_ok=True)
-            
-            # Write config to file
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=4)
+            # Merged into the existing settings, so those this tab does not edit
+            # (e.g. upload tuning, async logging) are kept; written atomically
+            manager = get_config_manager()
+            if not manager.update_config(config):
+                raise OSError(f"could not write {manager.config_path}")
             
             # Emit signal
-            self.config_saved.emit(config)
+            self.config_saved.emit(manager.get_config())
             
             show_info(self, "Success", "Configuration saved successfully")
         except Exception as e:
@@ -4,12 +4,9 @@ Export Watcher Tab for the Video Workflow Application
 
 import os
 import sys
-import json
 import time
-import shutil
 import threading
 from pathlib import Path
-from datetime import datetime
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget,
@@ -21,8 +18,17 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from ..ui_template import (
     create_group_box, create_button, create_directory_selector,
     create_checkbox, show_info, show_error, create_list_widget, 
-    create_text_edit, create_horizontal_separator
+    create_log_view, create_horizontal_separator
 )
+from ..log_sink import LogSink, MAX_LOG_LINES
+
+# Import workflow steps
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from bulk_io import IOSettings
+from logger import log_event, new_job_id
+from config_manager import get_config_manager
+from tracing import traced
+import workflow
 
 class ExportWatcherTab(QWidget):
     """Export watcher tab for monitoring and moving exported files."""
@@ -38,6 +44,7 @@ class ExportWatcherTab(QWidget):
         # Initialize properties
         self.is_running = False
         self.watcher_thread = None
+        self.job_id = None
         
         # Initialize UI
         self.init_ui()
@@ -113,7 +120,8 @@ class ExportWatcherTab(QWidget):
         self.log_group, self.log_layout = create_group_box("Activity Log")
         
         # Log text area
-        self.log_text = create_text_edit()
+        self.log_text = create_log_view(MAX_LOG_LINES)
+        self.log_sink = LogSink(self.log_text)
         self.log_layout.addWidget(self.log_text)
         
         # Add log group to content layout
@@ -156,7 +164,8 @@ class ExportWatcherTab(QWidget):
         self.stop_button.clicked.connect(self.stop_watching)
         
         # Connect thread signals
-        self.log_message_signal.connect(self.log_message)
+        # Delivered on the emitting thread; the sink batches lines for the GUI
+        self.log_message_signal.connect(self.log_message, Qt.ConnectionType.DirectConnection)
         self.file_detected_signal.connect(self.on_file_detected)
         self.file_moved_signal.connect(self.on_file_moved)
     
@@ -167,23 +176,17 @@ class ExportWatcherTab(QWidget):
             label.setText(directory)
     
     def load_config(self):
-        """Load configuration from file."""
+        """Load configuration from the shared configuration service."""
         try:
-            # Get the config file path
-            script_dir = Path(__file__).resolve().parent.parent.parent.parent
-            config_path = script_dir / 'config' / 'config.json'
+            config = get_config_manager().get_config()
+            
+            # Set watch directory (this would typically be DaVinci's export folder)
+            # For now, we'll use a placeholder
             
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                
-                # Set watch directory (this would typically be DaVinci's export folder)
-                # For now, we'll use a placeholder
-                
-                # Set destination directory from master_path
-                master_path = config.get('master_path', '')
-                if master_path:
-                    self.dest_dir_label.setText(master_path)
+            # Set destination directory from master_path
+            master_path = config.get('master_path', '')
+            if master_path:
+                self.dest_dir_label.setText(master_path)
         except Exception as e:
             self.log_message(f"Failed to load configuration: {e}")
     
@@ -207,6 +210,7 @@ class ExportWatcherTab(QWidget):
             
             # Start watcher thread
             self.is_running = True
+            self.job_id = new_job_id("export")
             self.watcher_thread = threading.Thread(
                 target=self.watch_directory,
                 args=(watch_dir, dest_dir),
@@ -223,14 +227,14 @@ class ExportWatcherTab(QWidget):
         """Watch directory for new files in a separate thread."""
         try:
             # Get initial list of files
-            initial_files = set(os.path.join(watch_dir, f) for f in os.listdir(watch_dir) if os.path.isfile(os.path.join(watch_dir, f)))
+            initial_files = workflow.list_files(watch_dir)
             
             self.log_message_signal.emit(f"Found {len(initial_files)} existing files in watch directory")
             
             while self.is_running:
                 try:
                     # Get current list of files
-                    current_files = set(os.path.join(watch_dir, f) for f in os.listdir(watch_dir) if os.path.isfile(os.path.join(watch_dir, f)))
+                    current_files = workflow.list_files(watch_dir)
                     
                     # Check for new files
                     new_files = current_files - initial_files
@@ -252,35 +256,17 @@ class ExportWatcherTab(QWidget):
         except Exception as e:
             self.log_message_signal.emit(f"Error in watcher thread: {e}")
     
+    @traced()
     def move_file(self, source_path, dest_dir):
         """Move a file to the destination directory."""
         try:
-            # Get file name
-            file_name = os.path.basename(source_path)
-            
-            # Create destination path
-            if self.dated_folders_checkbox.isChecked():
-                # Create dated folder
-                date_folder = datetime.now().strftime("%Y-%m-%d")
-                dest_folder = os.path.join(dest_dir, date_folder)
-                os.makedirs(dest_folder, exist_ok=True)
-            else:
-                dest_folder = dest_dir
-            
-            # Rename file if needed
-            if self.rename_checkbox.isChecked():
-                # Add timestamp to file name
-                base_name, ext = os.path.splitext(file_name)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                new_file_name = f"{base_name}_{timestamp}{ext}"
-            else:
-                new_file_name = file_name
-            
-            # Create destination path
-            dest_path = os.path.join(dest_folder, new_file_name)
-            
-            # Move file
-            shutil.move(source_path, dest_path)
+            dest_path = workflow.move_export(
+                source_path, dest_dir,
+                dated_folders=self.dated_folders_checkbox.isChecked(),
+                rename=self.rename_checkbox.isChecked(),
+                job_id=self.job_id, log=self.log_message_signal.emit,
+                io=IOSettings.from_config(get_config_manager().get_config())
+            )
             
             # Signal file moved
             self.file_moved_signal.emit(source_path, dest_path)
@@ -310,10 +296,9 @@ class ExportWatcherTab(QWidget):
         self.log_message("Stopped watching for exported files")
     
     def log_message(self, message):
-        """Add a message to the log."""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
+        """Add a message to the log; safe to call from worker threads."""
+        self.log_sink.write(message)
+        log_event("export", message, job_id=self.job_id)
     
     def run(self):
         """Run the export watcher workflow."""
@@ -4,7 +4,6 @@ Folder Structure Generator Tab for the Video Workflow Application
 
 import os
 import sys
-import json
 import threading
 from pathlib import Path
 from datetime import datetime
@@ -19,9 +18,16 @@ from PyQt6.QtGui import QFont
 # Import UI template components
 from ..ui_template import (
     create_group_box, create_button, create_directory_selector,
-    create_checkbox, show_info, show_error, create_text_edit,
+    create_checkbox, show_info, show_error, create_log_view,
     create_horizontal_separator, create_input_field
 )
+from ..log_sink import LogSink, MAX_LOG_LINES
+
+# Import structured logging
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from logger import log_event, new_job_id
+from config_manager import get_config_manager
+import workflow
 
 class FolderStructureTab(QWidget):
     """Folder structure generator tab for creating project directories."""
@@ -36,6 +42,7 @@ class FolderStructureTab(QWidget):
         # Initialize properties
         self.is_running = False
         self.structure_thread = None
+        self.job_id = None
         
         # Initialize UI
         self.init_ui()
@@ -290,7 +297,8 @@ class FolderStructureTab(QWidget):
         self.log_group, self.log_layout = create_group_box("Activity Log")
         
         # Log text area
-        self.log_text = create_text_edit()
+        self.log_text = create_log_view(MAX_LOG_LINES)
+        self.log_sink = LogSink(self.log_text)
         self.log_layout.addWidget(self.log_text)
         
         # Add log group to content layout
@@ -338,7 +346,8 @@ class FolderStructureTab(QWidget):
         # DaVinci button is already connected in init_ui
         
         # Connect thread signals
-        self.log_message_signal.connect(self.log_message)
+        # Delivered on the emitting thread; the sink batches lines for the GUI
+        self.log_message_signal.connect(self.log_message, Qt.ConnectionType.DirectConnection)
         self.structure_created_signal.connect(self.on_structure_created)
     
     def browse_directory(self, label, caption):
@@ -361,25 +370,19 @@ class FolderStructureTab(QWidget):
     # Template handling is now automatic
     
     def load_config(self):
-        """Load configuration from file."""
+        """Load configuration from the shared configuration service."""
         try:
-            # Get the config file path
-            script_dir = Path(__file__).resolve().parent.parent.parent.parent
-            config_path = script_dir / 'config' / 'config.json'
+            config = get_config_manager().get_config()
             
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                
-                # Set base directory from raw_path
-                raw_path = config.get('raw_path', '')
-                if raw_path:
-                    self.base_dir_label.setText(raw_path)
-                
-                # Set DaVinci template option based on config
-                davinci_template_path = config.get('davinci_template_path', '')
-                # Template will be used automatically if available
-                self.use_davinci_template = bool(davinci_template_path)
+            # Set base directory from raw_path
+            raw_path = config.get('raw_path', '')
+            if raw_path:
+                self.base_dir_label.setText(raw_path)
+            
+            # Set DaVinci template option based on config
+            davinci_template_path = config.get('davinci_template_path', '')
+            # Template will be used automatically if available
+            self.use_davinci_template = bool(davinci_template_path)
         except Exception as e:
             self.log_message(f"Failed to load configuration: {e}")
     
@@ -397,6 +400,8 @@ class FolderStructureTab(QWidget):
                 show_error(self, "Error", "Please select a valid base directory")
                 return
             
+            self.job_id = new_job_id("structure")
+            
             # Get date - use current date or custom selected date
             if self.use_current_date_checkbox.isChecked():
                 date_str = datetime.now().strftime("%Y-%m-%d")
@@ -454,47 +459,20 @@ class FolderStructureTab(QWidget):
     def create_structure(self, base_dir, date_str, project_name, folders):
         """Create the folder structure in a separate thread."""
         try:
-            # Create project directory
-            project_dir = os.path.join(base_dir, date_str, project_name)
-            os.makedirs(project_dir, exist_ok=True)
-            self.log_message_signal.emit(f"Created project directory: {project_dir}")
-            
-            # Create subfolders
-            for folder in folders:
-                if not self.is_running:
-                    self.log_message_signal.emit("Folder creation cancelled")
-                    return
-                
-                folder_path = os.path.join(project_dir, folder)
-                os.makedirs(folder_path, exist_ok=True)
-                self.log_message_signal.emit(f"Created folder: {folder_path}")
-            
-            # Copy DaVinci template if enabled
+            # Get template path from the current configuration
+            template_path = None
             if self.use_davinci_template:
-                try:
-                    # Get template path from config
-                    script_dir = Path(__file__).resolve().parent.parent.parent.parent
-                    config_path = script_dir / 'config' / 'config.json'
-                    
-                    with open(config_path, 'r') as f:
-                        config = json.load(f)
-                    
-                    template_path = config.get('davinci_template_path', '')
-                    
-                    if template_path and Path(template_path).is_file():
-                        import shutil
-                        # Use Path objects for cross-platform compatibility
-                        template_file = Path(template_path)
-                        dest_path = Path(project_dir) / template_file.name
-                        shutil.copy2(template_file, dest_path)
-                        self.log_message_signal.emit(f"Copied DaVinci template to: {dest_path}")
-                    else:
-                        self.log_message_signal.emit("DaVinci template not found or not configured")
-                except Exception as e:
-                    self.log_message_signal.emit(f"Error copying DaVinci template: {e}")
+                template_path = get_config_manager().get_config().get('davinci_template_path', '')
+            
+            project_dir = workflow.create_project_structure(
+                base_dir, date_str, project_name, folders, template_path,
+                log=self.log_message_signal.emit,
+                is_cancelled=lambda: not self.is_running
+            )
             
             # Signal completion
-            self.structure_created_signal.emit()
+            if project_dir is not None:
+                self.structure_created_signal.emit()
         except Exception as e:
             self.log_message_signal.emit(f"Error creating folder structure: {e}")
     
@@ -512,10 +490,9 @@ class FolderStructureTab(QWidget):
         show_info(self, "Success", "Folder structure created successfully")
     
     def log_message(self, message):
-        """Add a message to the log."""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
+        """Add a message to the log; safe to call from worker threads."""
+        self.log_sink.write(message)
+        log_event("structure", message, job_id=self.job_id)
     
     def run(self):
         """Run the folder structure creation workflow."""
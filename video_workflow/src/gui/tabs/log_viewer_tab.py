@@ -4,26 +4,89 @@ Log Viewer Tab for the Video Workflow Application
 
 import os
 import sys
+import logging
 import threading
 from pathlib import Path
+from datetime import datetime
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
     QFileDialog, QSplitter, QSizePolicy, QScrollArea, QFrame
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QAbstractListModel, QModelIndex
 
 # Import UI template components
 from ..ui_template import (
     create_group_box, create_button, create_directory_selector,
-    create_combo_box, create_text_edit, create_horizontal_separator
+    create_combo_box, create_log_view, create_list_view, create_input_field,
+    create_horizontal_separator
 )
 
+# Import log tail follower and index
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from log_tail import LogTailer
+from log_index import LogIndex
+
+# Lines kept in the view; older lines are discarded as new ones arrive
+MAX_VIEW_LINES = 5000
+
+# Minimum level choices for the search filter
+LEVEL_CHOICES = {
+    "All levels": 0,
+    "DEBUG and above": logging.DEBUG,
+    "INFO and above": logging.INFO,
+    "WARNING and above": logging.WARNING,
+    "ERROR and above": logging.ERROR
+}
+
+# Accepted formats for the time range filter
+TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+class LogSelectionModel(QAbstractListModel):
+    """List model over a LogSelection that reads lines from disk a page at a time."""
+    
+    PAGE_SIZE = 500
+    MAX_PAGES = 20
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.selection = None
+        self.pages = {}
+    
+    def set_selection(self, selection):
+        """Show a new selection."""
+        self.beginResetModel()
+        self.selection = selection
+        self.pages = {}
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.selection is None:
+            return 0
+        return len(self.selection)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        page_number, position = divmod(index.row(), self.PAGE_SIZE)
+        page = self.pages.get(page_number)
+        if page is None:
+            # Keep only a few pages in memory
+            if len(self.pages) >= self.MAX_PAGES:
+                self.pages.pop(next(iter(self.pages)))
+            page = self.selection.lines(page_number * self.PAGE_SIZE, self.PAGE_SIZE)
+            self.pages[page_number] = page
+        return page[position] if position < len(page) else ""
+
+
 class LogViewerTab(QWidget):
     """Log viewer tab for viewing application logs."""
     
     # Signals for thread-safe UI updates
-    log_content_signal = pyqtSignal(str)
+    log_content_signal = pyqtSignal(str, str)  # new text, rotation event
+    search_result_signal = pyqtSignal(object, str)  # LogSelection or None, status
+    index_updated_signal = pyqtSignal(object)  # LogIndex that gained lines
     
     def __init__(self):
         super().__init__()
@@ -33,6 +96,12 @@ class LogViewerTab(QWidget):
         self.current_log = None
         self.auto_refresh = False
         self.refresh_timer = None
+        self.tailer = None
+        self.read_lock = threading.Lock()
+        self.index = None
+        self.index_lock = threading.Lock()
+        self.search_filters = None
+        self.search_cancel = threading.Event()
         
         # Initialize UI
         self.init_ui()
@@ -101,13 +170,52 @@ class LogViewerTab(QWidget):
         # Log content group
         self.content_group, self.content_layout = create_group_box("Log Content")
         
-        # Log text area
-        self.log_text = create_text_edit()
+        # Log text area, capped so appending never grows without bound
+        self.log_text = create_log_view(MAX_VIEW_LINES)
         self.content_layout.addWidget(self.log_text)
         
         # Add content group to content layout
         content_layout.addWidget(self.content_group)
         
+        # Search group; covers the selected log and its rotated backups
+        self.search_group, self.search_layout = create_group_box("Search")
+        
+        filter_layout = QHBoxLayout()
+        self.level_combo = create_combo_box(list(LEVEL_CHOICES))
+        filter_layout.addWidget(self.level_combo)
+        self.job_combo = create_combo_box(["All jobs"])
+        self.job_combo.setEditable(True)
+        filter_layout.addWidget(self.job_combo, 1)
+        self.search_layout.addLayout(filter_layout)
+        
+        self.from_container, self.from_input = create_input_field("From:")
+        self.from_input.setPlaceholderText("YYYY-MM-DD HH:MM (optional)")
+        self.search_layout.addWidget(self.from_container)
+        
+        self.to_container, self.to_input = create_input_field("To:")
+        self.to_input.setPlaceholderText("YYYY-MM-DD HH:MM (optional)")
+        self.search_layout.addWidget(self.to_container)
+        
+        self.pattern_container, self.pattern_input = create_input_field("Regex:")
+        self.pattern_input.setPlaceholderText("Regular expression (optional, case-insensitive)")
+        self.search_layout.addWidget(self.pattern_container)
+        
+        search_button_layout = QHBoxLayout()
+        self.search_button = create_button("Search")
+        search_button_layout.addWidget(self.search_button)
+        self.search_status_label = QLabel("")
+        search_button_layout.addWidget(self.search_status_label, 1)
+        self.search_layout.addLayout(search_button_layout)
+        
+        # Results are paged in from disk as they scroll into view
+        self.result_model = LogSelectionModel(self)
+        self.result_view = create_list_view()
+        self.result_view.setModel(self.result_model)
+        self.result_view.setMinimumHeight(300)
+        self.search_layout.addWidget(self.result_view)
+        
+        content_layout.addWidget(self.search_group)
+        
         # Add separator
         content_layout.addWidget(create_horizontal_separator())
         
@@ -140,13 +248,18 @@ class LogViewerTab(QWidget):
         # Connect buttons
         self.log_dir_button.clicked.connect(lambda: self.browse_directory(self.log_dir_label, "Select Log Directory"))
         self.refresh_button.clicked.connect(self.refresh_log)
+        self.refresh_button.clicked.connect(self.refresh_index)
         self.auto_refresh_button.clicked.connect(self.toggle_auto_refresh)
+        self.search_button.clicked.connect(self.search_logs)
+        self.pattern_input.returnPressed.connect(self.search_logs)
         
         # Connect combo box
         self.log_file_combo.currentIndexChanged.connect(self.on_log_file_changed)
         
         # Connect thread signals
         self.log_content_signal.connect(self.update_log_content)
+        self.search_result_signal.connect(self.on_search_result)
+        self.index_updated_signal.connect(self.on_index_updated)
     
     def browse_directory(self, label, caption):
         """Open directory browser dialog."""
@@ -185,41 +298,178 @@ class LogViewerTab(QWidget):
                 self.log_file_combo.setCurrentIndex(0)
                 self.on_log_file_changed(0)
         except Exception as e:
-            self.log_text.setText(f"Error finding log files: {e}")
+            self.log_text.setPlainText(f"Error finding log files: {e}")
     
     def on_log_file_changed(self, index):
         """Handle log file selection change."""
         if index >= 0 and index < len(self.log_files):
             self.current_log = self.log_files[index]
+            
+            # Start following the new file from near its end
+            self.tailer = LogTailer(self.current_log)
+            self.index = LogIndex(self.current_log)
+            self.search_filters = None
+            self.log_text.clear()
+            self.result_model.set_selection(None)
+            self.search_status_label.setText("")
             self.refresh_log()
     
     def refresh_log(self):
-        """Refresh the log content."""
-        if self.current_log and os.path.isfile(self.current_log):
-            # Start thread to read log file
+        """Read any new log content."""
+        if self.tailer and os.path.isfile(self.current_log):
+            # Skip this refresh if the previous read is still running
+            if not self.read_lock.acquire(blocking=False):
+                return
             threading.Thread(
                 target=self.read_log_file,
-                args=(self.current_log,),
+                args=(self.tailer,),
                 daemon=True
             ).start()
     
-    def read_log_file(self, log_file):
-        """Read log file in a separate thread."""
+    def read_log_file(self, tailer):
+        """Read lines appended to the log file in a separate thread."""
         try:
-            with open(log_file, 'r') as f:
-                content = f.read()
-            
-            self.log_content_signal.emit(content)
+            content, event = tailer.read_new()
+            # Drop output from a file that is no longer selected
+            if (content or event) and tailer is self.tailer:
+                self.log_content_signal.emit(content, event or "")
         except Exception as e:
-            self.log_content_signal.emit(f"Error reading log file: {e}")
-    
-    def update_log_content(self, content):
-        """Update the log content in the UI."""
-        self.log_text.setText(content)
+            self.log_content_signal.emit(f"Error reading log file: {e}\n", "")
+        finally:
+            self.read_lock.release()
         
-        # Scroll to bottom
+        # Read again without waiting for the timer if the selection changed
+        # meanwhile or a large backlog remains
+        if tailer is not self.tailer or not tailer.caught_up:
+            self.refresh_log()
+    
+    def update_log_content(self, content, event):
+        """Append new log content to the view."""
+        # Only follow the end if the user has not scrolled up
         scrollbar = self.log_text.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        
+        if event:
+            self.log_text.appendPlainText(f"--- log file {event} ---")
+        if content:
+            self.log_text.appendPlainText(content.rstrip("\n"))
+        
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+    
+    def parse_time(self, text):
+        """Parse a time filter value, returning epoch seconds or None."""
+        text = text.strip()
+        if not text:
+            return None
+        for time_format in TIME_FORMATS:
+            try:
+                return datetime.strptime(text, time_format).timestamp()
+            except ValueError:
+                pass
+        raise ValueError(f"Invalid time '{text}', use YYYY-MM-DD HH:MM")
+    
+    def search_logs(self):
+        """Index the logs and run a search in a background thread."""
+        if self.index is None:
+            self.search_status_label.setText("No log file selected")
+            return
+        try:
+            job = self.job_combo.currentText().strip()
+            filters = {
+                "min_level": LEVEL_CHOICES.get(self.level_combo.currentText(), 0),
+                "start_time": self.parse_time(self.from_input.text()),
+                "end_time": self.parse_time(self.to_input.text()),
+                "job": job if job and job != "All jobs" else None,
+                "pattern": self.pattern_input.text() or None
+            }
+        except ValueError as e:
+            self.search_status_label.setText(str(e))
+            return
+        
+        self.search_filters = filters
+        self.start_search(filters)
+    
+    def start_search(self, filters):
+        """Run a search with the given filters in a background thread."""
+        # Abandon a search that is still running
+        self.search_cancel.set()
+        self.search_cancel = threading.Event()
+        self.search_status_label.setText("Searching...")
+        
+        threading.Thread(
+            target=self.run_search,
+            args=(self.index, filters, self.search_cancel),
+            daemon=True
+        ).start()
+    
+    def run_search(self, index, filters, cancel_event):
+        """Bring the index up to date and query it in a separate thread."""
+        try:
+            total = index.refresh()
+            selection = index.query(cancel_event=cancel_event, **filters)
+            if selection is None or cancel_event.is_set():
+                return
+            self.search_result_signal.emit(
+                selection, f"{len(selection):,} of {total:,} lines in {len(index.segments)} files"
+            )
+        except Exception as e:
+            self.search_result_signal.emit(None, f"Search failed: {e}")
+    
+    def refresh_index(self):
+        """Index new log lines in a background thread."""
+        if self.index is None:
+            return
+        # Skip this refresh if the previous one is still running
+        if not self.index_lock.acquire(blocking=False):
+            return
+        threading.Thread(
+            target=self.update_index,
+            args=(self.index,),
+            daemon=True
+        ).start()
+    
+    def update_index(self, index):
+        """Bring the index up to date in a separate thread."""
+        try:
+            before = index.line_count
+            if index.refresh() != before and index is self.index:
+                self.index_updated_signal.emit(index)
+        except Exception as e:
+            self.search_result_signal.emit(None, f"Indexing failed: {e}")
+        finally:
+            self.index_lock.release()
+    
+    def on_index_updated(self, index):
+        """Keep the job filter and search results current as the log grows."""
+        if index is not self.index:
+            return
+        self.update_job_filter()
+        
+        # Re-run the last search to page in new matches, unless the user
+        # has scrolled up through the results
+        scrollbar = self.result_view.verticalScrollBar()
+        if self.search_filters is not None and scrollbar.value() >= scrollbar.maximum() - 2:
+            self.start_search(self.search_filters)
+    
+    def on_search_result(self, selection, status):
+        """Show search results."""
+        self.search_status_label.setText(status)
+        if selection is None:
+            return
+        self.result_model.set_selection(selection)
+        self.result_view.scrollToBottom()
+        self.update_job_filter()
+    
+    def update_job_filter(self):
+        """Offer the jobs seen so far in the job filter."""
+        current = self.job_combo.currentText()
+        self.job_combo.blockSignals(True)
+        self.job_combo.clear()
+        self.job_combo.addItem("All jobs")
+        self.job_combo.addItems(sorted(self.index.jobs(), reverse=True))
+        self.job_combo.setCurrentText(current)
+        self.job_combo.blockSignals(False)
     
     def toggle_auto_refresh(self):
         """Toggle auto refresh of log content."""
@@ -232,6 +482,7 @@ class LogViewerTab(QWidget):
             if not self.refresh_timer:
                 self.refresh_timer = QTimer(self)
                 self.refresh_timer.timeout.connect(self.refresh_log)
+                self.refresh_timer.timeout.connect(self.refresh_index)
             
             self.refresh_timer.start(2000)  # Refresh every 2 seconds
         else:
@@ -248,6 +499,7 @@ class LogViewerTab(QWidget):
     
     def stop(self):
         """Stop the log viewer workflow."""
+        self.search_cancel.set()
         # Stop auto refresh if enabled
         if self.auto_refresh:
             self.toggle_auto_refresh()
@@ -4,9 +4,7 @@ Proxy Generator Tab for the Video Workflow Application
 
 import os
 import sys
-import json
 import threading
-import subprocess
 from pathlib import Path
 
 from PyQt6.QtWidgets import (
@@ -20,9 +18,19 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from ..ui_template import (
     create_group_box, create_button, create_directory_selector,
     create_input_field, create_progress_bar, create_combo_box,
-    show_info, show_error, create_list_widget, create_text_edit,
+    show_info, show_error, create_list_widget, create_log_view,
     create_horizontal_separator
 )
+from ..log_sink import LogSink, MAX_LOG_LINES
+from ..progress_sampler import get_progress_sampler
+
+# Import structured logging
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from logger import log_event, new_job_id
+from config_manager import get_config_manager
+from progress import get_progress_bus
+from tracing import traced
+import workflow
 
 class ProxyGeneratorTab(QWidget):
     """Proxy generator tab for creating proxy video files."""
@@ -30,7 +38,6 @@ class ProxyGeneratorTab(QWidget):
     # Signals for thread-safe UI updates
     log_message_signal = pyqtSignal(str)
     file_found_signal = pyqtSignal(str)
-    proxy_progress_signal = pyqtSignal(int, int)  # current, total
     proxy_complete_signal = pyqtSignal()
     
     def __init__(self):
@@ -39,6 +46,7 @@ class ProxyGeneratorTab(QWidget):
         # Initialize properties
         self.is_running = False
         self.proxy_thread = None
+        self.job_id = None
         
         # Initialize UI
         self.init_ui()
@@ -250,7 +258,8 @@ class ProxyGeneratorTab(QWidget):
         self.log_group, self.log_layout = create_group_box("Activity Log")
         
         # Log text area
-        self.log_text = create_text_edit()
+        self.log_text = create_log_view(MAX_LOG_LINES)
+        self.log_sink = LogSink(self.log_text)
         self.log_layout.addWidget(self.log_text)
         
         # Add log group to content layout
@@ -295,9 +304,9 @@ class ProxyGeneratorTab(QWidget):
         self.cancel_button.clicked.connect(self.cancel_generation)
         
         # Connect thread signals
-        self.log_message_signal.connect(self.log_message)
+        # Delivered on the emitting thread; the sink batches lines for the GUI
+        self.log_message_signal.connect(self.log_message, Qt.ConnectionType.DirectConnection)
         self.file_found_signal.connect(self.on_file_found)
-        self.proxy_progress_signal.connect(self.update_progress)
         self.proxy_complete_signal.connect(self.on_proxy_complete)
     
     def browse_directory(self, label, caption):
@@ -307,34 +316,29 @@ class ProxyGeneratorTab(QWidget):
             label.setText(directory)
     
     def load_config(self):
-        """Load configuration from file."""
+        """Load configuration from the shared configuration service."""
         try:
-            # Get the config file path
-            script_dir = Path(__file__).resolve().parent.parent.parent.parent
-            config_path = script_dir / 'config' / 'config.json'
+            config = get_config_manager().get_config()
             
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                
-                # Set source directory from raw_path
-                raw_path = config.get('raw_path', '')
-                if raw_path:
-                    self.source_dir_label.setText(raw_path)
-                
-                # Set proxy settings
-                proxy_settings = config.get('proxy_settings', {})
-                self.resolution_input.setText(proxy_settings.get('resolution', '1280x720'))
-                
-                codec = proxy_settings.get('codec', 'h264')
-                index = self.codec_combo.findText(codec)
-                if index >= 0:
-                    self.codec_combo.setCurrentIndex(index)
-                
-                self.crf_spin.setValue(proxy_settings.get('crf', 23))
+            # Set source directory from raw_path
+            raw_path = config.get('raw_path', '')
+            if raw_path:
+                self.source_dir_label.setText(raw_path)
+            
+            # Set proxy settings
+            proxy_settings = config.get('proxy_settings', {})
+            self.resolution_input.setText(proxy_settings.get('resolution', '1280x720'))
+            
+            codec = proxy_settings.get('codec', 'h264')
+            index = self.codec_combo.findText(codec)
+            if index >= 0:
+                self.codec_combo.setCurrentIndex(index)
+            
+            self.crf_spin.setValue(proxy_settings.get('crf', 23))
         except Exception as e:
             self.log_message(f"Failed to load configuration: {e}")
     
+    @traced()
     def scan_video_files(self):
         """Scan for video files in the source directory."""
         try:
@@ -346,13 +350,8 @@ class ProxyGeneratorTab(QWidget):
             self.log_message(f"Scanning for video files in {source_dir}...")
             self.file_list.clear()
             
-            # Get video extensions from config
-            script_dir = Path(__file__).resolve().parent.parent.parent.parent
-            config_path = script_dir / 'config' / 'config.json'
-            
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-            
+            # Get video extensions from the current configuration
+            config = get_config_manager().get_config()
             video_extensions = config.get('video_extensions', [".mp4", ".mov"])
             
             # Start scan thread
@@ -371,33 +370,22 @@ class ProxyGeneratorTab(QWidget):
             # Show progress message
             self.log_message_signal.emit("Starting file scan (this may take a moment)...")
             
-            # Create a set of extensions for faster lookup
-            ext_set = set(extensions)
             count = 0
             max_files = 1000  # Limit to prevent excessive scanning
             
-            # Use a more efficient approach with a progress indicator
-            for root, dirs, files in os.walk(directory):
-                # Skip hidden directories (starting with .)
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for file_path in workflow.scan_video_files(directory, extensions, max_depth=None):
+                self.file_found_signal.emit(file_path)
+                count += 1
                 
-                # Update progress every 10 directories
-                if count % 10 == 0:
+                # Update progress every 100 files
+                if count % 100 == 0:
                     self.log_message_signal.emit(f"Scanning... found {count} files so far")
                 
-                # Process files in this directory
-                for file in files:
-                    # Check extension using set membership for speed
-                    if any(file.lower().endswith(ext) for ext in ext_set):
-                        file_path = os.path.join(root, file)
-                        self.file_found_signal.emit(file_path)
-                        count += 1
-                        
-                        # Limit the number of files to prevent excessive scanning
-                        if count >= max_files:
-                            self.log_message_signal.emit(f"Reached limit of {max_files} files. Stopping scan.")
-                            self.log_message_signal.emit(f"Found {count} video files (limited to first {max_files})")
-                            return
+                # Limit the number of files to prevent excessive scanning
+                if count >= max_files:
+                    self.log_message_signal.emit(f"Reached limit of {max_files} files. Stopping scan.")
+                    self.log_message_signal.emit(f"Found {count} video files (limited to first {max_files})")
+                    return
             
             if count == 0:
                 self.log_message_signal.emit("No video files found")
@@ -450,9 +438,12 @@ class ProxyGeneratorTab(QWidget):
             
             # Start proxy generation thread
             self.is_running = True
+            self.job_id = new_job_id("proxy")
+            job = get_progress_bus().start("proxy", job_id=self.job_id, total=len(files))
+            get_progress_sampler().track(job, self.progress_bar, self.current_file_label)
             self.proxy_thread = threading.Thread(
                 target=self.convert_files,
-                args=(files, dest_dir, resolution, codec, crf),
+                args=(files, dest_dir, resolution, codec, crf, job),
                 daemon=True
             )
             self.proxy_thread.start()
@@ -462,85 +453,20 @@ class ProxyGeneratorTab(QWidget):
             self.log_message(f"Error starting proxy generation: {e}")
             show_error(self, "Error", f"Failed to start proxy generation: {e}")
     
-    def convert_files(self, files, dest_dir, resolution, codec, crf):
+    @traced()
+    def convert_files(self, files, dest_dir, resolution, codec, crf, job):
         """Convert files in a separate thread."""
         try:
-            total_files = len(files)
-            
-            for i, file_path in enumerate(files):
-                if not self.is_running:
-                    self.log_message_signal.emit("Proxy generation cancelled")
-                    break
-                
-                # Get file name
-                file_name = os.path.basename(file_path)
-                base_name, _ = os.path.splitext(file_name)
-                
-                # Create destination path
-                dest_path = os.path.join(dest_dir, f"{base_name}_proxy.mp4")
-                
-                # Update UI
-                self.log_message_signal.emit(f"Converting {file_name}...")
-                self.current_file_label.setText(f"Converting: {file_name}")
-                
-                # Convert file
-                success = self.convert_file(file_path, dest_path, resolution, codec, crf)
-                
-                if success:
-                    self.log_message_signal.emit(f"Successfully converted {file_name}")
-                else:
-                    self.log_message_signal.emit(f"Failed to convert {file_name}")
-                
-                # Update progress
-                self.proxy_progress_signal.emit(i + 1, total_files)
-            
+            # Sampled by the GUI; workers never touch widgets
+            workflow.generate_proxies(
+                files, dest_dir, resolution, codec, crf, job, job_id=self.job_id,
+                log=self.log_message_signal.emit,
+                is_cancelled=lambda: not self.is_running
+            )
             self.proxy_complete_signal.emit()
         except Exception as e:
             self.log_message_signal.emit(f"Error during proxy generation: {e}")
     
-    def convert_file(self, source, destination, resolution, codec, crf):
-        """Convert a file using ffmpeg."""
-        try:
-            # Build ffmpeg command
-            cmd = [
-                "ffmpeg",
-                "-i", source,
-                "-vf", f"scale={resolution}",
-                "-c:v", codec,
-                "-crf", str(crf),
-                "-preset", "fast",
-                "-c:a", "aac",
-                "-b:a", "128k",
-                "-y",  # Overwrite output files
-                destination
-            ]
-            
-            # Run ffmpeg
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
-            )
-            
-            # Wait for process to complete
-            stdout, stderr = process.communicate()
-            
-            # Check if successful
-            if process.returncode != 0:
-                self.log_message_signal.emit(f"ffmpeg error: {stderr}")
-                return False
-            
-            return True
-        except Exception as e:
-            self.log_message_signal.emit(f"Error converting file {source}: {e}")
-            return False
-    
-    def update_progress(self, current, total):
-        """Update the progress bar."""
-        progress = int((current / total) * 100) if total > 0 else 0
-        self.progress_bar.setValue(progress)
-    
     def on_proxy_complete(self):
         """Handle proxy generation completion."""
         self.generate_button.setEnabled(True)
@@ -568,10 +494,9 @@ class ProxyGeneratorTab(QWidget):
             self.crf_value.setText(str(self.crf_value_int))
             
     def log_message(self, message):
-        """Add a message to the log."""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
+        """Add a message to the log; safe to call from worker threads."""
+        self.log_sink.write(message)
+        log_event("proxy", message, job_id=self.job_id)
     
     def run(self):
         """Run the proxy generation workflow."""
@@ -17,13 +17,20 @@ from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 # Import UI template components
 from ..ui_template import (
     create_group_box, create_button, create_progress_bar, 
-    show_info, show_error, create_list_widget, create_text_edit,
+    show_info, show_error, create_list_widget, create_log_view,
     create_horizontal_separator
 )
+from ..log_sink import LogSink, MAX_LOG_LINES
+from ..progress_sampler import get_progress_sampler
 
 # Import disk monitor
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
-from disk_monitor import DiskMonitor
+from disk_monitor import get_disk_monitor
+from config_manager import get_config_manager
+from logger import log_event, new_job_id
+from progress import get_progress_bus
+from tracing import traced
+import workflow
 
 class SDDetectionTab(QWidget):
     """SD Card detection and file import tab."""
@@ -31,7 +38,6 @@ class SDDetectionTab(QWidget):
     # Signals for thread-safe UI updates
     sd_detected_signal = pyqtSignal(str)
     file_found_signal = pyqtSignal(str)
-    copy_progress_signal = pyqtSignal(int, int)  # current, total
     copy_complete_signal = pyqtSignal()
     log_message_signal = pyqtSignal(str)
     scan_progress_signal = pyqtSignal(int, int)  # current, total
@@ -40,10 +46,11 @@ class SDDetectionTab(QWidget):
         super().__init__()
         
         # Initialize properties
-        self.disk_monitor = DiskMonitor()
+        self.disk_monitor = get_disk_monitor()
         self.sd_cards = []
         self.is_running = False
         self.copy_thread = None
+        self.job_id = None
         
         # Initialize UI
         self.init_ui()
@@ -130,6 +137,12 @@ class SDDetectionTab(QWidget):
         self.progress_container, self.progress_bar = create_progress_bar("Copy Progress")
         self.import_layout.addWidget(self.progress_container)
         
+        # Throughput of the card and destinations while importing
+        self.device_label = QLabel("")
+        self.device_label.setWordWrap(True)
+        self.import_layout.addWidget(self.device_label)
+        get_progress_sampler().show_devices(self.device_label)
+        
         # Button layout - using a flow layout approach with wrapping
         import_button_container = QWidget()
         import_button_layout = QHBoxLayout(import_button_container)
@@ -165,7 +178,8 @@ class SDDetectionTab(QWidget):
         self.log_group, self.log_layout = create_group_box("Activity Log")
         
         # Log text area
-        self.log_text = create_text_edit()
+        self.log_text = create_log_view(MAX_LOG_LINES)
+        self.log_sink = LogSink(self.log_text)
         self.log_layout.addWidget(self.log_text)
         
         # Add log group to content layout
@@ -194,9 +208,9 @@ class SDDetectionTab(QWidget):
         # Connect thread signals
         self.sd_detected_signal.connect(self.on_sd_detected)
         self.file_found_signal.connect(self.on_file_found)
-        self.copy_progress_signal.connect(self.update_progress)
         self.copy_complete_signal.connect(self.on_copy_complete)
-        self.log_message_signal.connect(self.log_message)
+        # Delivered on the emitting thread; the sink batches lines for the GUI
+        self.log_message_signal.connect(self.log_message, Qt.ConnectionType.DirectConnection)
         self.scan_progress_signal.connect(self.update_scan_progress)
     
     def scan_sd_cards(self):
@@ -287,64 +301,17 @@ class SDDetectionTab(QWidget):
         # Scan for video files
         threading.Thread(target=self.scan_video_files, args=(sd_card,), daemon=True).start()
     
+    @traced()
     def scan_video_files(self, sd_card):
         """Scan for video files on the selected SD card."""
         try:
             self.log_message_signal.emit(f"Scanning for video files on {sd_card}...")
             
-            # Get video extensions from config (placeholder)
-            video_extensions = [".mp4", ".mov"]
-            
-            # Create a set of extensions for faster lookup
-            ext_set = set(video_extensions)
-            
-            # Skip these directories completely for faster scanning
-            skip_dirs = {'.Trashes', '.fseventsd', '.Spotlight-V100', '$RECYCLE.BIN', 'System Volume Information'}
-            
-            # Skip files starting with these prefixes
-            skip_prefixes = {'._', '.DS_Store', 'Thumbs.db'}
-            
-            # Use a single pass approach for better performance
-            video_files = []
-            
-            # Set maximum depth to avoid excessive recursion
-            max_depth = 5
-            current_depth = 0
+            # Get video extensions from the current configuration
+            config = get_config_manager().get_config()
+            video_extensions = config.get('video_extensions') or workflow.VIDEO_EXTENSIONS
             
-            def fast_scan(current_dir, depth):
-                # Stop if we've reached max depth
-                if depth > max_depth:
-                    return
-                
-                try:
-                    # Get all entries in the current directory
-                    entries = os.scandir(current_dir)
-                    
-                    for entry in entries:
-                        # Skip hidden and system directories
-                        if entry.is_dir():
-                            dirname = entry.name
-                            if dirname.startswith('.') or dirname in skip_dirs:
-                                continue
-                            # Recursively scan subdirectories
-                            fast_scan(entry.path, depth + 1)
-                        elif entry.is_file():
-                            filename = entry.name
-                            # Skip hidden and system files
-                            if any(filename.startswith(prefix) for prefix in skip_prefixes):
-                                continue
-                            # Check if it's a video file
-                            if any(filename.lower().endswith(ext) for ext in ext_set):
-                                video_files.append(entry.path)
-                except PermissionError:
-                    # Skip directories we don't have permission to access
-                    pass
-                except Exception as e:
-                    # Skip directories with other errors
-                    pass
-            
-            # Start the fast scan
-            fast_scan(sd_card, current_depth)
+            video_files = list(workflow.scan_video_files(sd_card, video_extensions))
             
             # Get total number of files found
             total_files = len(video_files)
@@ -407,9 +374,12 @@ class SDDetectionTab(QWidget):
             self.progress_bar.setValue(0)
             
             # Start copy thread
+            self.job_id = new_job_id("import")
+            job = get_progress_bus().start("import", job_id=self.job_id, total=len(files))
+            get_progress_sampler().track(job, self.progress_bar)
             self.copy_thread = threading.Thread(
                 target=self.copy_files,
-                args=(files, destination_folder),
+                args=(files, destination_folder, job),
                 daemon=True
             )
             self.copy_thread.start()
@@ -419,68 +389,29 @@ class SDDetectionTab(QWidget):
             self.log_message(f"Error starting import: {e}")
             show_error(self, "Error", f"Failed to start import: {e}")
     
-    def copy_files(self, files, destination):
-        """Copy files in a separate thread."""
+    @traced()
+    def copy_files(self, files, destination, job):
+        """Copy files in a separate thread, verifying and proxying each as soon as it lands."""
         try:
-            total_files = len(files)
-            
-            for i, file_path in enumerate(files):
-                if not self.is_running:
-                    self.log_message_signal.emit("Import cancelled")
-                    break
-                
-                # Get file name
-                file_name = os.path.basename(file_path)
-                
-                # Create destination path
-                dest_path = os.path.join(destination, file_name)
-                
-                self.log_message_signal.emit(f"Copying {file_name}...")
-                
-                # Copy file
-                self.copy_file(file_path, dest_path)
-                
-                # Update progress
-                self.copy_progress_signal.emit(i + 1, total_files)
+            # Proxies go next to the footage folder when enabled in the configuration
+            config = get_config_manager().get_config()
+            options = workflow.ingest_options(
+                config, proxy_dir=os.path.join(os.path.dirname(destination), "proxies")
+            )
             
+            # Backup copies mirror the dated folder under each backup root
+            base_dir = os.path.dirname(os.path.dirname(destination))
+            workflow.ingest_files(
+                files, destination, job, job_id=self.job_id,
+                log=self.log_message_signal.emit,
+                is_cancelled=lambda: not self.is_running,
+                backups=workflow.backup_dirs(config, destination, base_dir),
+                **options
+            )
             self.copy_complete_signal.emit()
         except Exception as e:
             self.log_message_signal.emit(f"Error during import: {e}")
     
-    def copy_file(self, source, destination):
-        """Copy a file with progress updates."""
-        try:
-            # Get file size
-            file_size = os.path.getsize(source)
-            
-            # Open source file
-            with open(source, 'rb') as src:
-                # Open destination file
-                with open(destination, 'wb') as dst:
-                    copied = 0
-                    chunk_size = 1024 * 1024  # 1MB chunks
-                    
-                    while True:
-                        chunk = src.read(chunk_size)
-                        if not chunk:
-                            break
-                        
-                        dst.write(chunk)
-                        copied += len(chunk)
-                        
-                        # Update progress occasionally
-                        if copied % (10 * chunk_size) == 0:
-                            progress = int((copied / file_size) * 100)
-                            self.log_message_signal.emit(f"Copying {os.path.basename(source)}: {progress}%")
-        except Exception as e:
-            self.log_message_signal.emit(f"Error copying file {source}: {e}")
-            raise
-    
-    def update_progress(self, current, total):
-        """Update the progress bar."""
-        progress = int((current / total) * 100) if total > 0 else 0
-        self.progress_bar.setValue(progress)
-        
     def update_scan_progress(self, current, total):
         """Update scan progress bar."""
         if not self.scan_progress_container.isVisible():
@@ -508,10 +439,9 @@ class SDDetectionTab(QWidget):
         self.log_message("Cancelling import...")
     
     def log_message(self, message):
-        """Add a message to the log."""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
+        """Add a message to the log; safe to call from worker threads."""
+        self.log_sink.write(message)
+        log_event("import", message, job_id=self.job_id)
     
     def run(self):
         """Run the SD card detection workflow."""
@@ -4,16 +4,12 @@ Upload Tab for the Video Workflow Application
 
 import os
 import sys
-import json
-import time
 import threading
-import hashlib
 from pathlib import Path
-from datetime import datetime
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QListWidget,
-    QListWidgetItem, QFileDialog, QLineEdit, QSizePolicy,
+    QFileDialog, QLineEdit, QSizePolicy,
     QScrollArea, QFrame
 )
 from PyQt6.QtCore import Qt, pyqtSignal
@@ -21,10 +17,29 @@ from PyQt6.QtCore import Qt, pyqtSignal
 # Import UI template components
 from ..ui_template import (
     create_group_box, create_button, create_directory_selector,
-    create_input_field, create_checkbox, create_progress_bar,
-    show_info, show_error, create_list_widget, create_text_edit,
+    create_input_field, create_checkbox, create_combo_box, create_progress_bar,
+    show_info, show_error, create_list_widget, create_log_view,
     create_horizontal_separator
 )
+from ..log_sink import LogSink, MAX_LOG_LINES
+from ..progress_sampler import get_progress_sampler
+
+# Import workflow modules
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from config_manager import get_config_manager
+from bandwidth import get_bandwidth_scheduler
+from logger import log_event, new_job_id
+from progress import get_progress_bus
+from tracing import traced
+import workflow
+
+# Bandwidth choices offered in the tab, mapped to a share of the configured limit
+BANDWIDTH_CHOICES = {
+    "Follow schedule": None,
+    "Full speed": 100,
+    "50% of limit": 50,
+    "20% of limit": 20
+}
 
 class UploadTab(QWidget):
     """Upload tab for uploading files to Playbook or other platforms."""
@@ -32,8 +47,8 @@ class UploadTab(QWidget):
     # Signals for thread-safe UI updates
     log_message_signal = pyqtSignal(str)
     file_found_signal = pyqtSignal(str)
-    upload_progress_signal = pyqtSignal(int, int)  # current, total
-    upload_complete_signal = pyqtSignal()
+    upload_complete_signal = pyqtSignal(str, bool)  # summary, success
+    config_changed_signal = pyqtSignal(object)
     
     def __init__(self):
         super().__init__()
@@ -41,6 +56,9 @@ class UploadTab(QWidget):
         # Initialize properties
         self.is_running = False
         self.upload_thread = None
+        self.cancel_event = threading.Event()
+        self.config = {}
+        self.job_id = None
         
         # Initialize UI
         self.init_ui()
@@ -48,8 +66,9 @@ class UploadTab(QWidget):
         # Connect signals
         self.connect_signals()
         
-        # Load config
+        # Load config, and follow later changes
         self.load_config()
+        get_config_manager().subscribe(self.config_changed_signal.emit)
     
     def init_ui(self):
         """Initialize the UI components."""
@@ -121,6 +140,14 @@ class UploadTab(QWidget):
         self.avoid_duplicates_checkbox.setChecked(True)
         self.options_layout.addWidget(self.avoid_duplicates_checkbox)
         
+        # Bandwidth selector; changes apply to uploads already in progress
+        bandwidth_layout = QHBoxLayout()
+        bandwidth_layout.addWidget(QLabel("Bandwidth:"))
+        self.bandwidth_combo = create_combo_box(list(BANDWIDTH_CHOICES))
+        bandwidth_layout.addWidget(self.bandwidth_combo)
+        bandwidth_layout.addStretch()
+        self.options_layout.addLayout(bandwidth_layout)
+        
         # Add options group to content layout
         content_layout.addWidget(self.options_group)
         
@@ -147,7 +174,8 @@ class UploadTab(QWidget):
         self.log_group, self.log_layout = create_group_box("Activity Log")
         
         # Log text area
-        self.log_text = create_text_edit()
+        self.log_text = create_log_view(MAX_LOG_LINES)
+        self.log_sink = LogSink(self.log_text)
         self.log_layout.addWidget(self.log_text)
         
         # Add log group to content layout
@@ -189,12 +217,14 @@ class UploadTab(QWidget):
         self.scan_button.clicked.connect(self.scan_files)
         self.upload_button.clicked.connect(self.upload_files)
         self.cancel_button.clicked.connect(self.cancel_upload)
+        self.bandwidth_combo.currentTextChanged.connect(self.on_bandwidth_changed)
         
         # Connect thread signals
-        self.log_message_signal.connect(self.log_message)
+        # Delivered on the emitting thread; the sink batches lines for the GUI
+        self.log_message_signal.connect(self.log_message, Qt.ConnectionType.DirectConnection)
         self.file_found_signal.connect(self.on_file_found)
-        self.upload_progress_signal.connect(self.update_progress)
         self.upload_complete_signal.connect(self.on_upload_complete)
+        self.config_changed_signal.connect(self.on_config_changed)
     
     def browse_directory(self, label, caption):
         """Open directory browser dialog."""
@@ -203,23 +233,33 @@ class UploadTab(QWidget):
             label.setText(directory)
     
     def load_config(self):
-        """Load configuration from file."""
+        """Load configuration from the shared configuration service."""
         try:
-            # Get the config file path
-            script_dir = Path(__file__).resolve().parent.parent.parent.parent
-            config_path = script_dir / 'config' / 'config.json'
+            config = get_config_manager().get_config()
             
-            if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                
-                # Set source directory from master_path
-                master_path = config.get('master_path', '')
-                if master_path:
-                    self.source_dir_label.setText(master_path)
+            # Keep config for upload engine settings
+            self.config = config
+            
+            # Set source directory from master_path
+            master_path = config.get('master_path', '')
+            if master_path:
+                self.source_dir_label.setText(master_path)
         except Exception as e:
             self.log_message(f"Failed to load configuration: {e}")
     
+    def on_config_changed(self, config):
+        """Use a new configuration for later uploads and apply bandwidth limits now."""
+        self.config = config
+        get_bandwidth_scheduler(config)
+    
+    def on_bandwidth_changed(self, choice):
+        """Apply a new bandwidth choice immediately, including to running uploads."""
+        scheduler = get_bandwidth_scheduler(self.config)
+        scheduler.set_override(BANDWIDTH_CHOICES.get(choice))
+        if BANDWIDTH_CHOICES.get(choice) is not None and not scheduler.limit_mbit:
+            self.log_message("No upload limit configured (upload.bandwidth.limit_mbit); uploads run at full speed")
+        self.log_message(f"Upload bandwidth: {scheduler.describe()}")
+    
     def scan_files(self):
         """Scan for files in the source directory."""
         try:
@@ -231,14 +271,8 @@ class UploadTab(QWidget):
             self.log_message(f"Scanning for files in {source_dir}...")
             self.file_list.clear()
             
-            # Get video extensions from config
-            script_dir = Path(__file__).resolve().parent.parent.parent.parent
-            config_path = script_dir / 'config' / 'config.json'
-            
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-            
-            video_extensions = config.get('video_extensions', [".mp4", ".mov"])
+            # Get video extensions from the current configuration
+            video_extensions = self.config.get('video_extensions', [".mp4", ".mov"])
             
             # Start scan thread
             threading.Thread(
@@ -256,33 +290,22 @@ class UploadTab(QWidget):
             # Show progress message
             self.log_message_signal.emit("Starting file scan (this may take a moment)...")
             
-            # Create a set of extensions for faster lookup
-            ext_set = set(extensions)
             count = 0
             max_files = 1000  # Limit to prevent excessive scanning
             
-            # Use a more efficient approach with a progress indicator
-            for root, dirs, files in os.walk(directory):
-                # Skip hidden directories (starting with .)
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for file_path in workflow.scan_video_files(directory, extensions, max_depth=None):
+                self.file_found_signal.emit(file_path)
+                count += 1
                 
-                # Update progress every 10 directories
-                if count % 10 == 0:
+                # Update progress every 100 files
+                if count % 100 == 0:
                     self.log_message_signal.emit(f"Scanning... found {count} files so far")
                 
-                # Process files in this directory
-                for file in files:
-                    # Check extension using set membership for speed
-                    if any(file.lower().endswith(ext) for ext in ext_set):
-                        file_path = os.path.join(root, file)
-                        self.file_found_signal.emit(file_path)
-                        count += 1
-                        
-                        # Limit the number of files to prevent excessive scanning
-                        if count >= max_files:
-                            self.log_message_signal.emit(f"Reached limit of {max_files} files. Stopping scan.")
-                            self.log_message_signal.emit(f"Found {count} files (limited to first {max_files})")
-                            return
+                # Limit the number of files to prevent excessive scanning
+                if count >= max_files:
+                    self.log_message_signal.emit(f"Reached limit of {max_files} files. Stopping scan.")
+                    self.log_message_signal.emit(f"Found {count} files (limited to first {max_files})")
+                    return
             
             if count == 0:
                 self.log_message_signal.emit("No files found")
@@ -326,9 +349,15 @@ class UploadTab(QWidget):
             
             # Start upload thread
             self.is_running = True
+            self.job_id = new_job_id("upload")
+            self.cancel_event.clear()
+            job = get_progress_bus().start("upload", job_id=self.job_id, total=len(files))
+            get_progress_sampler().track(job, self.progress_bar, self.current_file_label)
+            # Widgets are only read on the GUI thread
+            avoid_duplicates = self.avoid_duplicates_checkbox.isChecked()
             self.upload_thread = threading.Thread(
                 target=self.upload_to_api,
-                args=(files, api_endpoint, api_key),
+                args=(files, api_endpoint, api_key, job, avoid_duplicates),
                 daemon=True
             )
             self.upload_thread.start()
@@ -338,121 +367,55 @@ class UploadTab(QWidget):
             self.log_message(f"Error starting upload: {e}")
             show_error(self, "Error", f"Failed to start upload: {e}")
     
-    def upload_to_api(self, files, api_endpoint, api_key):
+    @traced()
+    def upload_to_api(self, files, api_endpoint, api_key, job, avoid_duplicates):
         """Upload files to API in a separate thread."""
         try:
-            total_files = len(files)
-            
-            for i, file_path in enumerate(files):
-                if not self.is_running:
-                    self.log_message_signal.emit("Upload cancelled")
-                    break
-                
-                # Get file name
-                file_name = os.path.basename(file_path)
-                
-                # Update UI
-                self.log_message_signal.emit(f"Uploading {file_name}...")
-                self.current_file_label.setText(f"Uploading: {file_name}")
-                
-                # Check for duplicates if enabled
-                if self.avoid_duplicates_checkbox.isChecked():
-                    file_hash = self.calculate_file_hash(file_path)
-                    is_duplicate = self.check_duplicate(file_hash, api_endpoint, api_key)
-                    
-                    if is_duplicate:
-                        self.log_message_signal.emit(f"Skipping duplicate file: {file_name}")
-                        self.upload_progress_signal.emit(i + 1, total_files)
-                        continue
-                
-                # Upload file
-                success = self.upload_file(file_path, api_endpoint, api_key)
-                
-                if success:
-                    self.log_message_signal.emit(f"Successfully uploaded {file_name}")
-                else:
-                    self.log_message_signal.emit(f"Failed to upload {file_name}")
-                
-                # Update progress
-                self.upload_progress_signal.emit(i + 1, total_files)
-            
-            self.upload_complete_signal.emit()
+            results = workflow.upload_files(
+                files, api_endpoint, api_key, self.config, job, job_id=self.job_id,
+                log=self.log_message_signal.emit,
+                avoid_duplicates=avoid_duplicates,
+                cancel_event=self.cancel_event
+            )
         except Exception as e:
             self.log_message_signal.emit(f"Error during upload: {e}")
+            self.upload_complete_signal.emit(f"Upload failed: {e}", False)
+            return
+        
+        uploaded = sum(1 for result in results if result.success)
+        failed = len(results) - uploaded
+        if self.cancel_event.is_set():
+            self.upload_complete_signal.emit(f"Upload cancelled; {uploaded} of {len(files)} files uploaded", False)
+        elif failed:
+            self.upload_complete_signal.emit(f"{failed} of {len(files)} files failed to upload", False)
+        else:
+            skipped = len(files) - uploaded
+            duplicates = f", {skipped} duplicates skipped" if skipped else ""
+            self.upload_complete_signal.emit(f"{uploaded} files uploaded successfully{duplicates}", True)
     
-    def calculate_file_hash(self, file_path):
-        """Calculate MD5 hash of a file."""
-        try:
-            md5_hash = hashlib.md5()
-            with open(file_path, "rb") as f:
-                # Read in chunks to handle large files
-                for chunk in iter(lambda: f.read(4096), b""):
-                    md5_hash.update(chunk)
-            return md5_hash.hexdigest()
-        except Exception as e:
-            self.log_message_signal.emit(f"Error calculating file hash: {e}")
-            return None
-    
-    def check_duplicate(self, file_hash, api_endpoint, api_key):
-        """Check if a file with the same hash already exists."""
-        try:
-            # This is a placeholder implementation
-            # In a real application, you would make an API call to check for duplicates
-            
-            # Simulate API call
-            time.sleep(0.5)
-            
-            # For demonstration, always return False (no duplicate)
-            return False
-        except Exception as e:
-            self.log_message_signal.emit(f"Error checking for duplicates: {e}")
-            return False
-    
-    def upload_file(self, file_path, api_endpoint, api_key):
-        """Upload a file to the API endpoint."""
-        try:
-            # This is a placeholder implementation
-            # In a real application, you would make an API call to upload the file
-            
-            # Simulate API call with delay based on file size
-            file_size = os.path.getsize(file_path)
-            # Simulate 1MB/s upload speed
-            upload_time = file_size / (1024 * 1024)
-            # Cap at 10 seconds for demonstration
-            upload_time = min(upload_time, 10)
-            
-            time.sleep(upload_time)
-            
-            # For demonstration, always return True (success)
-            return True
-        except Exception as e:
-            self.log_message_signal.emit(f"Error uploading file {file_path}: {e}")
-            return False
-    
-    def update_progress(self, current, total):
-        """Update the progress bar."""
-        progress = int((current / total) * 100) if total > 0 else 0
-        self.progress_bar.setValue(progress)
-    
-    def on_upload_complete(self):
-        """Handle upload completion."""
+    def on_upload_complete(self, summary, success):
+        """Handle upload completion, cancellation or failure."""
+        self.is_running = False
         self.upload_button.setEnabled(True)
         self.cancel_button.setEnabled(False)
-        self.current_file_label.setText("Upload completed")
-        self.log_message("Upload completed")
-        show_info(self, "Success", "Files uploaded successfully")
+        self.current_file_label.setText(summary)
+        self.log_message(summary)
+        if success:
+            show_info(self, "Success", summary)
+        else:
+            show_error(self, "Upload", summary)
     
     def cancel_upload(self):
         """Cancel the upload."""
         self.is_running = False
+        self.cancel_event.set()
         self.cancel_button.setEnabled(False)
         self.log_message("Cancelling upload...")
     
     def log_message(self, message):
-        """Add a message to the log."""
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
+        """Add a message to the log; safe to call from worker threads."""
+        self.log_sink.write(message)
+        log_event("upload", message, job_id=self.job_id)
     
     def run(self):
         """Run the upload workflow."""
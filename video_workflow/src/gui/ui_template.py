@@ -7,7 +7,7 @@ This module provides UI components and styles for the video workflow application
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QFileDialog,
     QLabel, QLineEdit, QProgressBar, QMessageBox, QFormLayout, QHBoxLayout, 
-    QGroupBox, QSizePolicy, QTabWidget, QListWidget, QTextEdit, QCheckBox,
+    QGroupBox, QSizePolicy, QTabWidget, QListWidget, QListView, QTextEdit, QPlainTextEdit, QCheckBox,
     QComboBox, QSpinBox, QDoubleSpinBox, QFrame, QScrollArea, QMainWindow,
     QStatusBar, QToolBar
 )
@@ -303,29 +303,29 @@ TAB_STYLE = """
 
 # List widget style
 LIST_STYLE = """
-    QListWidget {
+    QListView {
         background-color: #3E3E42;
         border: none;
         border-radius: 10px;
         padding: 5px;
         color: #E0E0E0;
     }
-    QListWidget::item {
+    QListView::item {
         padding: 5px;
         border-radius: 5px;
     }
-    QListWidget::item:selected {
+    QListView::item:selected {
         background-color: #6A5ACD;
         color: white;
     }
-    QListWidget::item:hover:!selected {
+    QListView::item:hover:!selected {
         background-color: #4E4E52;
     }
 """
 
 # Text edit style
 TEXT_EDIT_STYLE = """
-    QTextEdit {
+    QTextEdit, QPlainTextEdit {
         background-color: #3E3E42;
         border: none;
         border-radius: 10px;
@@ -567,6 +567,13 @@ def create_list_widget(parent=None):
     list_widget.setStyleSheet(LIST_STYLE)
     return list_widget
 
+def create_list_view(parent=None):
+    """Create a styled list view for large models; all rows share one height"""
+    list_view = QListView(parent)
+    list_view.setStyleSheet(LIST_STYLE)
+    list_view.setUniformItemSizes(True)
+    return list_view
+
 def create_text_edit(parent=None):
     """Create a styled text edit for logs or output"""
     text_edit = QTextEdit(parent)
@@ -574,6 +581,14 @@ def create_text_edit(parent=None):
     text_edit.setReadOnly(True)
     return text_edit
 
+def create_log_view(max_lines=5000, parent=None):
+    """Create a styled read-only plain text view that keeps at most max_lines lines"""
+    log_view = QPlainTextEdit(parent)
+    log_view.setStyleSheet(TEXT_EDIT_STYLE)
+    log_view.setReadOnly(True)
+    log_view.setMaximumBlockCount(max_lines)
+    return log_view
+
 def create_horizontal_separator():
     """Create a horizontal separator line"""
     line = QFrame()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Hash Cache for Automated Video Workflow
+
+Stores file content digests in SQLite, keyed by (device, inode, size,
+mtime_ns). A file whose identity and modification time are unchanged
+is never re-read to compute a digest it already has.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+from config_manager import get_state_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    path TEXT,
+    updated REAL,
+    PRIMARY KEY (device, inode, size, mtime_ns, algorithm)
+)
+"""
+
+
+def hash_file(file_path, algorithms=("md5",), chunk_size=1024 * 1024):
+    """
+    Compute digests of a file in a single read pass.
+
+    Args:
+        file_path (str): File to hash
+        algorithms (tuple, optional): hashlib algorithm names
+        chunk_size (int, optional): Read size in bytes
+
+    Returns:
+        dict: Mapping of algorithm name to hex digest
+    """
+    hashers = {name: hashlib.new(name) for name in algorithms}
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            for hasher in hashers.values():
+                hasher.update(chunk)
+    return {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+
+class HashCache:
+    """SQLite-backed cache of file digests."""
+
+    def __init__(self, db_path, logger=None):
+        """
+        Initialize the hash cache.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            logger: Logger instance for logging events
+        """
+        self.db_path = str(db_path)
+        self.logger = logger
+        self.lock = threading.Lock()
+
+        # One connection shared by all threads; every access holds the lock
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+        # Counters for reporting cache effectiveness, updated under the lock
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(stat_result):
+        """Build the cache key for a stat result."""
+        return (stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+
+    def get_many(self, file_path, algorithms=("md5",), stat_result=None):
+        """
+        Look up cached digests for a file.
+
+        Args:
+            file_path (str): File to look up
+            algorithms (tuple, optional): Algorithms wanted
+            stat_result (os.stat_result, optional): Stat of the file, if already known
+
+        Returns:
+            dict: Mapping of algorithm name to hex digest for the cached algorithms
+        """
+        stat_result = stat_result or os.stat(file_path)
+        placeholders = ",".join("?" for _ in algorithms)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT algorithm, digest FROM file_hashes "
+                "WHERE device=? AND inode=? AND size=? AND mtime_ns=? "
+                f"AND algorithm IN ({placeholders})",
+                self._key(stat_result) + tuple(algorithms)
+            ).fetchall()
+        return dict(rows)
+
+    def get(self, file_path, algorithm="md5", stat_result=None):
+        """
+        Look up a single cached digest.
+
+        Returns:
+            str: Hex digest, or None if not cached
+        """
+        return self.get_many(file_path, (algorithm,), stat_result).get(algorithm)
+
+    def put(self, file_path, digests, stat_result=None):
+        """
+        Store digests for a file.
+
+        Args:
+            file_path (str): File the digests belong to
+            digests (dict): Mapping of algorithm name to hex digest
+            stat_result (os.stat_result, optional): Stat of the file when it was hashed
+        """
+        stat_result = stat_result or os.stat(file_path)
+        key = self._key(stat_result)
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO file_hashes "
+                "(device, inode, size, mtime_ns, algorithm, digest, path, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [key + (name, digest, os.path.abspath(file_path), now)
+                 for name, digest in digests.items()]
+            )
+            self.conn.commit()
+
+    def put_if_unchanged(self, file_path, digests, stat_result):
+        """
+        Store digests only if the file still matches the stat taken before hashing.
+
+        Args:
+            file_path (str): File the digests belong to
+            digests (dict): Mapping of algorithm name to hex digest
+            stat_result (os.stat_result): Stat of the file taken before it was read
+
+        Returns:
+            bool: True if the digests were stored
+        """
+        if self._key(os.stat(file_path)) != self._key(stat_result):
+            if self.logger:
+                self.logger.warning(f"File changed while hashing, not caching: {file_path}")
+            return False
+        self.put(file_path, digests, stat_result)
+        return True
+
+    def get_or_compute(self, file_path, algorithms=("md5",), compute=None):
+        """
+        Get digests from the cache, hashing the file only for missing algorithms.
+
+        Args:
+            file_path (str): File to hash
+            algorithms (tuple, optional): Algorithms wanted
+            compute (callable, optional): Called as compute(file_path, algorithms)
+                                          to hash the file. Defaults to hash_file.
+
+        Returns:
+            dict: Mapping of algorithm name to hex digest
+        """
+        stat_result = os.stat(file_path)
+        digests = self.get_many(file_path, algorithms, stat_result)
+        missing = tuple(name for name in algorithms if name not in digests)
+        if not missing:
+            with self.lock:
+                self.hits += 1
+            return digests
+
+        with self.lock:
+            self.misses += 1
+        computed = (compute or hash_file)(file_path, missing)
+
+        # Only cache the result if the file did not change while it was read
+        self.put_if_unchanged(file_path, computed, stat_result)
+
+        digests.update(computed)
+        return digests
+
+    def copy_entries(self, source_stat, dest_path):
+        """
+        Copy all cached digests from a source file to a copy of it.
+
+        Used after moves and copies that create a new inode, so the copy
+        does not have to be re-read.
+
+        Args:
+            source_stat (os.stat_result): Stat of the source before it was copied
+            dest_path (str): Path of the copy
+
+        Returns:
+            dict: The digests that were carried over
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT algorithm, digest FROM file_hashes "
+                "WHERE device=? AND inode=? AND size=? AND mtime_ns=?",
+                self._key(source_stat)
+            ).fetchall()
+
+        digests = dict(rows)
+        if digests:
+            dest_stat = os.stat(dest_path)
+            if dest_stat.st_size == source_stat.st_size:
+                self.put(dest_path, digests, dest_stat)
+        return digests
+
+    def close(self):
+        """Close the database connection."""
+        with self.lock:
+            self.conn.close()
+
+
+# Process-wide shared cache
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_hash_cache(config=None, logger=None):
+    """
+    Get the shared hash cache, creating it on first use.
+
+    Args:
+        config (dict, optional): Configuration dictionary used to locate the state directory
+        logger: Logger instance for logging events
+
+    Returns:
+        HashCache: The shared cache
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            db_path = get_state_dir(config) / "hash_cache.sqlite3"
+            _shared_cache = HashCache(db_path, logger)
+        return _shared_cache
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Hash Service for Automated Video Workflow
+
+High-throughput file hashing. Files are read with large, page-aligned
+buffers (or memory-mapped) and hashed in parallel on a thread pool;
+hashlib releases the GIL for large updates, so threads scale across
+cores. Single huge files can be tree-hashed in parallel chunks, and
+StreamHasher lets other stages (e.g. copying) hash data they already
+have in memory.
+"""
+
+import os
+import mmap
+import queue
+import time
+import hashlib
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import get_metrics
+
+# Reads are sized in multiples of the page size
+PAGE_SIZE = mmap.PAGESIZE
+
+# Files smaller than this are read rather than memory-mapped
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+def _aligned(size):
+    """Round a buffer size up to a whole number of pages."""
+    return max(PAGE_SIZE, -(-size // PAGE_SIZE) * PAGE_SIZE)
+
+
+class StreamHasher:
+    """
+    Incremental multi-algorithm hasher fed by another stage.
+
+    In background mode, update() hands data to a worker thread through a
+    bounded queue so the producer only blocks when hashing falls behind.
+    """
+
+    def __init__(self, algorithms=("md5",), background=False, max_pending=8):
+        """
+        Initialize the stream hasher.
+
+        Args:
+            algorithms (tuple, optional): hashlib algorithm names
+            background (bool, optional): Hash on a worker thread
+            max_pending (int, optional): Buffers queued before update() blocks
+        """
+        self.hashers = {name: hashlib.new(name) for name in algorithms}
+        self.bytes_hashed = 0
+        self._queue = None
+        self._thread = None
+        self._error = None
+
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _hash(self, data):
+        """Update every hasher with a buffer."""
+        for hasher in self.hashers.values():
+            hasher.update(data)
+        self.bytes_hashed += len(data)
+
+    def _run(self):
+        """Worker loop for background mode."""
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            try:
+                self._hash(data)
+            except Exception as e:
+                self._error = e
+
+    def update(self, data):
+        """
+        Feed data to the hasher.
+
+        In background mode the caller must not modify data afterwards.
+        """
+        if self._queue is not None:
+            self._queue.put(data)
+        else:
+            self._hash(data)
+
+    def hexdigests(self):
+        """
+        Finish hashing and return the digests.
+
+        Returns:
+            dict: Mapping of algorithm name to hex digest
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error:
+            raise self._error
+        return {name: hasher.hexdigest() for name, hasher in self.hashers.items()}
+
+
+class HashService:
+    """Parallel file hashing with large buffers and optional mmap."""
+
+    def __init__(self, max_workers=None, buffer_size=8 * 1024 * 1024, use_mmap=True, logger=None):
+        """
+        Initialize the hash service.
+
+        Args:
+            max_workers (int, optional): Hashing threads. Defaults to the CPU count (max 8).
+            buffer_size (int, optional): Read buffer size in bytes, rounded up to whole pages
+            use_mmap (bool, optional): Memory-map large files instead of reading them
+            logger: Logger instance for logging events
+        """
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.buffer_size = _aligned(buffer_size)
+        self.use_mmap = use_mmap
+        self.logger = logger
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="hash")
+
+    @classmethod
+    def from_config(cls, config, logger=None):
+        """
+        Create a hash service from the application configuration.
+
+        Args:
+            config (dict): Configuration dictionary with an optional 'hashing' section
+            logger: Logger instance for logging events
+
+        Returns:
+            HashService: Configured service
+        """
+        settings = config.get("hashing", {}) if config else {}
+        return cls(
+            max_workers=settings.get("workers") or None,
+            buffer_size=int(settings.get("buffer_size_mb", 8) * 1024 * 1024),
+            use_mmap=settings.get("use_mmap", True),
+            logger=logger
+        )
+
+    def _hash_range(self, file_path, hashers, offset=0, length=None):
+        """Feed a byte range of a file to the given hashers."""
+        with open(file_path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            end = size if length is None else min(size, offset + length)
+            if end <= offset:
+                return
+
+            if self.use_mmap and end - offset >= MMAP_THRESHOLD:
+                # mmap offsets must be aligned to the allocation granularity
+                map_offset = offset - offset % mmap.ALLOCATIONGRANULARITY
+                with mmap.mmap(f.fileno(), end - map_offset, offset=map_offset,
+                               access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    # Views must be released before the map is closed
+                    with memoryview(mapped) as view:
+                        position = offset - map_offset
+                        stop = end - map_offset
+                        while position < stop:
+                            with view[position:min(position + self.buffer_size, stop)] as block:
+                                for hasher in hashers:
+                                    hasher.update(block)
+                                position += len(block)
+                return
+
+            # Read into one reusable buffer
+            buffer = bytearray(self.buffer_size)
+            view = memoryview(buffer)
+            f.seek(offset)
+            remaining = end - offset
+            while remaining > 0:
+                count = f.readinto(view[:min(self.buffer_size, remaining)])
+                if not count:
+                    break
+                for hasher in hashers:
+                    hasher.update(view[:count])
+                remaining -= count
+
+    def hash_file(self, file_path, algorithms=("md5",), purpose="other"):
+        """
+        Hash a file on the calling thread.
+
+        Args:
+            file_path (str): File to hash
+            algorithms (tuple, optional): hashlib algorithm names
+            purpose (str, optional): What the digests are for, e.g. "upload";
+                                     labels the hashing metrics
+
+        Returns:
+            dict: Mapping of algorithm name to hex digest
+        """
+        hashers = {name: hashlib.new(name) for name in algorithms}
+        start_time = time.monotonic()
+        self._hash_range(file_path, list(hashers.values()))
+        get_metrics().record_hash(purpose, os.path.getsize(file_path), time.monotonic() - start_time)
+        return {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+    def submit(self, file_path, algorithms=("md5",), cache=None, purpose="other"):
+        """
+        Hash a file on the thread pool.
+
+        Args:
+            file_path (str): File to hash
+            algorithms (tuple, optional): hashlib algorithm names
+            cache (HashCache, optional): Cache to consult and populate
+            purpose (str, optional): What the digests are for; labels the hashing metrics
+
+        Returns:
+            concurrent.futures.Future: Resolves to the digest dictionary
+        """
+        compute = functools.partial(self.hash_file, purpose=purpose)
+        if cache is not None:
+            return self._executor.submit(cache.get_or_compute, file_path, algorithms, compute)
+        return self._executor.submit(compute, file_path, algorithms)
+
+    def hash_files(self, file_paths, algorithms=("md5",), cache=None, callback=None, purpose="other"):
+        """
+        Hash several files in parallel.
+
+        Args:
+            file_paths (list): Files to hash
+            algorithms (tuple, optional): hashlib algorithm names
+            cache (HashCache, optional): Cache to consult and populate
+            callback (callable, optional): Called as callback(file_path, digests, error)
+                                           as each file finishes
+            purpose (str, optional): What the digests are for; labels the hashing metrics
+
+        Returns:
+            dict: Mapping of file path to digest dictionary (None for files that failed)
+        """
+        futures = {path: self.submit(path, algorithms, cache, purpose) for path in file_paths}
+        results = {}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+                error = None
+            except Exception as e:
+                results[path] = None
+                error = e
+                if self.logger:
+                    self.logger.error(f"Error hashing {path}: {e}")
+            if callback:
+                callback(path, results[path], error)
+        return results
+
+    def tree_hash(self, file_path, chunk_size=64 * 1024 * 1024, algorithm="sha256"):
+        """
+        Hash a large file as a two-level tree of fixed-size chunks.
+
+        Chunks are hashed in parallel. The root digest is the hash of the
+        concatenated binary chunk digests, so it only depends on the file
+        content and chunk size.
+
+        Args:
+            file_path (str): File to hash
+            chunk_size (int, optional): Chunk size in bytes, rounded up to whole pages
+            algorithm (str, optional): hashlib algorithm name
+
+        Returns:
+            dict: {"algorithm", "chunk_size", "root", "chunks"} where chunks
+                  is a list of hex digests in file order
+        """
+        chunk_size = _aligned(chunk_size)
+        size = os.path.getsize(file_path)
+        chunk_count = max(1, -(-size // chunk_size))
+
+        def hash_chunk(index):
+            hasher = hashlib.new(algorithm)
+            self._hash_range(file_path, [hasher], index * chunk_size, chunk_size)
+            return hasher.digest()
+
+        digests = list(self._executor.map(hash_chunk, range(chunk_count)))
+        root = hashlib.new(algorithm, b"".join(digests)).hexdigest()
+        return {
+            "algorithm": algorithm,
+            "chunk_size": chunk_size,
+            "root": root,
+            "chunks": [d.hex() for d in digests]
+        }
+
+    def close(self):
+        """Shut down the hashing threads."""
+        self._executor.shutdown(wait=True)
+
+
+# Process-wide shared service
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+
+def get_hash_service(config=None, logger=None):
+    """
+    Get the shared hash service, creating it on first use.
+
+    Args:
+        config (dict, optional): Configuration dictionary with an optional 'hashing' section
+        logger: Logger instance for logging events
+
+    Returns:
+        HashService: The shared service
+    """
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = HashService.from_config(config, logger)
+        return _shared_service
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Log Index for Automated Video Workflow
+
+Builds a compact in-memory index over a log file and its rotated backups
+(workflow.log, workflow.log.1, ...): the byte offset, level, timestamp
+and job of every line. The index is extended incrementally as the log
+grows, and segments are tracked by file identity so rotation does not
+force a re-index.
+
+Queries filter on the index alone (level, time range, job); a regex is
+matched by streaming only the candidate lines from disk. Results are
+selections of line numbers that are read back a page at a time, so
+millions of lines can be browsed without loading whole files.
+
+Compressed backups (.gz, .zst) are indexed by streaming them once; when
+their lines are read back, the decompressed content of the most recently
+used segments is kept in memory.
+"""
+
+import os
+import re
+import bisect
+import threading
+from array import array
+from datetime import datetime
+from collections import OrderedDict
+
+from log_rotation import open_log, is_compressed, backup_paths
+
+# Bytes read per block while indexing
+INDEX_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Decompressed segments kept in memory for reading lines back
+MAX_DECOMPRESSED_SEGMENTS = 2
+
+# Numeric levels as used by the logging module; 0 means unknown
+LEVELS = {b"DEBUG": 10, b"INFO": 20, b"WARNING": 30, b"ERROR": 40, b"CRITICAL": 50}
+
+# "2026-01-01 12:00:00,123 - video_workflow.upload - INFO - [upload-3f2a9c1e] message"
+TEXT_LINE = re.compile(
+    rb"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\S* - (?:\S+ - )?"
+    rb"(DEBUG|INFO|WARNING|ERROR|CRITICAL) - (?:\[([\w.-]+)\] )?"
+)
+
+# {"ts": "2026-01-01T12:00:00.123", "level": "INFO", ... "job_id": "upload-3f2a9c1e", ...}
+JSON_LINE = re.compile(rb'^\{"ts": "(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)[^"]*", "level": "(\w+)"')
+JSON_JOB = re.compile(rb'"job_id": "([^"]+)"')
+
+_decompressed = OrderedDict()
+_decompressed_lock = threading.Lock()
+
+
+class LogSegment:
+    """Index of one log file: line offsets, levels, timestamps and jobs."""
+
+    def __init__(self, path, identity):
+        """
+        Initialize an empty segment index.
+
+        Args:
+            path (str): Current path of the file
+            identity (tuple): (device, inode) of the file
+        """
+        self.path = path
+        self.identity = identity
+        self.offsets = array("Q")
+        self.levels = array("B")
+        self.times = array("d")
+        self.jobs = array("I")
+        self.end = 0
+        self.compressed = is_compressed(path)
+        self.sealed = False
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def update(self, index):
+        """
+        Index lines appended since the last update.
+
+        Args:
+            index (LogIndex): Owning index, used for shared parsing state
+        """
+        if self.sealed:
+            return
+        try:
+            if not self.compressed and os.path.getsize(self.path) <= self.end:
+                return
+            f = open_log(self.path)
+        except OSError:
+            return
+
+        with f:
+            if self.end:
+                f.seek(self.end)
+            carry = b""
+            position = self.end
+            while True:
+                block = f.read(INDEX_BLOCK_SIZE)
+                if not block:
+                    break
+                position += len(block)
+                data = carry + block
+                last_newline = data.rfind(b"\n")
+                if last_newline < 0:
+                    carry = data
+                    continue
+
+                # Only index complete lines; a partial last line waits for the next update
+                line_start = position - len(data)
+                for line in data[:last_newline].split(b"\n"):
+                    self._add_line(index, line_start, line)
+                    line_start += len(line) + 1
+                carry = data[last_newline + 1:]
+                self.end = line_start
+
+        # Compressed segments never change once written
+        self.sealed = self.compressed
+
+    def _add_line(self, index, offset, line):
+        """Parse and record one line."""
+        level, timestamp, job = index.parse_line(line)
+        if level == 0 and len(self.levels):
+            # Continuation lines (e.g. tracebacks) belong to the record above
+            level, timestamp, job = self.levels[-1], self.times[-1], self.jobs[-1]
+        self.offsets.append(offset)
+        self.levels.append(level)
+        self.times.append(timestamp)
+        self.jobs.append(job)
+
+    def line_span(self, line):
+        """Get the (start, end) byte offsets of a line, excluding the newline."""
+        start = self.offsets[line]
+        end = self.offsets[line + 1] - 1 if line + 1 < len(self.offsets) else self.end - 1
+        return start, end
+
+    def _decompressed_data(self):
+        """Get the full content of a compressed segment, caching recent ones."""
+        with _decompressed_lock:
+            data = _decompressed.get(self.identity)
+            if data is not None:
+                _decompressed.move_to_end(self.identity)
+                return data
+        with open_log(self.path) as f:
+            data = f.read()
+        with _decompressed_lock:
+            _decompressed[self.identity] = data
+            while len(_decompressed) > MAX_DECOMPRESSED_SEGMENTS:
+                _decompressed.popitem(last=False)
+        return data
+
+    def iter_lines(self, lines):
+        """
+        Read lines of this segment.
+
+        Args:
+            lines (iterable): Line numbers in ascending order
+
+        Yields:
+            bytes: Each line, without its newline
+        """
+        if self.compressed:
+            data = self._decompressed_data()
+            for line in lines:
+                start, end = self.line_span(line)
+                yield data[start:end]
+            return
+
+        with open(self.path, "rb") as f:
+            position = -1
+            for line in lines:
+                start, end = self.line_span(line)
+                if start != position:
+                    f.seek(start)
+                data = f.readline()
+                position = start + len(data)
+                yield data[:end - start]
+
+
+class LogSelection:
+    """A set of lines from a snapshot of the index, read back on demand."""
+
+    def __init__(self, segments, rows):
+        """
+        Initialize the selection.
+
+        Args:
+            segments (list): (LogSegment, line count) pairs, oldest first
+            rows (range or array): Global line numbers in the selection
+        """
+        self.segments = segments
+        self.rows = rows
+        self.starts = []
+        total = 0
+        for _, count in segments:
+            self.starts.append(total)
+            total += count
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _locate(self, row):
+        """Map a global line number to (segment, local line number)."""
+        position = bisect.bisect_right(self.starts, row) - 1
+        return self.segments[position][0], row - self.starts[position]
+
+    def lines(self, start, count):
+        """
+        Read lines from the selection.
+
+        Args:
+            start (int): Index of the first selected line to read
+            count (int): Number of lines to read
+
+        Returns:
+            list: Decoded lines (without newlines)
+        """
+        wanted = [self._locate(row) for row in self.rows[start:start + count]]
+        result = []
+        i = 0
+        while i < len(wanted):
+            segment = wanted[i][0]
+
+            # Read runs of lines from the same segment together
+            run = 1
+            while i + run < len(wanted) and wanted[i + run][0] is segment:
+                run += 1
+            read = []
+            try:
+                for data in segment.iter_lines(line for _, line in wanted[i:i + run]):
+                    read.append(data.decode("utf-8", errors="replace").rstrip("\r"))
+            except OSError:
+                # The segment was rotated away or compressed since the query
+                read.extend([""] * (run - len(read)))
+            result.extend(read)
+            i += run
+        return result
+
+
+class LogIndex:
+    """Incremental index over a log file and its numbered backups."""
+
+    def __init__(self, log_path):
+        """
+        Initialize the index.
+
+        Args:
+            log_path (str): Path of the active log file, e.g. logs/workflow.log
+        """
+        self.log_path = str(log_path)
+        self.lock = threading.RLock()
+        self.segments = []
+        self.job_names = [""]
+        self.job_numbers = {}
+        self._last_time_text = None
+        self._last_time = 0.0
+
+    def segment_paths(self):
+        """List the log file and its backups, oldest first."""
+        backups = backup_paths(self.log_path)
+        paths = [path for _, path in reversed(backups)]
+        if os.path.exists(self.log_path):
+            paths.append(self.log_path)
+        return paths
+
+    def _job_number(self, job):
+        """Intern a job id."""
+        number = self.job_numbers.get(job)
+        if number is None:
+            number = len(self.job_names)
+            self.job_names.append(job.decode("utf-8", errors="replace"))
+            self.job_numbers[job] = number
+        return number
+
+    def _parse_time(self, text):
+        """Convert a 'YYYY-mm-dd HH:MM:SS' timestamp to epoch seconds, caching the last one."""
+        if text != self._last_time_text:
+            self._last_time_text = text
+            self._last_time = datetime(
+                int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                int(text[11:13]), int(text[14:16]), int(text[17:19])
+            ).timestamp()
+        return self._last_time
+
+    def parse_line(self, line):
+        """
+        Extract the level, timestamp and job of a log line.
+
+        Returns:
+            tuple: (level number, epoch seconds, job number); level 0 for
+                   lines that do not start a record
+        """
+        match = TEXT_LINE.match(line)
+        if match:
+            job = match.group(3)
+        else:
+            match = JSON_LINE.match(line)
+            if not match:
+                return 0, 0.0, 0
+            job_match = JSON_JOB.search(line)
+            job = job_match.group(1) if job_match else None
+        return (
+            LEVELS.get(match.group(2), 0),
+            self._parse_time(match.group(1)),
+            self._job_number(job) if job else 0
+        )
+
+    def refresh(self):
+        """
+        Bring the index up to date with the files on disk.
+
+        Returns:
+            int: Total number of indexed lines
+        """
+        with self.lock:
+            known = {segment.identity: segment for segment in self.segments}
+            segments = []
+            for path in self.segment_paths():
+                try:
+                    stat_result = os.stat(path)
+                except OSError:
+                    continue
+                identity = (stat_result.st_dev, stat_result.st_ino)
+
+                # A rotated file keeps its identity, so its index is reused
+                segment = known.get(identity)
+                truncated = (segment is not None and not segment.compressed
+                             and stat_result.st_size < segment.end)
+                if segment is None or truncated:
+                    segment = LogSegment(path, identity)
+                segment.path = path
+                segment.update(self)
+                segments.append(segment)
+            self.segments = segments
+            return self.line_count
+
+    @property
+    def line_count(self):
+        """Total number of indexed lines."""
+        return sum(len(segment) for segment in self.segments)
+
+    def jobs(self):
+        """List the job ids seen in the indexed lines."""
+        with self.lock:
+            return self.job_names[1:]
+
+    def query(self, min_level=0, start_time=None, end_time=None, job=None,
+              pattern=None, ignore_case=True, cancel_event=None):
+        """
+        Select the lines matching all given filters.
+
+        Args:
+            min_level (int, optional): Minimum logging level, e.g. logging.WARNING
+            start_time (float, optional): Earliest timestamp (epoch seconds)
+            end_time (float, optional): Latest timestamp (epoch seconds)
+            job (str, optional): Job id
+            pattern (str, optional): Regular expression matched against each line
+            ignore_case (bool, optional): Match the pattern case-insensitively
+            cancel_event (threading.Event, optional): Set to abandon the query
+
+        Returns:
+            LogSelection: Matching lines, or None if cancelled
+        """
+        with self.lock:
+            snapshot = [(segment, len(segment)) for segment in self.segments]
+            job_number = self.job_numbers.get(job.encode("utf-8")) if job else None
+
+        total = sum(count for _, count in snapshot)
+        if not (min_level or start_time or end_time or job or pattern):
+            # No filters: every line, without materializing the list
+            return LogSelection(snapshot, range(total))
+        if job and job_number is None:
+            return LogSelection(snapshot, array("Q"))
+
+        regex = None
+        if pattern:
+            regex = re.compile(pattern.encode("utf-8"), re.IGNORECASE if ignore_case else 0)
+
+        rows = array("Q")
+        base = 0
+        for segment, count in snapshot:
+            candidates = [
+                i for i in range(count)
+                if segment.levels[i] >= min_level
+                and (start_time is None or segment.times[i] >= start_time)
+                and (end_time is None or segment.times[i] <= end_time)
+                and (job_number is None or segment.jobs[i] == job_number)
+            ]
+            if regex is not None and candidates:
+                candidates = self._grep(segment, candidates, regex, cancel_event)
+                if candidates is None:
+                    return None
+            rows.extend(base + i for i in candidates)
+            base += count
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+        return LogSelection(snapshot, rows)
+
+    def _grep(self, segment, candidates, regex, cancel_event):
+        """Stream candidate lines of a segment from disk and keep those matching regex."""
+        matches = []
+        try:
+            lines = segment.iter_lines(candidates)
+            for n, (line, data) in enumerate(zip(candidates, lines)):
+                if regex.search(data):
+                    matches.append(line)
+                if n % 100000 == 0 and cancel_event is not None and cancel_event.is_set():
+                    return None
+        except OSError:
+            pass
+        return matches
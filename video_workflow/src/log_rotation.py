@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Log Rotation for Automated Video Workflow
+
+A rotating file handler that rolls over on size and/or on an hourly or
+daily schedule. Rolling over only renames files; the rotated segment is
+compressed (gzip, or zstd when the zstandard package is installed) by a
+background thread, so the thread that triggered the rollover is not held
+up by compression.
+
+Backups keep the RotatingFileHandler naming (workflow.log.1 is the most
+recent) with a .gz or .zst suffix once compressed. open_log() and
+backup_paths() let readers handle plain and compressed segments alike.
+"""
+
+import os
+import gzip
+import time
+import queue
+import shutil
+import sys
+import threading
+from datetime import datetime, timedelta
+from logging.handlers import BaseRotatingHandler
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Suffixes of compressed segments, by compression method
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Rollover schedules
+INTERVALS = ("hourly", "daily")
+
+# Serializes renames between rollovers and the compression thread
+_rename_lock = threading.Lock()
+
+
+def open_log(path):
+    """
+    Open a log file or compressed log segment for binary reading.
+
+    Args:
+        path (str): Plain, .gz or .zst log file
+
+    Returns:
+        A binary file object yielding the uncompressed content
+    """
+    path = str(path)
+    if path.endswith(SUFFIXES["gzip"]):
+        return gzip.open(path, "rb")
+    if path.endswith(SUFFIXES["zstd"]):
+        if zstandard is None:
+            raise OSError(f"Cannot read {path}: the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def is_compressed(path):
+    """Check whether a log segment is compressed."""
+    return str(path).endswith(tuple(SUFFIXES.values()))
+
+
+def backup_paths(base_path):
+    """
+    List the rotated backups of a log file, most recent first.
+
+    Args:
+        base_path (str): Path of the active log file
+
+    Returns:
+        list: (backup number, path) pairs, plain or compressed
+    """
+    directory, name = os.path.split(str(base_path))
+    backups = []
+    try:
+        entries = os.listdir(directory or ".")
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.startswith(name + "."):
+            continue
+        suffix = entry[len(name) + 1:]
+        for compressed_suffix in SUFFIXES.values():
+            if suffix.endswith(compressed_suffix):
+                suffix = suffix[:-len(compressed_suffix)]
+                break
+        if suffix.isdigit():
+            backups.append((int(suffix), os.path.join(directory, entry)))
+    return sorted(backups)
+
+
+class SegmentCompressor:
+    """Background thread compressing rotated log segments."""
+
+    def __init__(self, method="gzip"):
+        """
+        Initialize the compressor.
+
+        Args:
+            method (str, optional): "gzip" or "zstd"
+        """
+        self.method = method
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="log-compress", daemon=True)
+        self.thread.start()
+
+    def submit(self, base_path, identity):
+        """Queue the rotated segment with the given (device, inode) for compression."""
+        self.jobs.put((base_path, identity))
+
+    def close(self):
+        """Finish queued work and stop the thread."""
+        self.jobs.put(None)
+        self.thread.join()
+
+    def _locate(self, base_path, identity):
+        """Find the current path of a rotated segment; later rollovers may have shifted it."""
+        for _, path in backup_paths(base_path):
+            if is_compressed(path):
+                continue
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                continue
+            if (stat_result.st_dev, stat_result.st_ino) == identity:
+                return path
+        return None
+
+    def _compress(self, src, destination):
+        """Compress the open file src into destination."""
+        with open(destination, "wb") as dst:
+            if self.method == "zstd":
+                with zstandard.ZstdCompressor(level=3).stream_writer(dst, closefd=False) as writer:
+                    shutil.copyfileobj(src, writer, 1024 * 1024)
+            else:
+                with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=6) as writer:
+                    shutil.copyfileobj(src, writer, 1024 * 1024)
+
+    def _run(self):
+        """Worker loop."""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            base_path, identity = job
+            # Outside the backup numbering, so rollovers leave it alone
+            temp_path = f"{base_path}.{identity[1]}.compressing"
+            try:
+                # The lock is only held to find the segment and to put the result
+                # in place; rollovers may shift the segment while it compresses
+                with _rename_lock:
+                    source = self._locate(base_path, identity)
+                    if source is None:
+                        continue
+                    src = open(source, "rb")
+                with src:
+                    self._compress(src, temp_path)
+                with _rename_lock:
+                    source = self._locate(base_path, identity)
+                    if source is None:
+                        # Dropped as the oldest backup meanwhile
+                        os.remove(temp_path)
+                        continue
+                    shutil.copystat(source, temp_path)
+                    os.replace(temp_path, source + SUFFIXES[self.method])
+                    os.remove(source)
+            except Exception as e:
+                # Leave the segment uncompressed; it is still a valid backup.
+                # Reported on stderr, since logging it could recurse into this handler
+                sys.stderr.write(f"Warning: could not compress log segment: {e}\n")
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+
+class CompressingRotatingFileHandler(BaseRotatingHandler):
+    """Rotating file handler with size and time policies and background compression."""
+
+    def __init__(self, filename, max_bytes=0, backup_count=5, interval=None,
+                 compression="gzip", encoding=None, delay=False):
+        """
+        Initialize the handler.
+
+        Args:
+            filename (str): Active log file
+            max_bytes (int, optional): Roll over once the file reaches this size (0 disables)
+            backup_count (int, optional): Rotated segments to keep
+            interval (str, optional): "hourly" or "daily" to also roll over on a schedule
+            compression (str, optional): "gzip", "zstd" or None
+            encoding (str, optional): File encoding
+            delay (bool, optional): Open the file on the first write
+        """
+        super().__init__(filename, "a", encoding=encoding, delay=delay)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.interval = interval if interval in INTERVALS else None
+
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        self.compression = compression if compression in SUFFIXES else None
+        self.compressor = SegmentCompressor(self.compression) if self.compression else None
+
+        self.rollover_at = self._next_rollover(datetime.now())
+
+    def _next_rollover(self, now):
+        """Get the epoch time of the next scheduled rollover, or None."""
+        if self.interval == "hourly":
+            boundary = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        elif self.interval == "daily":
+            boundary = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        else:
+            return None
+        return boundary.timestamp()
+
+    def shouldRollover(self, record):
+        """Check the size and schedule policies."""
+        if self.backup_count <= 0:
+            return False
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            # Checked before the write, so a file may exceed the limit by one record;
+            # this avoids formatting every record twice
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def _shift_backups(self):
+        """Renumber existing backups, dropping the oldest."""
+        suffixes = [""] + list(SUFFIXES.values())
+        for suffix in suffixes:
+            oldest = f"{self.baseFilename}.{self.backup_count}{suffix}"
+            if os.path.exists(oldest):
+                os.remove(oldest)
+        for number in range(self.backup_count - 1, 0, -1):
+            for suffix in suffixes:
+                source = f"{self.baseFilename}.{number}{suffix}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.baseFilename}.{number + 1}{suffix}")
+
+    def doRollover(self):
+        """Rename the active file to .1 and start a new one; compression happens later."""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        identity = None
+        with _rename_lock:
+            if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+                self._shift_backups()
+                rotated = f"{self.baseFilename}.1"
+                os.replace(self.baseFilename, rotated)
+                stat_result = os.stat(rotated)
+                identity = (stat_result.st_dev, stat_result.st_ino)
+
+        if not self.delay:
+            self.stream = self._open()
+        self.rollover_at = self._next_rollover(datetime.now())
+
+        if identity is not None and self.compressor is not None:
+            self.compressor.submit(self.baseFilename, identity)
+
+    def close(self):
+        """Close the file and finish any pending compression."""
+        super().close()
+        if self.compressor is not None:
+            self.compressor.close()
+            self.compressor = None
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Log Tail Follower for Automated Video Workflow
+
+Follows a growing log file the way `tail -F` does: only bytes appended
+since the last read are read, and rotation by RotatingFileHandler (the
+file is renamed to .1 and a new one created) or truncation is detected
+from the file's identity and size. The file is reopened on every read
+rather than held open, so it never blocks rotation on Windows.
+"""
+
+import os
+
+from log_rotation import SUFFIXES, open_log
+
+# Bytes read from the end of a file when following starts
+INITIAL_TAIL_BYTES = 256 * 1024
+
+# Upper bound on bytes read per call, so one call never stalls the caller
+MAX_READ_BYTES = 4 * 1024 * 1024
+
+
+class LogTailer:
+    """Incremental reader for a log file that may be rotated."""
+
+    def __init__(self, path, initial_tail_bytes=INITIAL_TAIL_BYTES, max_read_bytes=MAX_READ_BYTES):
+        """
+        Initialize the tailer.
+
+        Args:
+            path (str): Log file to follow
+            initial_tail_bytes (int, optional): Bytes of existing content shown
+                                                on the first read
+            max_read_bytes (int, optional): Maximum bytes read per call
+        """
+        self.path = str(path)
+        self.initial_tail_bytes = initial_tail_bytes
+        self.max_read_bytes = max_read_bytes
+
+        self.identity = None
+        self.offset = 0
+        self.partial = b""
+
+    @staticmethod
+    def _identity(stat_result):
+        """Identify a file across renames."""
+        return (stat_result.st_dev, stat_result.st_ino)
+
+    def _read_range(self, path, offset, limit):
+        """Read up to limit bytes from offset, returning the data."""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return f.read(limit)
+
+    def _drain_rotated(self):
+        """Read what was appended to the previous file before it was rotated."""
+        rotated = f"{self.path}.1"
+        try:
+            if self._identity(os.stat(rotated)) == self.identity:
+                return self._read_range(rotated, self.offset, self.max_read_bytes)
+        except OSError:
+            pass
+
+        # Already compressed; the identity is gone, so trust the newest backup
+        for suffix in SUFFIXES.values():
+            try:
+                with open_log(rotated + suffix) as f:
+                    f.seek(self.offset)
+                    return f.read(self.max_read_bytes)
+            except OSError:
+                continue
+        return b""
+
+    def _lines(self, data):
+        """Split data into complete lines, keeping a trailing partial line."""
+        data = self.partial + data
+        end = data.rfind(b"\n") + 1
+        self.partial = data[end:]
+        return data[:end].decode("utf-8", errors="replace")
+
+    def read_new(self):
+        """
+        Read lines appended since the last call.
+
+        Returns:
+            tuple: (text of complete new lines, event) where event is
+                   "rotated" or "truncated" if that happened since the last
+                   call, otherwise None. After rotation the text holds the
+                   end of the old file followed by the start of the new one.
+        """
+        try:
+            stat_result = os.stat(self.path)
+        except OSError:
+            return "", None
+
+        identity = self._identity(stat_result)
+        event = None
+        carried = ""
+        skip_partial_line = False
+
+        if self.identity is None:
+            # First read: start near the end instead of reading the whole file
+            self.offset = max(0, stat_result.st_size - self.initial_tail_bytes)
+            skip_partial_line = self.offset > 0
+        elif identity != self.identity:
+            # Rotated: finish the old file, then start the new one from the top
+            carried = self._lines(self._drain_rotated())
+            self.partial = b""
+            self.offset = 0
+            event = "rotated"
+        elif stat_result.st_size < self.offset:
+            # Truncated in place
+            self.offset = 0
+            self.partial = b""
+            event = "truncated"
+
+        self.identity = identity
+
+        data = b""
+        if stat_result.st_size > self.offset:
+            data = self._read_range(self.path, self.offset, self.max_read_bytes)
+            self.offset += len(data)
+
+        if skip_partial_line:
+            # The tail window usually starts in the middle of a line
+            newline = data.find(b"\n")
+            data = data[newline + 1:] if newline >= 0 else b""
+
+        return carried + self._lines(data), event
+
+    @property
+    def caught_up(self):
+        """Whether the last read reached the end of the file."""
+        try:
+            return os.path.getsize(self.path) <= self.offset
+        except OSError:
+            return True
@@ -3,13 +3,229 @@
 Logger for Automated Video Workflow
 
 Sets up logging for the application with configurable options.
+
+By default records are handed to a bounded in-memory queue and written by
+a background listener thread, so code logging from copy, proxy and upload
+loops never waits on the console or on file I/O and rotation. If the
+queue is full the record is dropped and counted rather than blocking.
+
+With "format": "json" the log file is written as JSON lines carrying
+job_id, stage, file, bytes, duration_ms and throughput fields, so
+per-stage throughput can be analysed from the logs. Use log_event() to
+log with these fields and log_context() to tag everything logged by the
+current thread with a job.
 """
 
 import os
+import copy
+import json
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+from log_rotation import CompressingRotatingFileHandler
+
+# Background listener writing queued records, if asynchronous logging is on
+_listener = None
+_queue_handler = None
+
+# Renders exceptions before records cross to the listener thread
+_exception_formatter = logging.Formatter()
+
+# Workflow stages used as the 'stage' field and as child logger names
+STAGES = ("import", "structure", "proxy", "export", "upload")
+
+# Structured fields carried by records and written in JSON mode
+EVENT_FIELDS = ("job_id", "stage", "file", "bytes", "duration_ms")
+
+# Job and stage of the code currently running in this thread
+_job_id = contextvars.ContextVar("job_id", default=None)
+_stage = contextvars.ContextVar("stage", default=None)
+
+
+def new_job_id(stage=None):
+    """
+    Create a new job identifier.
+
+    Args:
+        stage (str, optional): Stage name used as a readable prefix
+
+    Returns:
+        str: Job identifier, e.g. "upload-3f2a9c1e"
+    """
+    # os.urandom avoids importing uuid, which is slow to import
+    suffix = os.urandom(4).hex()
+    return f"{stage}-{suffix}" if stage else suffix
+
+
+@contextmanager
+def log_context(job_id=None, stage=None):
+    """
+    Tag records logged by the current thread with a job and stage.
+
+    Args:
+        job_id (str, optional): Job identifier
+        stage (str, optional): Workflow stage
+    """
+    job_token = _job_id.set(job_id)
+    stage_token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(stage_token)
+        _job_id.reset(job_token)
+
+
+def log_event(stage, message, level=logging.INFO, job_id=None, **fields):
+    """
+    Log a message for a workflow stage with structured fields.
+
+    Args:
+        stage (str): Workflow stage, one of STAGES
+        message (str): Log message
+        level (int, optional): Logging level
+        job_id (str, optional): Job identifier. Defaults to the current log_context.
+        **fields: Extra fields, e.g. file, bytes, duration_ms
+    """
+    extra = dict(fields, stage=stage)
+    if job_id is not None:
+        extra["job_id"] = job_id
+    logging.getLogger(f"video_workflow.{stage}").log(level, message, extra=extra)
+
+
+class ContextFilter(logging.Filter):
+    """Fills in job_id and stage from log_context for records that lack them."""
+
+    def filter(self, record):
+        if getattr(record, "job_id", None) is None:
+            record.job_id = _job_id.get()
+        if getattr(record, "stage", None) is None:
+            record.stage = _stage.get()
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """Plain-text formatter that can show a record's job as %(job_tag)s."""
+
+    def formatMessage(self, record):
+        job_id = getattr(record, "job_id", None)
+        record.job_tag = f"[{job_id}] " if job_id else ""
+        return super().formatMessage(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for field in EVENT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                event[field] = value
+
+        # Derive throughput so every stage reports it the same way
+        size = event.get("bytes")
+        duration_ms = event.get("duration_ms")
+        if size is not None and duration_ms:
+            event["throughput_mb_s"] = round(size / (1024 * 1024) / (duration_ms / 1000), 3)
+
+        if record.exc_info:
+            event["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            event["exc"] = record.exc_text
+        return json.dumps(event, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that never blocks the logging thread.
+
+    Records that do not fit in the bounded queue are dropped and counted;
+    the next record that gets through is preceded by a warning with the
+    number of records lost.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._reported = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record):
+        """
+        Make a record safe to hand to another thread.
+
+        Cheaper than the default, which formats every record: only the
+        message arguments and exception are rendered, since they may refer
+        to objects that change after the call returns. The changes are made
+        to a copy, so other handlers still see the caller's record intact.
+        """
+        prepared = copy.copy(record)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = _exception_formatter.formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record):
+        """Put a record on the queue without waiting."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+            return
+
+        if self.dropped != self._reported:
+            with self._drop_lock:
+                lost = self.dropped - self._reported
+                self._reported = self.dropped
+            warning = logging.LogRecord(
+                record.name, logging.WARNING, __file__, 0,
+                f"Log queue full: dropped {lost} log records", None, None
+            )
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                with self._drop_lock:
+                    self._reported -= lost
+
+
+def shutdown_logger():
+    """Stop the background listener, writing out any queued records."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
+
+
+def get_dropped_count():
+    """
+    Get the number of log records dropped because the queue was full.
+
+    Returns:
+        int: Dropped record count (0 when logging synchronously)
+    """
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+atexit.register(shutdown_logger)
+
 def setup_logger(config=None):
     """
     Set up and configure the application logger.
@@ -26,7 +242,12 @@ def setup_logger(config=None):
         "level": "INFO",
         "file_path": "../logs/workflow.log",
         "max_size_mb": 10,
-        "backup_count": 5
+        "backup_count": 5,
+        "async": True,
+        "queue_size": 10000,
+        "format": "text",
+        "compression": "gzip",
+        "rotate_interval": None
     }
     
     # Use provided config or default
@@ -35,17 +256,21 @@ def setup_logger(config=None):
     # Create logger
     logger = logging.getLogger("video_workflow")
     
-    # Clear any existing handlers
+    # Clear any existing handlers, stopping a previous listener first
+    shutdown_logger()
     if logger.handlers:
+        for handler in logger.handlers:
+            handler.close()
         logger.handlers.clear()
+    handlers = []
     
     # Set log level
     log_level = getattr(logging, log_config.get("level", "INFO"))
     logger.setLevel(log_level)
     
     # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    file_formatter = TextFormatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(job_tag)s%(message)s'
     )
     console_formatter = logging.Formatter(
         '%(asctime)s - %(levelname)s - %(message)s'
@@ -55,7 +280,7 @@ def setup_logger(config=None):
     console_handler = logging.StreamHandler()
     console_handler.setLevel(log_level)
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # Create file handler if file path is provided
     if log_config.get("file_path"):
@@ -85,18 +310,38 @@ def setup_logger(config=None):
         # Create directory if it doesn't exist
         os.makedirs(log_path.parent, exist_ok=True)
         
-        # Set up rotating file handler
+        # Set up rotating file handler; rotated files are compressed in the background
         max_bytes = log_config.get("max_size_mb", 10) * 1024 * 1024  # Convert MB to bytes
         backup_count = log_config.get("backup_count", 5)
         
-        file_handler = RotatingFileHandler(
+        file_handler = CompressingRotatingFileHandler(
             log_path, 
-            maxBytes=max_bytes,
-            backupCount=backup_count
+            max_bytes=max_bytes,
+            backup_count=backup_count,
+            interval=log_config.get("rotate_interval"),
+            compression=log_config.get("compression", "gzip")
         )
         file_handler.setLevel(log_level)
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        if log_config.get("format", "text") == "json":
+            file_handler.setFormatter(JsonLinesFormatter())
+        else:
+            file_handler.setFormatter(file_formatter)
+        handlers.append(file_handler)
+    
+    if log_config.get("async", True):
+        # Write records on a background thread; logging calls only enqueue
+        global _listener, _queue_handler
+        log_queue = queue.Queue(maxsize=log_config.get("queue_size", 10000))
+        _queue_handler = DroppingQueueHandler(log_queue)
+        # Context must be captured on the logging thread, before the queue
+        _queue_handler.addFilter(ContextFilter())
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        logger.addHandler(_queue_handler)
+    else:
+        for handler in handlers:
+            handler.addFilter(ContextFilter())
+            logger.addHandler(handler)
     
     logger.info("Logger initialized")
     return logger
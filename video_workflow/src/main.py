@@ -3,20 +3,21 @@
 Automated Video Workflow - Main Application
 
 This script handles the main workflow for automated video processing.
-It can run in either GUI mode or CLI mode.
+It can run in GUI mode, CLI mode, or as a headless ingest daemon.
+
+Each mode imports only the modules it needs, inside the function that
+runs it, so scripted CLI runs and the daemon never load PyQt6 or the GUI. Use
+--profile-startup to see what a mode imports and how long startup takes,
+and --trace FILE to record a timeline of the run for chrome://tracing or
+https://ui.perfetto.dev.
 """
 
+# Imported first so startup timing covers all other imports
+import startup_timing
+
 import os
 import sys
-import json
-import logging
 import argparse
-from pathlib import Path
-
-# Local imports
-from config_manager import ConfigManager
-from logger import setup_logger
-from disk_monitor import DiskMonitor
 
 def main():
     """Main entry point for the application."""
@@ -25,25 +26,50 @@ def main():
     parser.add_argument("--gui", action="store_true", help="Run in GUI mode")
     parser.add_argument("--cli", action="store_true", help="Run in CLI mode")
     parser.add_argument("--structure-only", action="store_true", help="Only create folder structure")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Run headless: import cards, make proxies, file and upload exports")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report import and startup times of the selected mode, then exit")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Record workflow spans and write a Chrome trace to FILE on exit")
     args = parser.parse_args()
     
     # Default to GUI mode if no mode is specified
-    if not (args.gui or args.cli or args.structure_only):
+    if not (args.gui or args.cli or args.structure_only or args.daemon):
         args.gui = True
     
+    # Re-run the selected mode under the import profiler
+    if args.profile_startup:
+        mode_args = [arg for arg in sys.argv[1:] if arg != "--profile-startup"]
+        sys.exit(startup_timing.profile_startup(os.path.abspath(__file__), mode_args))
+    
+    if args.trace:
+        import tracing
+        tracing.start(args.trace)
+    
     # Run in GUI mode
     if args.gui:
         run_gui_mode()
         return
     
-    # Run in CLI mode
+    if args.daemon:
+        run_daemon_mode()
+        return
+    
+    run_cli_mode(args)
+
+def run_cli_mode(args):
+    """Run the application in CLI mode."""
+    from config_manager import get_config_manager
+    from logger import setup_logger
+    
     # Initialize logger
     logger = setup_logger()
     logger.info("Starting Automated Video Workflow (CLI Mode)")
     
     # Load configuration
     try:
-        config_manager = ConfigManager()
+        config_manager = get_config_manager()
         config = config_manager.get_config()
         logger.info("Configuration loaded successfully")
     except Exception as e:
@@ -52,14 +78,20 @@ def main():
     
     # If structure-only flag is set, just create the folder structure
     if args.structure_only:
+        if startup_ready():
+            return
         create_folder_structure(config, logger)
         return
     
+    from disk_monitor import get_disk_monitor
+    if startup_ready():
+        return
+    
     # Check if SSD is mounted
-    disk_monitor = DiskMonitor(logger)
+    disk_monitor = get_disk_monitor(config, logger)
     if not disk_monitor.is_drive_mounted(config.get('ssd_name')):
         logger.warning(f"External SSD '{config.get('ssd_name')}' not mounted")
-        
+    
         # Wait for SSD to be mounted
         logger.info(f"Waiting for SSD '{config.get('ssd_name')}' to be mounted...")
         if disk_monitor.wait_for_drive(config.get('ssd_name'), timeout=60, check_interval=2):
@@ -68,10 +100,53 @@ def main():
             logger.error(f"Timeout waiting for SSD '{config.get('ssd_name')}'") 
             sys.exit(1)
     
-    # TODO: Implement full CLI workflow
-    
     logger.info("Workflow completed")
 
+def run_daemon_mode():
+    """Run the headless ingest daemon until interrupted."""
+    from config_manager import get_config_manager
+    from logger import setup_logger, shutdown_logger
+    
+    logger = setup_logger()
+    logger.info("Starting Automated Video Workflow (Daemon Mode)")
+    
+    try:
+        config_manager = get_config_manager()
+        # Log with the configured settings rather than the defaults
+        logger = setup_logger(config_manager.get_config())
+    except Exception as e:
+        logger.error(f"Failed to load configuration: {e}")
+        sys.exit(1)
+    
+    from daemon import IngestDaemon
+    from disk_monitor import get_disk_monitor
+    from metrics import start_metrics_server
+    from progress import ConsoleProgress
+    if startup_ready():
+        return
+    
+    metrics_server = start_metrics_server(config_manager.get_config(), logger)
+    try:
+        # Device throughput is drawn under the job bars
+        disk_monitor = get_disk_monitor(config_manager.get_config(), logger)
+        with ConsoleProgress(telemetry=disk_monitor):
+            IngestDaemon(config_manager, logger, disk_monitor).run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+        shutdown_logger()
+
+def startup_ready():
+    """
+    Record that CLI startup is complete.
+    
+    Returns:
+        bool: True if this is a profiled run that should exit now
+    """
+    startup_timing.mark("cli_ready")
+    startup_timing.report()
+    return startup_timing.exit_requested()
+
 def run_gui_mode():
     """Run the application in GUI mode."""
     try:
@@ -88,6 +163,7 @@ def run_gui_mode():
         # Import GUI modules here to avoid dependencies if running in CLI mode
         try:
             from gui.main_window import run_gui
+            startup_timing.mark("gui_imported")
             run_gui()
         except ImportError as e:
             print(f"Error: Could not load GUI modules: {e}")
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Metrics for Automated Video Workflow
+
+Counters, gauges and histograms of pipeline throughput and latency,
+served over HTTP in the Prometheus text format (or OpenMetrics when the
+scraper asks for it), so several ingest stations can be charted and
+alerted on together.
+
+The import, proxy, export and upload code records into the shared
+WorkflowMetrics from get_metrics(); recording is a lock and a dictionary
+update per file or chunk, and happens whether or not anything scrapes.
+The endpoint itself is optional: start_metrics_server() starts it when
+the "metrics" section of the configuration enables it.
+
+    curl http://127.0.0.1:9464/metrics
+"""
+
+import math
+import threading
+from contextlib import contextmanager
+
+from logger import get_dropped_count
+
+PREFIX = "video_workflow_"
+
+# Upper bounds of the histogram buckets; +Inf is added to each
+THROUGHPUT_BUCKETS_MBPS = (10, 25, 50, 100, 200, 400, 800, 1600, 3200)
+FPS_BUCKETS = (5, 10, 25, 50, 100, 200, 400, 800)
+LATENCY_BUCKETS_SECONDS = (1, 2, 5, 10, 30, 60, 120, 300, 600)
+DURATION_BUCKETS_SECONDS = (0.1, 0.5, 1, 5, 10, 30, 60, 300)
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+               for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metric:
+    """A named family of samples, one per combination of label values."""
+
+    type_name = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        """
+        Args:
+            name (str): Name without the common prefix or a _total suffix
+            help_text (str): Description shown by the endpoint
+            labelnames (tuple, optional): Label names; values are passed as keywords
+        """
+        self.name = PREFIX + name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, label values, extra labels, value) for each sample."""
+        with self.lock:
+            return [("", key, (), value) for key, value in self.values.items()]
+
+    def render(self, openmetrics=False):
+        """Lines of the exposition format for this metric."""
+        samples = self.samples()
+        name = self.name
+        # The Prometheus text format names counter families after their samples
+        if self.type_name == "counter" and not openmetrics:
+            name += "_total"
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} {self.type_name}"]
+        for suffix, key, extra, value in samples:
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    type_name = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        # Unlabelled counters are reported from zero before anything happens
+        if not self.labelnames:
+            self.values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        """Add to the counter."""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            return [("_total", key, (), value) for key, value in self.values.items()]
+
+
+class CounterFunction(Counter):
+    """A counter whose value is read from a function when scraped."""
+
+    def __init__(self, name, help_text, function):
+        super().__init__(name, help_text)
+        self.function = function
+
+    def samples(self):
+        return [("_total", (), (), self.function())]
+
+
+class Gauge(Metric):
+    """A value that goes up and down, set directly or computed when scraped."""
+
+    type_name = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), function=None):
+        """
+        Args:
+            function (callable, optional): Returns the current values when
+                scraped, as {label values tuple: value}; replaces set()
+        """
+        super().__init__(name, help_text, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        """Set the gauge."""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def samples(self):
+        if self.function is not None:
+            return [("", key, (), value) for key, value in self.function().items()]
+        return super().samples()
+
+
+class Histogram(Metric):
+    """Counts of observations in cumulative buckets, with their sum."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.bounds = tuple(sorted(buckets)) + (math.inf,)
+        if not self.labelnames:
+            self.values[()] = [0] * len(self.bounds) + [0.0]
+
+    def observe(self, value, **labels):
+        """Record one observation."""
+        key = self._key(labels)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * len(self.bounds) + [0.0]
+            for index, bound in enumerate(self.bounds):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            counts[-1] += value
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            for key, counts in self.values.items():
+                cumulative = 0
+                for bound, count in zip(self.bounds, counts):
+                    cumulative += count
+                    samples.append(("_bucket", key, (("le", _format_value(bound)),), cumulative))
+                samples.append(("_count", key, (), cumulative))
+                samples.append(("_sum", key, (), counts[-1]))
+        return samples
+
+
+def _rate_mbps(nbytes, seconds):
+    return nbytes / max(seconds, 1e-6) / (1024 * 1024)
+
+
+class WorkflowMetrics:
+    """Every metric the workflow records, with helpers for the common observations."""
+
+    def __init__(self):
+        self.scan_files = Counter("scan_files", "Directory entries examined while scanning cards")
+        self.scan_duration = Histogram("scan_duration_seconds", "Time to scan a card",
+                                       DURATION_BUCKETS_SECONDS)
+        self.import_bytes = Counter("import_bytes", "Bytes copied from cards")
+        self.import_files = Counter("import_files", "Files copied from cards")
+        self.copy_throughput = Histogram("copy_throughput_mbps", "Copy throughput per file, in MB/s",
+                                         THROUGHPUT_BUCKETS_MBPS)
+        self.hash_bytes = Counter("hash_bytes", "Bytes read to compute digests", ("purpose",))
+        self.hash_throughput = Histogram("hash_throughput_mbps", "Hashing throughput per file, in MB/s",
+                                         THROUGHPUT_BUCKETS_MBPS, ("purpose",))
+        self.proxy_files = Counter("proxy_files", "Proxies encoded", ("result",))
+        self.proxy_frames = Counter("proxy_frames", "Frames encoded into proxies")
+        self.proxy_fps = Histogram("proxy_fps", "Proxy encoding speed per file, in frames per second",
+                                   FPS_BUCKETS)
+        self.pipeline_queue_depth = Gauge("pipeline_queue_depth", "Items waiting in front of each pipeline stage",
+                                          ("stage",), function=self._queue_depths)
+        self.export_files = Counter("export_files", "Exports moved into master storage")
+        self.export_bytes = Counter("export_bytes", "Bytes of exports moved into master storage")
+        self.export_pickup_latency = Histogram("export_pickup_latency_seconds",
+                                               "Time from an export's last write to its move into master storage",
+                                               LATENCY_BUCKETS_SECONDS)
+        self.upload_bytes = Counter("upload_bytes", "Bytes uploaded")
+        self.upload_files = Counter("upload_files", "Files uploaded", ("result",))
+        self.upload_throughput = Histogram("upload_throughput_mbps", "Upload throughput per file, in MB/s",
+                                           THROUGHPUT_BUCKETS_MBPS)
+        self.upload_retries = Counter("upload_retries", "Upload requests retried after an error")
+        self.log_dropped = CounterFunction("log_records_dropped", "Log records dropped because the queue was full",
+                                           get_dropped_count)
+
+        self.pipelines = set()
+        self.pipelines_lock = threading.Lock()
+
+    def all(self):
+        """Every metric, in exposition order."""
+        return [value for value in vars(self).values() if isinstance(value, Metric)]
+
+    def render(self, openmetrics=False):
+        """
+        Render every metric in the exposition format.
+
+        Args:
+            openmetrics (bool, optional): OpenMetrics rather than the Prometheus text format
+
+        Returns:
+            str: The response body
+        """
+        lines = []
+        for metric in self.all():
+            lines.extend(metric.render(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def record_copy(self, nbytes, seconds):
+        """A file copied from a card."""
+        self.import_bytes.inc(nbytes)
+        self.import_files.inc()
+        self.copy_throughput.observe(_rate_mbps(nbytes, seconds))
+
+    def record_hash(self, purpose, nbytes, seconds):
+        """A file read through to compute its digests, e.g. purpose "verify"."""
+        self.hash_bytes.inc(nbytes, purpose=purpose)
+        self.hash_throughput.observe(_rate_mbps(nbytes, seconds), purpose=purpose)
+
+    def record_proxy(self, success, frames=None, seconds=None):
+        """A proxy encoded; frames is None if ffmpeg did not report them."""
+        self.proxy_files.inc(result="ok" if success else "failed")
+        if success and frames:
+            self.proxy_frames.inc(frames)
+            self.proxy_fps.observe(frames / max(seconds, 1e-6))
+
+    def record_export(self, nbytes, latency):
+        """An export moved into master storage, latency seconds after it was last written."""
+        self.export_files.inc()
+        self.export_bytes.inc(nbytes)
+        self.export_pickup_latency.observe(max(0.0, latency))
+
+    def record_upload(self, success, nbytes=0, seconds=0.0):
+        """A file upload finished."""
+        self.upload_files.inc(result="ok" if success else "failed")
+        if success:
+            self.upload_bytes.inc(nbytes)
+            self.upload_throughput.observe(_rate_mbps(nbytes, seconds))
+
+    @contextmanager
+    def watch_pipeline(self, pipeline):
+        """Report a pipeline's queue depths while it runs."""
+        with self.pipelines_lock:
+            self.pipelines.add(pipeline)
+        try:
+            yield pipeline
+        finally:
+            with self.pipelines_lock:
+                self.pipelines.discard(pipeline)
+
+    def _queue_depths(self):
+        with self.pipelines_lock:
+            pipelines = list(self.pipelines)
+        depths = {}
+        for pipeline in pipelines:
+            for stage, depth in pipeline.queue_depths().items():
+                depths[(stage,)] = depths.get((stage,), 0) + depth
+        return depths
+
+
+# Shared metrics
+_shared_metrics = None
+_shared_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """
+    Get the shared workflow metrics, creating them on first use.
+
+    Returns:
+        WorkflowMetrics: The shared metrics
+    """
+    global _shared_metrics
+    with _shared_metrics_lock:
+        if _shared_metrics is None:
+            _shared_metrics = WorkflowMetrics()
+        return _shared_metrics
+
+
+class MetricsServer:
+    """Serves /metrics over HTTP on a background thread."""
+
+    def __init__(self, metrics=None, host="127.0.0.1", port=9464):
+        """
+        Initialize the server.
+
+        Args:
+            metrics (WorkflowMetrics, optional): Defaults to the shared metrics
+            host (str, optional): Address to listen on
+            port (int, optional): Port to listen on; 0 picks a free port
+        """
+        self.metrics = metrics or get_metrics()
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.thread = None
+
+    def start(self):
+        """Start listening; self.port holds the bound port afterwards."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                """Silence the default stderr request logging."""
+
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = metrics.render(openmetrics).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop listening."""
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+            self.thread.join()
+            self.thread = None
+
+
+def start_metrics_server(config, logger=None):
+    """
+    Start the metrics endpoint if the configuration enables it.
+
+    Args:
+        config (Mapping): Configuration snapshot with a "metrics" section
+        logger: Logger instance for logging events
+
+    Returns:
+        MetricsServer: The running server, or None if disabled or it could not start
+    """
+    settings = config.get('metrics') or {}
+    if not settings.get('enabled'):
+        return None
+    server = MetricsServer(host=settings.get('host', '127.0.0.1'), port=settings.get('port', 9464))
+    try:
+        server.start()
+    except OSError as e:
+        if logger:
+            logger.error(f"Could not start metrics endpoint on {server.host}:{server.port}: {e}")
+        return None
+    if logger:
+        logger.info(f"Serving metrics on http://{server.host}:{server.port}/metrics")
+    return server
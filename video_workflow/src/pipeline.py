@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Pipeline Orchestrator for Automated Video Workflow
+
+Streams items (usually files) through a graph of stages, each running on
+its own worker threads, so a file can be proxied while the next one is
+still being copied. Stages are connected by bounded queues: a stage that
+falls behind fills its input queue, and the stages feeding it then block
+until it catches up, so fast I/O stages can never pile up unbounded work
+in front of slow CPU-bound ones.
+
+A stage is a function taking one item and returning the item to pass on,
+or None to drop it. An item that raises is recorded as failed and goes no
+further; other items carry on.
+
+    pipeline = Pipeline()
+    pipeline.add_stage("import", copy_one)
+    pipeline.add_stage("verify", verify_one, after="import")
+    pipeline.add_stage("proxy", encode_one, after="verify", workers=2)
+    result = pipeline.run(files)
+"""
+
+import time
+import queue
+import logging
+import threading
+
+from tracing import span
+
+# Items waiting in front of each stage
+DEFAULT_QUEUE_SIZE = 4
+
+# Marks the end of a stage's input
+_END = object()
+
+logger = logging.getLogger("video_workflow.pipeline")
+
+
+class StageStats:
+    """Counters of one stage, updated by its workers."""
+
+    def __init__(self, name):
+        self.name = name
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.busy = 0.0
+
+    def __repr__(self):
+        return f"{self.name}: {self.processed} done, {self.failed} failed, {self.busy:.1f}s busy"
+
+
+class Stage:
+    """One step of a pipeline with its input queue and workers."""
+
+    def __init__(self, name, func, workers=1, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        Initialize the stage.
+
+        Args:
+            name (str): Stage name, unique within the pipeline
+            func (callable): Processes one item; returns the item to pass on or None
+            workers (int, optional): Worker threads running func
+            queue_size (int, optional): Items allowed to wait in front of the stage
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.upstream = []
+        self.downstream = []
+        self.stats = StageStats(name)
+        self.lock = threading.Lock()
+        self.open_inputs = 0
+        self.running_workers = 0
+        self.outputs = []
+
+    def close_input(self):
+        """Record that one upstream producer has finished."""
+        with self.lock:
+            self.open_inputs -= 1
+            last = self.open_inputs == 0
+        if last:
+            for _ in range(self.workers):
+                self.queue.put(_END)
+
+
+class PipelineResult:
+    """Outcome of a pipeline run."""
+
+    def __init__(self, outputs, errors, stats, elapsed, cancelled):
+        """
+        Args:
+            outputs (dict): Stage name to items it passed on, for stages with no downstream
+            errors (list): (stage name, item, exception) for each failed item
+            stats (dict): Stage name to StageStats
+            elapsed (float): Wall-clock seconds
+            cancelled (bool): Whether the run was cancelled
+        """
+        self.outputs = outputs
+        self.errors = errors
+        self.stats = stats
+        self.elapsed = elapsed
+        self.cancelled = cancelled
+
+    @property
+    def success(self):
+        """Whether every item went through every stage."""
+        return not self.errors and not self.cancelled
+
+    def summary(self):
+        """One-line description of the run."""
+        stages = ", ".join(
+            f"{name} {stats.processed} in {stats.busy:.1f}s" for name, stats in self.stats.items()
+        )
+        failed = f", {len(self.errors)} failed" if self.errors else ""
+        return f"{stages}{failed}; {self.elapsed:.1f}s wall clock"
+
+
+class Pipeline:
+    """A graph of stages connected by bounded queues; each pipeline runs once."""
+
+    def __init__(self, is_cancelled=None, on_error=None, job_id=None):
+        """
+        Initialize an empty pipeline.
+
+        Args:
+            is_cancelled (callable, optional): Returns True to stop; queued items are discarded
+            on_error (callable, optional): Called with (stage name, item, exception) on failure
+            job_id (str, optional): Job the trace spans of the stages belong to
+        """
+        self.stages = {}
+        self.is_cancelled = is_cancelled
+        self.on_error = on_error
+        self.job_id = job_id
+        self.errors = []
+        self.errors_lock = threading.Lock()
+        self.cancelled = False
+
+    def add_stage(self, name, func, after=None, workers=1, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        Add a stage.
+
+        Args:
+            name (str): Stage name
+            func (callable): Processes one item; returns the item to pass on or None
+            after (str or list, optional): Stage(s) whose output feeds this one;
+                                           None for a stage fed by run()
+            workers (int, optional): Worker threads
+            queue_size (int, optional): Items allowed to wait in front of the stage
+
+        Returns:
+            Stage: The new stage
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        stage = Stage(name, func, workers, queue_size)
+        if after is not None:
+            for upstream_name in ([after] if isinstance(after, str) else after):
+                upstream = self.stages[upstream_name]
+                upstream.downstream.append(stage)
+                stage.upstream.append(upstream)
+        self.stages[name] = stage
+        return stage
+
+    def queue_depths(self):
+        """Items currently waiting in front of each stage."""
+        return {name: stage.queue.qsize() for name, stage in self.stages.items()}
+
+    def _cancel_requested(self):
+        if not self.cancelled and self.is_cancelled is not None and self.is_cancelled():
+            self.cancelled = True
+        return self.cancelled
+
+    def _worker(self, stage):
+        """Run a stage's function over its queue until the input ends."""
+        try:
+            self._process(stage)
+        except Exception:
+            # A failure outside the stage function. Stop the run, but keep
+            # draining so producers never block on this stage's full queue
+            logger.exception(f"Pipeline worker of stage {stage.name} failed")
+            self.cancelled = True
+            while stage.queue.get() is not _END:
+                pass
+        finally:
+            with stage.lock:
+                stage.running_workers -= 1
+                last = stage.running_workers == 0
+            if last:
+                for downstream in stage.downstream:
+                    downstream.close_input()
+
+    def _process(self, stage):
+        """Process a stage's queue until the input ends."""
+        while True:
+            item = stage.queue.get()
+            if item is _END:
+                break
+            if self._cancel_requested():
+                # Keep draining so producers never block on a full queue
+                continue
+
+            start = time.monotonic()
+            try:
+                with span(stage.name, category="pipeline", job_id=self.job_id):
+                    output = stage.func(item)
+            except Exception as e:
+                output = None
+                with stage.lock:
+                    stage.stats.failed += 1
+                with self.errors_lock:
+                    self.errors.append((stage.name, item, e))
+                if self.on_error is not None:
+                    try:
+                        self.on_error(stage.name, item, e)
+                    except Exception:
+                        logger.exception(f"Error handler failed for stage {stage.name}")
+            else:
+                with stage.lock:
+                    stage.stats.processed += 1
+                    if output is None:
+                        stage.stats.dropped += 1
+            finally:
+                with stage.lock:
+                    stage.stats.busy += time.monotonic() - start
+
+            if output is None:
+                continue
+            if stage.downstream:
+                for downstream in stage.downstream:
+                    downstream.queue.put(output)
+            else:
+                with stage.lock:
+                    stage.outputs.append(output)
+
+    def run(self, items):
+        """
+        Push items through the pipeline and wait for every stage to finish.
+
+        Feeding blocks while the first stages' queues are full.
+
+        Args:
+            items (iterable): Items fed to every stage without an upstream
+
+        Returns:
+            PipelineResult: Outputs, errors and per-stage counters
+        """
+        if not self.stages:
+            raise ValueError("Pipeline has no stages")
+        start = time.monotonic()
+        sources = [stage for stage in self.stages.values() if not stage.upstream]
+
+        threads = []
+        for stage in self.stages.values():
+            stage.open_inputs = len(stage.upstream) or 1
+            stage.running_workers = stage.workers
+            for index in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(stage,), name=f"pipeline-{stage.name}-{index}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                if self._cancel_requested():
+                    break
+                for stage in sources:
+                    stage.queue.put(item)
+        finally:
+            for stage in sources:
+                stage.close_input()
+
+        for thread in threads:
+            thread.join()
+
+        stats = {name: stage.stats for name, stage in self.stages.items()}
+        outputs = {name: list(stage.outputs) for name, stage in self.stages.items() if not stage.downstream}
+        return PipelineResult(outputs, list(self.errors), stats, time.monotonic() - start, self.cancelled)
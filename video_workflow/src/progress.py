@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Progress Reporting for Automated Video Workflow
+
+Workers publish progress by updating plain attributes on a JobProgress;
+nothing is signalled or redrawn on the worker's side. Consumers sample
+the jobs at their own pace: the GUI on a single timer, the CLI through
+ConsoleProgress. advance() takes a short lock, so several workers can
+count into the same job; a worker can also report its own item with
+set_item_bytes(), which is a single dictionary store.
+"""
+
+import sys
+import time
+import threading
+from collections import namedtuple
+
+# Interval between console redraws on a terminal, and between lines otherwise
+CONSOLE_INTERVAL = 0.5
+CONSOLE_LOG_INTERVAL = 5.0
+
+
+class ProgressSnapshot(namedtuple("ProgressSnapshot", [
+        "key", "stage", "job_id", "done", "total", "done_bytes", "total_bytes",
+        "current", "elapsed", "finished", "error"])):
+    """Point-in-time copy of a job's progress."""
+
+    __slots__ = ()
+
+    @property
+    def fraction(self):
+        """Completed share of the job, by bytes when known and by items otherwise."""
+        if self.total_bytes:
+            return min(1.0, self.done_bytes / self.total_bytes)
+        if self.total:
+            return min(1.0, self.done / self.total)
+        return 1.0 if self.finished else 0.0
+
+    @property
+    def percent(self):
+        """Completed share as a whole percentage."""
+        return int(self.fraction * 100)
+
+    @property
+    def rate(self):
+        """Average throughput in bytes per second."""
+        return self.done_bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class JobProgress:
+    """Progress of one job, written by its workers and sampled by readers."""
+
+    def __init__(self, key, stage, job_id=None, total=0, total_bytes=0):
+        """
+        Initialize the job.
+
+        Args:
+            key (str): Name the job is registered under, e.g. "proxy"
+            stage (str): Workflow stage, see logger.STAGES
+            job_id (str, optional): Job id used in log records
+            total (int, optional): Number of items, e.g. files
+            total_bytes (int, optional): Number of bytes, if known
+        """
+        self.key = key
+        self.stage = stage
+        self.job_id = job_id
+        self.total = total
+        self.total_bytes = total_bytes
+        self.done = 0
+        self.done_bytes = 0
+        self.items = {}
+        self.current = ""
+        self.started = time.monotonic()
+        self.ended = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def set_total(self, total=None, total_bytes=None):
+        """Set the number of items and/or bytes once they are known."""
+        if total is not None:
+            self.total = total
+        if total_bytes is not None:
+            self.total_bytes = total_bytes
+
+    def advance(self, count=1, nbytes=0):
+        """Record finished items and processed bytes; safe across threads."""
+        with self.lock:
+            self.done += count
+            self.done_bytes += nbytes
+
+    def set_item_bytes(self, item, nbytes):
+        """Record the bytes processed so far for one item; safe across threads, one writer per item."""
+        self.items[item] = nbytes
+
+    def set_current(self, text):
+        """Describe what the job is doing right now."""
+        self.current = text
+
+    def finish(self, error=None):
+        """Mark the job finished, optionally with an error message."""
+        self.error = error
+        self.ended = time.monotonic()
+
+    @property
+    def finished(self):
+        """Whether the job has finished."""
+        return self.ended is not None
+
+    def snapshot(self):
+        """
+        Take a consistent-enough copy of the job's state for display.
+
+        Returns:
+            ProgressSnapshot: The current state
+        """
+        # dict.copy() is atomic, so this never sees the dictionary mid-update
+        item_bytes = sum(self.items.copy().values())
+        ended = self.ended
+        return ProgressSnapshot(
+            self.key, self.stage, self.job_id, self.done, self.total,
+            self.done_bytes + item_bytes, self.total_bytes, self.current,
+            (ended or time.monotonic()) - self.started, ended is not None, self.error
+        )
+
+
+class ProgressBus:
+    """Registry of running and recently finished jobs."""
+
+    def __init__(self):
+        """Initialize an empty bus."""
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def start(self, key, stage=None, job_id=None, total=0, total_bytes=0):
+        """
+        Register a new job, replacing any earlier job with the same key.
+
+        Args:
+            key (str): Name of the job, e.g. "import"
+            stage (str, optional): Workflow stage; defaults to key
+            job_id (str, optional): Job id used in log records
+            total (int, optional): Number of items
+            total_bytes (int, optional): Number of bytes
+
+        Returns:
+            JobProgress: The job, to be updated by its worker
+        """
+        job = JobProgress(key, stage or key, job_id, total, total_bytes)
+        with self.lock:
+            self.jobs[key] = job
+        return job
+
+    def get(self, key):
+        """Get the job registered under key, or None."""
+        with self.lock:
+            return self.jobs.get(key)
+
+    def snapshots(self, include_finished=True):
+        """
+        Sample every registered job.
+
+        Args:
+            include_finished (bool, optional): Include finished jobs
+
+        Returns:
+            list: ProgressSnapshot for each job, in start order
+        """
+        with self.lock:
+            jobs = list(self.jobs.values())
+        snapshots = [job.snapshot() for job in jobs]
+        if not include_finished:
+            snapshots = [snapshot for snapshot in snapshots if not snapshot.finished]
+        return snapshots
+
+
+def format_bytes(count):
+    """Format a byte count for display."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024:
+            return f"{count:.1f} {unit}" if unit != "B" else f"{count} B"
+        count /= 1024
+    return f"{count:.1f} TB"
+
+
+def format_progress(snapshot, width=24):
+    """
+    Format a one-line text progress bar.
+
+    Args:
+        snapshot (ProgressSnapshot): Job state
+        width (int, optional): Width of the bar in characters
+
+    Returns:
+        str: e.g. "upload [#########---------------]  37% 12/32 1.2 GB/3.1 GB 85.0 MB/s"
+    """
+    filled = int(snapshot.fraction * width)
+    parts = [f"{snapshot.key} [{'#' * filled}{'-' * (width - filled)}] {snapshot.percent:3d}%"]
+    if snapshot.total:
+        parts.append(f"{snapshot.done}/{snapshot.total}")
+    if snapshot.total_bytes:
+        parts.append(f"{format_bytes(snapshot.done_bytes)}/{format_bytes(snapshot.total_bytes)}")
+    if snapshot.done_bytes and snapshot.elapsed > 0:
+        parts.append(f"{format_bytes(snapshot.rate)}/s")
+    if snapshot.error:
+        parts.append(f"failed: {snapshot.error}")
+    elif snapshot.current and not snapshot.finished:
+        parts.append(snapshot.current)
+    return " ".join(parts)
+
+
+class ConsoleProgress:
+    """
+    Draws progress bars for active jobs on a console.
+
+    On a terminal the bars are redrawn in place; otherwise (e.g. output
+    redirected to a file) a line per job is printed every few seconds.
+    Use as a context manager around CLI work.
+    """
+
+    def __init__(self, bus=None, stream=None, interval=None, telemetry=None):
+        """
+        Initialize the console display.
+
+        Args:
+            bus (ProgressBus, optional): Bus to sample; defaults to the shared bus
+            stream (file, optional): Output stream; defaults to stderr
+            interval (float, optional): Seconds between updates
+            telemetry (DiskMonitor, optional): Device activity shown with the bars
+        """
+        self.bus = bus or get_progress_bus()
+        self.telemetry = telemetry
+        self.stream = stream or sys.stderr
+        self.interactive = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.interval = interval or (CONSOLE_INTERVAL if self.interactive else CONSOLE_LOG_INTERVAL)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.reported = set()
+        self.last_width = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        """Start drawing on a background thread."""
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="console-progress", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Draw a final update and stop."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.draw()
+        if self.interactive and self.last_width:
+            self.stream.write("\n")
+            self.stream.flush()
+
+    def _run(self):
+        """Sampling loop."""
+        while not self.stop_event.wait(self.interval):
+            self.draw()
+
+    def draw(self):
+        """Sample the bus and write one update."""
+        lines = []
+        for snapshot in self.bus.snapshots():
+            identity = (snapshot.key, snapshot.job_id)
+            if snapshot.finished:
+                # Report each finished job once
+                if identity in self.reported:
+                    continue
+                self.reported.add(identity)
+            lines.append(format_progress(snapshot))
+
+        if not lines:
+            return
+        devices = self.telemetry.format_telemetry() if self.telemetry is not None else ""
+        if devices:
+            lines.append(devices)
+        if self.interactive:
+            text = " | ".join(lines)
+            padding = max(0, self.last_width - len(text))
+            self.stream.write("\r" + text + " " * padding)
+            self.last_width = len(text)
+        else:
+            self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+
+# Process-wide shared bus
+_shared_bus = None
+_shared_bus_lock = threading.Lock()
+
+
+def get_progress_bus():
+    """
+    Get the shared progress bus.
+
+    Returns:
+        ProgressBus: The shared bus
+    """
+    global _shared_bus
+    with _shared_bus_lock:
+        if _shared_bus is None:
+            _shared_bus = ProgressBus()
+        return _shared_bus
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Startup Timing for Automated Video Workflow
+
+Records named milestones of application startup (imports done, window
+shown, first paint, first tab ready) as milliseconds since this module
+was first imported. main.py imports it before anything else so the
+clock starts as early as possible. The milestones are logged once
+startup is complete.
+
+profile_startup() backs `main.py --profile-startup`: it re-runs the
+application under `python -X importtime` with PROFILE_ENV set, so the
+selected mode starts up and exits instead of doing any work, and then
+prints the slowest imports together with the startup milestones.
+
+Only os, sys and time are imported at module level; they are loaded by
+the interpreter itself, so importing this module costs nothing.
+"""
+
+import os
+import sys
+import time
+
+_start = time.perf_counter()
+_marks = []
+_reported = False
+
+# Set in the environment of a profiled run; the application exits once started
+PROFILE_ENV = "VIDEO_WORKFLOW_PROFILE_STARTUP"
+
+# Prefix of milestone lines a profiled run writes to stderr
+MARK_PREFIX = "startup-mark:"
+
+
+def elapsed_ms():
+    """Milliseconds since startup began."""
+    return (time.perf_counter() - _start) * 1000
+
+
+def mark(name):
+    """
+    Record a startup milestone.
+
+    Args:
+        name (str): Milestone name, e.g. "first_paint"
+
+    Returns:
+        float: Milliseconds since startup began
+    """
+    elapsed = elapsed_ms()
+    _marks.append((name, elapsed))
+    return elapsed
+
+
+def get_marks():
+    """List the recorded (name, milliseconds) milestones in order."""
+    return list(_marks)
+
+
+def exit_requested():
+    """Whether this is a profiled run that should exit once started."""
+    return os.environ.get(PROFILE_ENV) == "1"
+
+
+def report(logger=None):
+    """
+    Log the recorded milestones once.
+
+    In a profiled run they are written to stderr for profile_startup()
+    instead.
+
+    Args:
+        logger (logging.Logger, optional): Logger to use
+    """
+    global _reported
+    if _reported or not _marks:
+        return
+    _reported = True
+    if exit_requested():
+        for name, elapsed in _marks:
+            print(f"{MARK_PREFIX} {name} {elapsed:.1f}", file=sys.stderr)
+        return
+
+    import logging
+    logger = logger or logging.getLogger("video_workflow.startup")
+    logger.info("Startup: " + ", ".join(f"{name} {elapsed:.0f} ms" for name, elapsed in _marks))
+
+
+def parse_importtime(lines):
+    """
+    Parse `python -X importtime` output.
+
+    Args:
+        lines (iterable): stderr lines of the profiled process
+
+    Returns:
+        list: (module, self microseconds, cumulative microseconds, depth) tuples
+    """
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Header line
+            continue
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return imports
+
+
+def profile_startup(script, args, top=15, stream=None):
+    """
+    Run the application under the import profiler and print a report.
+
+    Args:
+        script (str): Path of main.py
+        args (list): Command line arguments selecting the mode to profile
+        top (int, optional): Number of modules listed per table
+        stream (file, optional): Output stream; defaults to stdout
+
+    Returns:
+        int: Exit status of the profiled run
+    """
+    import subprocess
+
+    stream = stream or sys.stdout
+    env = dict(os.environ, **{PROFILE_ENV: "1"})
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", script] + list(args),
+        env=env, stderr=subprocess.PIPE, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    lines = process.stderr.splitlines()
+    imports = parse_importtime(lines)
+    marks = []
+    for line in lines:
+        if line.startswith(MARK_PREFIX):
+            name, elapsed = line[len(MARK_PREFIX):].split()
+            marks.append((name, float(elapsed)))
+        elif not line.startswith("import time:"):
+            # Pass through anything else the application wrote
+            print(line, file=sys.stderr)
+
+    def table(title, rows):
+        print(title, file=stream)
+        for name, micros in rows:
+            print(f"  {micros / 1000:8.1f} ms  {name}", file=stream)
+
+    top_level = sorted((i for i in imports if i[3] == 0), key=lambda i: i[2], reverse=True)
+    table(f"Slowest top-level imports (cumulative, top {top}):",
+          [(name, cumulative) for name, _, cumulative, _ in top_level[:top]])
+    by_self = sorted(imports, key=lambda i: i[1], reverse=True)
+    table(f"Slowest modules (own time, top {top}):",
+          [(name, own) for name, own, _, _ in by_self[:top]])
+
+    total = sum(own for _, own, _, _ in imports)
+    print(f"Imports: {len(imports)} modules, {total / 1000:.1f} ms", file=stream)
+    if marks:
+        print("Milestones (since main.py started importing):", file=stream)
+        for name, elapsed in marks:
+            print(f"  {elapsed:8.1f} ms  {name}", file=stream)
+    print(f"Process wall time: {wall_ms:.1f} ms (exit status {process.returncode})", file=stream)
+    return process.returncode
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Span Tracing for Automated Video Workflow
+
+Records where the time of a session goes as nested spans, for viewing on
+a timeline in chrome://tracing or https://ui.perfetto.dev:
+
+    with span("verify", job_id=job_id, file=path):
+        ...
+
+    @traced()
+    def move_export(...):
+        ...
+
+Spans are timed per thread and nest by time on each thread, so pipeline
+workers, proxy encoders and upload threads each get their own track.
+A span takes the job_id of the span enclosing it on the same thread
+unless given one, and job_span() adds a track per job covering its
+whole lifetime across threads.
+
+Tracing is off until start() is called (`main.py --trace FILE`). While
+off, span() returns a shared no-op object and traced() functions run
+after a single flag check, so instrumented code costs next to nothing.
+save() writes the Chrome trace event JSON, which Perfetto also opens;
+a path ending in .gz is compressed.
+"""
+
+import os
+import json
+import gzip
+import time
+import atexit
+import inspect
+import functools
+import threading
+
+# Events kept before further ones are dropped, so a long daemon session
+# cannot grow without bound (about 200 bytes each)
+DEFAULT_MAX_EVENTS = 1000000
+
+_enabled = False
+_events = []
+_max_events = DEFAULT_MAX_EVENTS
+_dropped = 0
+_threads = set()
+_lock = threading.Lock()
+_local = threading.local()
+_start_ns = time.perf_counter_ns()
+
+
+def enabled():
+    """Whether spans are being recorded."""
+    return _enabled
+
+
+def _timestamp(ns):
+    """Microseconds since tracing started, as the trace format expects."""
+    return (ns - _start_ns) / 1000
+
+
+def _emit(event):
+    """Add an event, naming the thread the first time it records one."""
+    global _dropped
+    tid = event["tid"]
+    with _lock:
+        if len(_events) >= _max_events:
+            _dropped += 1
+            return
+        if tid not in _threads:
+            _threads.add(tid)
+            _events.append({"name": "thread_name", "ph": "M", "pid": event["pid"], "tid": tid,
+                            "args": {"name": threading.current_thread().name}})
+        _events.append(event)
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class Span:
+    """A timed region of one thread; use through span() or traced()."""
+
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, job_id, args):
+        stack = _stack()
+        if job_id is None and stack:
+            job_id = stack[-1].args.get("job_id")
+        if job_id is not None:
+            args["job_id"] = job_id
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def set(self, **args):
+        """Attach values to the span, e.g. the bytes it processed."""
+        self.args.update(args)
+
+    def __enter__(self):
+        _stack().append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        elif self in stack:
+            # A generator's span, closed while its consumer had spans open
+            stack.remove(self)
+        if exc_type is not None:
+            self.args["error"] = f"{exc_type.__name__}: {exc}"
+        _emit({
+            "name": self.name, "cat": self.category, "ph": "X",
+            "ts": _timestamp(self.start), "dur": (end - self.start) / 1000,
+            "pid": os.getpid(), "tid": threading.get_ident(), "args": self.args
+        })
+        return False
+
+
+class _NullSpan:
+    """Stands in for a span while tracing is off."""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, category="workflow", job_id=None, **args):
+    """
+    Time a block of code.
+
+    Args:
+        name (str): Span name shown on the timeline
+        category (str, optional): Trace category, for filtering
+        job_id (str, optional): Job the work belongs to; defaults to the
+                                enclosing span's job on this thread
+        **args: Values shown with the span, e.g. file=path
+
+    Returns:
+        Span: Context manager; a no-op while tracing is off
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, category, job_id, args)
+
+
+def annotate(**args):
+    """Attach values to the innermost span of this thread, if tracing."""
+    if _enabled:
+        stack = _stack()
+        if stack:
+            stack[-1].args.update(args)
+
+
+def traced(name=None, category="workflow"):
+    """
+    Decorator timing each call of a function as a span.
+
+    A job_id argument of the call becomes the span's job. For a
+    generator function the span runs from the first item requested until
+    the generator is exhausted or closed.
+
+    Args:
+        name (str, optional): Span name; defaults to the function's qualified name
+        category (str, optional): Trace category
+    """
+    def decorate(func):
+        label = name or func.__qualname__
+        parameters = list(inspect.signature(func).parameters)
+        position = parameters.index("job_id") if "job_id" in parameters else None
+
+        def job_of(args, kwargs):
+            if position is not None and len(args) > position:
+                return args[position]
+            return kwargs.get("job_id")
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return (yield from func(*args, **kwargs))
+                with Span(label, category, job_of(args, kwargs), {}):
+                    return (yield from func(*args, **kwargs))
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(label, category, job_of(args, kwargs), {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class _JobSpan:
+    """Async begin/end events giving a job its own track across threads."""
+
+    __slots__ = ("name", "job_id")
+
+    def __init__(self, name, job_id):
+        self.name = name
+        self.job_id = job_id
+
+    def _event(self, phase):
+        _emit({"name": self.name, "cat": "job", "ph": phase, "id": str(self.job_id),
+               "ts": _timestamp(time.perf_counter_ns()), "pid": os.getpid(), "tid": threading.get_ident(),
+               "args": {"job_id": self.job_id}})
+
+    def __enter__(self):
+        self._event("b")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._event("e")
+        return False
+
+
+def job_span(name, job_id):
+    """
+    Mark the lifetime of a job, e.g. a whole card import.
+
+    Args:
+        name (str): Job name, e.g. "import"
+        job_id (str): Job id; spans carrying it belong to the job
+
+    Returns:
+        Context manager; a no-op while tracing is off or without a job id
+    """
+    if not _enabled or job_id is None:
+        return _NULL_SPAN
+    return _JobSpan(name, job_id)
+
+
+def start(path=None, max_events=DEFAULT_MAX_EVENTS):
+    """
+    Start recording spans.
+
+    Args:
+        path (str, optional): Trace file written when the process exits
+        max_events (int, optional): Events kept before dropping further ones
+    """
+    global _enabled, _max_events
+    _max_events = max_events
+    _enabled = True
+    if path:
+        atexit.register(save, path)
+
+
+def stop():
+    """Stop recording; recorded spans are kept until save() or clear()."""
+    global _enabled
+    _enabled = False
+
+
+def clear():
+    """Discard recorded spans."""
+    global _dropped
+    with _lock:
+        _events.clear()
+        _threads.clear()
+        _dropped = 0
+
+
+def save(path):
+    """
+    Write the recorded spans as Chrome trace event JSON.
+
+    Args:
+        path (str): Output file; compressed with gzip if it ends in .gz
+
+    Returns:
+        int: Number of events written
+    """
+    with _lock:
+        events = list(_events)
+        dropped = _dropped
+    trace = {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": {"application": "Automated Video Workflow", "dropped_events": dropped}
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        json.dump(trace, f)
+    return len(events)
@@ -0,0 +1,662 @@
+#!/usr/bin/env python3
+"""
+Upload Engine for Automated Video Workflow
+
+Uploads files to the delivery platform in fixed-size chunks over a pool of
+keep-alive HTTP connections. Chunks of one file are sent concurrently, and
+several files can be in flight at once, so the uplink stays busy.
+
+Uploads are resumable: each file's upload session and acknowledged chunks
+are persisted locally, so after a crash or dropped connection only the
+missing chunks are sent again.
+
+Chunk bodies can be shaped by a BandwidthScheduler, which paces the
+bytes onto the wire according to the configured limits and schedule.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import http.client
+from queue import LifoQueue, Empty
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+from bandwidth import get_bandwidth_scheduler
+from metrics import get_metrics
+from tracing import annotate, traced
+
+# Errors that mean a pooled keep-alive connection went stale
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError
+)
+
+
+# HTTP statuses worth retrying after a backoff
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class UploadError(Exception):
+    """Raised when the upload API rejects a request."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def retryable(self):
+        """Whether the request may succeed if sent again."""
+        return self.status in RETRYABLE_STATUSES
+
+
+class UploadStateStore:
+    """Persists upload sessions and acknowledged chunks between runs."""
+
+    def __init__(self, state_dir):
+        """
+        Initialize the state store.
+
+        Args:
+            state_dir (str): Directory for session files
+        """
+        self.state_dir = state_dir
+        self.lock = threading.Lock()
+        os.makedirs(state_dir, exist_ok=True)
+
+    def _paths(self, file_path, endpoint):
+        """Get the session and ack file paths for a file and endpoint."""
+        key = hashlib.sha1(f"{os.path.abspath(file_path)}|{endpoint}".encode("utf-8")).hexdigest()
+        base = os.path.join(self.state_dir, key)
+        return base + ".json", base + ".acks"
+
+    def load(self, file_path, endpoint, file_size, mtime_ns, chunk_size):
+        """
+        Load a saved session for a file.
+
+        Returns:
+            tuple: (upload_id, set of acknowledged chunk indexes), or
+                   (None, empty set) if there is no usable session
+        """
+        session_path, acks_path = self._paths(file_path, endpoint)
+        try:
+            with open(session_path, "r") as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None, set()
+
+        # A changed file or chunk size invalidates the saved session
+        if (session.get("file_size") != file_size or session.get("mtime_ns") != mtime_ns
+                or session.get("chunk_size") != chunk_size):
+            self.remove(file_path, endpoint)
+            return None, set()
+
+        acked = set()
+        try:
+            with open(acks_path, "r") as f:
+                for line in f:
+                    # Ignore a torn last line from a crash mid-write
+                    if line.endswith("\n"):
+                        acked.add(int(line))
+        except (OSError, ValueError):
+            pass
+        return session.get("upload_id"), acked
+
+    def save(self, file_path, endpoint, upload_id, file_size, mtime_ns, chunk_size):
+        """Save a new session, discarding any previous acknowledgements."""
+        session_path, acks_path = self._paths(file_path, endpoint)
+        session = {
+            "file_path": os.path.abspath(file_path),
+            "endpoint": endpoint,
+            "upload_id": upload_id,
+            "file_size": file_size,
+            "mtime_ns": mtime_ns,
+            "chunk_size": chunk_size
+        }
+
+        # Write to a temporary file and rename so a crash never leaves a partial session
+        with self.lock:
+            tmp_path = session_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(session, f)
+            os.replace(tmp_path, session_path)
+            with open(acks_path, "w"):
+                pass
+
+    def ack(self, file_path, endpoint, index):
+        """Record an acknowledged chunk."""
+        _, acks_path = self._paths(file_path, endpoint)
+        with self.lock:
+            with open(acks_path, "a") as f:
+                f.write(f"{index}\n")
+
+    def remove(self, file_path, endpoint):
+        """Forget the session for a file."""
+        with self.lock:
+            for path in self._paths(file_path, endpoint):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+class ConnectionPool:
+    """Bounded pool of keep-alive HTTP connections to one endpoint."""
+
+    def __init__(self, endpoint, max_connections=4, timeout=60):
+        """
+        Initialize the connection pool.
+
+        Args:
+            endpoint (str): Upload API URL, e.g. https://api.example.com/upload
+            max_connections (int, optional): Maximum simultaneous connections
+            timeout (int, optional): Socket timeout in seconds
+        """
+        parsed = urlsplit(endpoint)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Unsupported upload endpoint: {endpoint}")
+
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def _new_connection(self):
+        """Open a new connection to the endpoint."""
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    @contextmanager
+    def connection(self, fresh=False):
+        """
+        Borrow a connection from the pool.
+
+        Blocks while all connections are in use. A connection that raised
+        an error is closed instead of being returned to the pool.
+
+        Args:
+            fresh (bool, optional): Open a new connection even if idle ones are pooled
+        """
+        self._slots.acquire()
+        try:
+            try:
+                if fresh:
+                    raise Empty
+                conn, reused = self._idle.get_nowait(), True
+            except Empty:
+                conn, reused = self._new_connection(), False
+
+            try:
+                yield conn, reused
+            except BaseException:
+                conn.close()
+                raise
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Send a request and read the full response.
+
+        Args:
+            method (str): HTTP method
+            path (str): Path below the endpoint's base path
+            body (bytes, optional): Request body
+            headers (dict, optional): Extra request headers
+
+        Returns:
+            tuple: (status code, response body bytes)
+        """
+        url = self.base_path + path
+        headers = dict(headers or {})
+        if body is not None:
+            headers.setdefault("Content-Length", str(len(body)))
+
+        fresh = False
+        while True:
+            with self.connection(fresh) as (conn, reused):
+                try:
+                    conn.request(method, url, body=body, headers=headers)
+                    response = conn.getresponse()
+                    data = response.read()
+                except STALE_CONNECTION_ERRORS:
+                    # The server closed an idle connection; retry once on a fresh one
+                    if reused:
+                        conn.close()
+                        fresh = True
+                        continue
+                    raise
+
+                if response.will_close:
+                    conn.close()
+                return response.status, data
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+
+class TransferStats:
+    """Thread-safe aggregate throughput counter."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = None
+        self.end_time = None
+        self.bytes_sent = 0
+        self.files_done = 0
+
+    def start(self):
+        """Mark the start of a transfer run."""
+        with self.lock:
+            if self.start_time is None:
+                self.start_time = time.monotonic()
+
+    def add_bytes(self, count):
+        """Record bytes acknowledged by the server."""
+        with self.lock:
+            self.bytes_sent += count
+
+    def add_file(self):
+        """Record a completed file."""
+        with self.lock:
+            self.files_done += 1
+
+    def finish(self):
+        """Mark the end of a transfer run."""
+        with self.lock:
+            self.end_time = time.monotonic()
+
+    @property
+    def elapsed(self):
+        """Seconds since the run started."""
+        if self.start_time is None:
+            return 0.0
+        end = self.end_time if self.end_time is not None else time.monotonic()
+        return end - self.start_time
+
+    @property
+    def throughput(self):
+        """Aggregate throughput in bytes per second."""
+        elapsed = self.elapsed
+        return self.bytes_sent / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Human-readable summary of the run."""
+        mb = self.bytes_sent / (1024 * 1024)
+        return (f"{self.files_done} files, {mb:.1f} MB in {self.elapsed:.1f}s "
+                f"({self.throughput / (1024 * 1024):.1f} MB/s)")
+
+
+class UploadResult:
+    """Outcome of uploading a single file."""
+
+    def __init__(self, file_path, success, size=0, elapsed=0.0, error=None, resumed_bytes=0):
+        self.file_path = file_path
+        self.success = success
+        self.size = size
+        self.elapsed = elapsed
+        self.error = error
+        self.resumed_bytes = resumed_bytes
+
+    @property
+    def throughput(self):
+        """Throughput of this file in bytes per second, excluding resumed bytes."""
+        sent = self.size - self.resumed_bytes
+        return sent / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class UploadEngine:
+    """Concurrent chunked uploader with per-endpoint connection pools."""
+
+    def __init__(self, api_key, chunk_size=8 * 1024 * 1024, max_connections=4,
+                 max_chunks_per_file=4, max_concurrent_files=2, timeout=60,
+                 max_retries=5, state_dir=None, bandwidth=None, logger=None):
+        """
+        Initialize the upload engine.
+
+        Args:
+            api_key (str): Bearer token sent with every request
+            chunk_size (int, optional): Chunk size in bytes. Defaults to 8 MB.
+            max_connections (int, optional): Connections per endpoint
+            max_chunks_per_file (int, optional): Chunks of one file in flight at once
+            max_concurrent_files (int, optional): Files uploaded at once
+            timeout (int, optional): Socket timeout in seconds
+            max_retries (int, optional): Attempts per request after a network error
+            state_dir (str, optional): Directory for resumable session state.
+                                       None disables resuming.
+            bandwidth (BandwidthScheduler, optional): Shapes chunk uploads.
+                                                      None sends at full speed.
+            logger: Logger instance for logging events
+        """
+        self.api_key = api_key
+        self.chunk_size = chunk_size
+        self.max_connections = max_connections
+        self.max_chunks_per_file = max_chunks_per_file
+        self.max_concurrent_files = max_concurrent_files
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.bandwidth = bandwidth
+        self.logger = logger
+
+        self.state = UploadStateStore(state_dir) if state_dir else None
+        self.stats = TransferStats()
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+
+        # Chunk workers are shared by all files; the pool bounds the real concurrency
+        self._chunk_executor = ThreadPoolExecutor(
+            max_workers=max(1, max_connections * 2),
+            thread_name_prefix="upload-chunk"
+        )
+
+    @classmethod
+    def from_config(cls, api_key, config, logger=None, state_dir=None):
+        """
+        Create an engine from the application configuration.
+
+        Args:
+            api_key (str): Bearer token sent with every request
+            config (dict): Configuration dictionary with an 'upload' section
+            logger: Logger instance for logging events
+            state_dir (str, optional): Directory for resumable session state
+
+        Returns:
+            UploadEngine: Configured engine
+        """
+        settings = config.get("upload", {}) if config else {}
+        return cls(
+            api_key,
+            chunk_size=int(settings.get("chunk_size_mb", 8) * 1024 * 1024),
+            max_connections=settings.get("max_connections", 4),
+            max_chunks_per_file=settings.get("max_chunks_per_file", 4),
+            max_concurrent_files=settings.get("max_concurrent_files", 2),
+            timeout=settings.get("timeout_seconds", 60),
+            max_retries=settings.get("max_retries", 5),
+            state_dir=state_dir,
+            bandwidth=get_bandwidth_scheduler(config, logger),
+            logger=logger
+        )
+
+    def get_pool(self, endpoint):
+        """Return the connection pool for an endpoint, creating it if needed."""
+        key = endpoint.rstrip("/")
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(key, self.max_connections, self.timeout)
+                self._pools[key] = pool
+            return pool
+
+    def _headers(self, extra=None):
+        """Build request headers."""
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        if extra:
+            headers.update(extra)
+        return headers
+
+    def with_retries(self, func, *args):
+        """
+        Call func, retrying network errors and retryable statuses with backoff.
+
+        Returns:
+            The return value of func
+        """
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except UploadError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                error = e
+            except (OSError, http.client.HTTPException) as e:
+                # Covers dropped connections, resets and socket timeouts
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+
+            attempt += 1
+            get_metrics().upload_retries.inc()
+            delay = min(0.5 * (2 ** (attempt - 1)), 10)
+            if self.logger:
+                self.logger.warning(f"Upload request failed ({error}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def _request_json(self, pool, method, path, payload=None):
+        """Send a JSON request and decode the JSON response."""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        status, data = pool.request(
+            method, path, body=body,
+            headers=self._headers({"Content-Type": "application/json"})
+        )
+        try:
+            response = json.loads(data) if data else {}
+        except ValueError:
+            response = {}
+        if status >= 400:
+            raise UploadError(response.get("error", f"HTTP {status}"), status)
+        return response
+
+    @traced("upload.chunk", category="upload")
+    def _send_chunk(self, pool, upload_id, file_path, endpoint, index, file_size, progress):
+        """Read one chunk from disk and send it."""
+        offset = index * self.chunk_size
+        length = min(self.chunk_size, file_size - offset)
+        annotate(index=index, bytes=length)
+        with open(file_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+
+        # A throttled body is paced while it is being sent, so rate changes apply mid-chunk
+        payload = self.bandwidth.wrap(endpoint, data) if self.bandwidth else data
+
+        def put_chunk():
+            status, body = pool.request(
+                "PUT", f"/uploads/{upload_id}/chunks/{index}", body=payload,
+                headers=self._headers({"Content-Type": "application/octet-stream"})
+            )
+            if status >= 400:
+                raise UploadError(f"Chunk {index} rejected: HTTP {status} {body[:200]!r}", status)
+
+        self.with_retries(put_chunk)
+
+        if self.state:
+            self.state.ack(file_path, endpoint, index)
+        self.stats.add_bytes(length)
+        progress(length)
+
+    def _resume_session(self, pool, file_path, endpoint, file_size, mtime_ns):
+        """
+        Find a saved session the server still knows about.
+
+        Returns:
+            tuple: (upload_id, set of chunk indexes the server already has),
+                   or (None, empty set) to start a new session
+        """
+        if not self.state:
+            return None, set()
+
+        upload_id, acked = self.state.load(file_path, endpoint, file_size, mtime_ns, self.chunk_size)
+        if not upload_id:
+            return None, set()
+
+        try:
+            status = self.with_retries(self._request_json, pool, "GET", f"/uploads/{upload_id}")
+        except UploadError as e:
+            if e.status in (404, 410):
+                # The server expired the session; start over
+                self.state.remove(file_path, endpoint)
+                return None, set()
+            if e.status in (405, 501):
+                # No status endpoint; trust the local acknowledgements
+                return upload_id, acked
+            raise
+
+        # The server's view is authoritative
+        return upload_id, set(status.get("received", []))
+
+    @traced("upload.file", category="upload")
+    def upload_file(self, file_path, endpoint, progress_callback=None, cancel_event=None):
+        """
+        Upload a single file in chunks.
+
+        Args:
+            file_path (str): File to upload
+            endpoint (str): Upload API URL
+            progress_callback (callable, optional): Called as
+                progress_callback(file_path, bytes_sent, file_size) from worker threads
+            cancel_event (threading.Event, optional): Set to abort the upload
+
+        Returns:
+            UploadResult: Outcome of the upload
+        """
+        annotate(file=file_path)
+        start_time = time.monotonic()
+        self.stats.start()
+
+        try:
+            pool = self.get_pool(endpoint)
+            file_stat = os.stat(file_path)
+            file_size = file_stat.st_size
+            chunk_count = max(1, -(-file_size // self.chunk_size))
+
+            upload_id, done = self._resume_session(pool, file_path, endpoint,
+                                                   file_size, file_stat.st_mtime_ns)
+            if upload_id is None:
+                session = self.with_retries(self._request_json, pool, "POST", "/uploads", {
+                    "file_name": os.path.basename(file_path),
+                    "file_size": file_size,
+                    "chunk_size": self.chunk_size,
+                    "chunk_count": chunk_count
+                })
+                upload_id = session["upload_id"]
+                if self.state:
+                    self.state.save(file_path, endpoint, upload_id, file_size,
+                                    file_stat.st_mtime_ns, self.chunk_size)
+
+            missing = [i for i in range(chunk_count) if i not in done]
+            resumed_bytes = sum(min(self.chunk_size, file_size - i * self.chunk_size)
+                                for i in done if i < chunk_count)
+            if done and self.logger:
+                self.logger.info(
+                    f"Resuming {os.path.basename(file_path)}: "
+                    f"{len(missing)} of {chunk_count} chunks left"
+                )
+
+            # Track bytes sent for this file across chunk threads
+            sent_lock = threading.Lock()
+            sent = [resumed_bytes]
+
+            def progress(count):
+                with sent_lock:
+                    sent[0] += count
+                    current = sent[0]
+                if progress_callback:
+                    progress_callback(file_path, current, file_size)
+
+            # Bound the chunks of this file that are in flight at once
+            in_flight = threading.BoundedSemaphore(self.max_chunks_per_file)
+            futures = []
+            for index in missing:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                in_flight.acquire()
+                future = self._chunk_executor.submit(
+                    self._send_chunk, pool, upload_id, file_path, endpoint, index, file_size, progress
+                )
+                future.add_done_callback(lambda _: in_flight.release())
+                futures.append(future)
+
+                # Stop queueing chunks as soon as one fails
+                failed = next((f for f in futures if f.done() and f.exception()), None)
+                if failed is not None:
+                    break
+
+            errors = [f.exception() for f in futures if f.exception() is not None]
+            if errors:
+                raise errors[0]
+            if len(futures) < len(missing):
+                return UploadResult(file_path, False, file_size, time.monotonic() - start_time,
+                                    "Upload cancelled", resumed_bytes)
+
+            self.with_retries(self._request_json, pool, "POST", f"/uploads/{upload_id}/complete")
+            if self.state:
+                self.state.remove(file_path, endpoint)
+            self.stats.add_file()
+
+            result = UploadResult(file_path, True, file_size, time.monotonic() - start_time,
+                                  resumed_bytes=resumed_bytes)
+            # Only the bytes sent in this run count towards throughput
+            get_metrics().record_upload(True, file_size - resumed_bytes, result.elapsed)
+            if self.logger:
+                self.logger.info(
+                    f"Uploaded {os.path.basename(file_path)} "
+                    f"({file_size / (1024 * 1024):.1f} MB, {result.throughput / (1024 * 1024):.1f} MB/s)"
+                )
+            return result
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error uploading {file_path}: {e}")
+            get_metrics().record_upload(False)
+            return UploadResult(file_path, False, 0, time.monotonic() - start_time, str(e))
+
+    def upload_files(self, files, endpoint, progress_callback=None, file_callback=None,
+                     cancel_event=None):
+        """
+        Upload several files concurrently.
+
+        Args:
+            files (list): Paths of files to upload
+            endpoint (str): Upload API URL
+            progress_callback (callable, optional): Per-chunk progress, see upload_file
+            file_callback (callable, optional): Called with each UploadResult as files finish
+            cancel_event (threading.Event, optional): Set to abort remaining uploads
+
+        Returns:
+            list: UploadResult for each file, in input order
+        """
+        self.stats.start()
+
+        def upload_one(file_path):
+            if cancel_event is not None and cancel_event.is_set():
+                result = UploadResult(file_path, False, error="Upload cancelled")
+            else:
+                result = self.upload_file(file_path, endpoint, progress_callback, cancel_event)
+            if file_callback:
+                file_callback(result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrent_files),
+                                thread_name_prefix="upload-file") as executor:
+            results = list(executor.map(upload_one, files))
+
+        self.stats.finish()
+        if self.logger:
+            self.logger.info(f"Upload run finished: {self.stats.summary()}")
+        return results
+
+    def close(self):
+        """Shut down worker threads and close pooled connections."""
+        self._chunk_executor.shutdown(wait=True)
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Local Upload Server for Automated Video Workflow
+
+A small stand-in for the delivery platform's upload API. It speaks the same
+chunked upload protocol as the upload engine so uploads can be tested offline:
+
+    POST /upload/uploads                      create an upload session
+    GET  /upload/uploads/<id>                 list the chunks received so far
+    PUT  /upload/uploads/<id>/chunks/<index>  send one chunk
+    POST /upload/uploads/<id>/complete        assemble the uploaded file
+    GET  /upload/digests/bloom                Bloom filter of uploaded MD5s
+    POST /upload/digests/lookup               which of a batch of MD5s exist
+
+Sessions and received chunks are persisted under <storage>/.parts, so an
+interrupted upload can be resumed even after the server restarts.
+
+Run it directly with:
+    python upload_server.py --storage ./received --port 8765
+"""
+
+import os
+import json
+import uuid
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from duplicate_checker import BloomFilter
+
+
+class UploadRequestHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the chunked upload protocol."""
+
+    # HTTP/1.1 keeps connections alive between requests
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Silence the default stderr request logging."""
+        if self.server.upload_server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        """Handle session status requests."""
+        parts = self._route()
+        if parts is None:
+            return
+
+        if len(parts) == 2 and parts[0] == "uploads":
+            self._session_status(parts[1])
+        elif parts == ["digests", "bloom"]:
+            self._send_json(200, self.server.upload_server.digest_filter().to_dict())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        """Handle session creation and completion requests."""
+        parts = self._route()
+        if parts is None:
+            return
+
+        if parts == ["uploads"]:
+            self._create_session()
+        elif parts == ["digests", "lookup"]:
+            self._lookup_digests()
+        elif len(parts) == 3 and parts[0] == "uploads" and parts[2] == "complete":
+            self._complete_session(parts[1])
+        else:
+            self._discard_body()
+            self._send_json(404, {"error": "Not found"})
+
+    def do_PUT(self):
+        """Handle chunk upload requests."""
+        parts = self._route()
+        if parts is None:
+            return
+
+        if len(parts) == 4 and parts[0] == "uploads" and parts[2] == "chunks":
+            self._receive_chunk(parts[1], parts[3])
+        else:
+            self._discard_body()
+            self._send_json(404, {"error": "Not found"})
+
+    def _route(self):
+        """
+        Check authorization and split the request path.
+
+        Returns:
+            list: Path components below the base path, or None if the
+                  request was rejected
+        """
+        server = self.server.upload_server
+
+        if server.api_key and self.headers.get("Authorization") != f"Bearer {server.api_key}":
+            self._discard_body()
+            self._send_json(401, {"error": "Invalid API key"})
+            return None
+
+        path = self.path.split("?", 1)[0]
+        if not path.startswith(server.base_path + "/"):
+            self._discard_body()
+            self._send_json(404, {"error": "Not found"})
+            return None
+
+        return [p for p in path[len(server.base_path):].split("/") if p]
+
+    def _read_body(self):
+        """Read the full request body."""
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _discard_body(self):
+        """Read and drop the request body so the connection can be reused."""
+        length = int(self.headers.get("Content-Length", 0))
+        while length > 0:
+            data = self.rfile.read(min(length, 1024 * 1024))
+            if not data:
+                break
+            length -= len(data)
+
+    def _send_json(self, status, payload):
+        """Send a JSON response."""
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _create_session(self):
+        """Create a new upload session."""
+        try:
+            request = json.loads(self._read_body() or b"{}")
+            file_name = os.path.basename(request["file_name"])
+            file_size = int(request["file_size"])
+            chunk_size = int(request["chunk_size"])
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"Invalid session request: {e}"})
+            return
+
+        if not file_name or chunk_size <= 0 or file_size < 0:
+            self._send_json(400, {"error": "Invalid session request"})
+            return
+
+        session = self.server.upload_server.create_session(file_name, file_size, chunk_size)
+        self._send_json(201, {"upload_id": session["upload_id"], "chunk_count": session["chunk_count"]})
+
+    def _lookup_digests(self):
+        """Report which of a batch of digests have been uploaded."""
+        try:
+            request = json.loads(self._read_body() or b"{}")
+            digests = list(request.get("digests", []))
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": f"Invalid lookup request: {e}"})
+            return
+
+        known = self.server.upload_server.digests
+        self._send_json(200, {"existing": [d for d in digests if d in known]})
+
+    def _session_status(self, upload_id):
+        """Report which chunks of a session have been received."""
+        session = self.server.upload_server.get_session(upload_id)
+        if session is None:
+            self._send_json(404, {"error": "Unknown upload session"})
+            return
+
+        with session["lock"]:
+            received = sorted(session["received"])
+        self._send_json(200, {
+            "upload_id": upload_id,
+            "chunk_count": session["chunk_count"],
+            "received": received
+        })
+
+    def _receive_chunk(self, upload_id, index):
+        """Write one chunk into the session's part file."""
+        server = self.server.upload_server
+        session = server.get_session(upload_id)
+        if session is None:
+            self._discard_body()
+            self._send_json(404, {"error": "Unknown upload session"})
+            return
+
+        try:
+            index = int(index)
+        except ValueError:
+            index = -1
+        if index < 0 or index >= session["chunk_count"]:
+            self._discard_body()
+            self._send_json(400, {"error": "Invalid chunk index"})
+            return
+
+        data = self._read_body()
+
+        # Simulate a dropped connection for resume testing
+        if server.should_drop_chunk():
+            self.close_connection = True
+            return
+
+        expected = min(session["chunk_size"], session["file_size"] - index * session["chunk_size"])
+        if len(data) != expected:
+            self._send_json(400, {"error": f"Expected {expected} bytes, got {len(data)}"})
+            return
+
+        server.write_chunk(session, index, data)
+        self._send_json(200, {"index": index, "received": len(session["received"])})
+
+    def _complete_session(self, upload_id):
+        """Assemble the uploaded file once every chunk has arrived."""
+        self._discard_body()
+        server = self.server.upload_server
+        session = server.get_session(upload_id)
+        if session is None:
+            self._send_json(404, {"error": "Unknown upload session"})
+            return
+
+        missing = session["chunk_count"] - len(session["received"])
+        if missing:
+            self._send_json(409, {"error": f"{missing} chunks missing"})
+            return
+
+        dest_path = server.complete_session(session)
+        self._send_json(200, {"status": "complete", "file_name": dest_path.name, "size": session["file_size"]})
+
+
+class LocalUploadServer:
+    """Threaded HTTP server that accepts chunked uploads into a directory."""
+
+    def __init__(self, storage_dir, host="127.0.0.1", port=0, api_key=None,
+                 base_path="/upload", verbose=False, drop_chunk_every=0):
+        """
+        Initialize the local upload server.
+
+        Args:
+            storage_dir (str): Directory where completed uploads are stored
+            host (str, optional): Interface to bind. Defaults to localhost.
+            port (int, optional): Port to bind. 0 picks a free port.
+            api_key (str, optional): Required bearer token. None accepts any request.
+            base_path (str, optional): URL path prefix of the upload API
+            verbose (bool, optional): Log every request to stderr
+            drop_chunk_every (int, optional): Drop the connection on every Nth
+                                              chunk request. 0 disables.
+        """
+        self.storage_dir = Path(storage_dir)
+        self.parts_dir = self.storage_dir / ".parts"
+        self.api_key = api_key
+        self.base_path = "/" + base_path.strip("/")
+        self.verbose = verbose
+        self.drop_chunk_every = drop_chunk_every
+        self.chunk_requests = 0
+
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self._load_sessions()
+
+        # MD5 digests of completed uploads, for duplicate checks
+        self.digests_path = self.storage_dir / ".digests"
+        self.digests = set()
+        if self.digests_path.exists():
+            with open(self.digests_path, "r") as f:
+                self.digests = {line.strip() for line in f if line.strip()}
+
+        self.httpd = ThreadingHTTPServer((host, port), UploadRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.upload_server = self
+        self.thread = None
+
+    @property
+    def url(self):
+        """Endpoint URL clients should upload to."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{self.base_path}"
+
+    def start(self):
+        """Start serving requests on a background thread."""
+        os.makedirs(self.parts_dir, exist_ok=True)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server and close the listening socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def _load_sessions(self):
+        """Reload unfinished sessions persisted by a previous run."""
+        if not self.parts_dir.is_dir():
+            return
+
+        for meta_path in self.parts_dir.glob("*.json"):
+            try:
+                with open(meta_path, "r") as f:
+                    session = json.load(f)
+                part_path = self.parts_dir / f"{session['upload_id']}.part"
+                if not part_path.exists():
+                    continue
+                session["received"] = self._read_acks(session["upload_id"])
+                session["lock"] = threading.Lock()
+                self.sessions[session["upload_id"]] = session
+            except (ValueError, KeyError, OSError):
+                continue
+
+    def _read_acks(self, upload_id):
+        """Read the set of received chunk indexes for a session."""
+        received = set()
+        acks_path = self.parts_dir / f"{upload_id}.acks"
+        if acks_path.exists():
+            with open(acks_path, "r") as f:
+                for line in f:
+                    # Ignore a torn last line from a crash mid-write
+                    if line.endswith("\n"):
+                        received.add(int(line))
+        return received
+
+    def digest_filter(self):
+        """Build a Bloom filter of the uploaded digests."""
+        with self.lock:
+            digests = list(self.digests)
+        bloom = BloomFilter.for_capacity(max(1000, len(digests) * 2))
+        for digest in digests:
+            bloom.add(digest)
+        return bloom
+
+    def should_drop_chunk(self):
+        """Decide whether to simulate a dropped connection for this chunk."""
+        if not self.drop_chunk_every:
+            return False
+        with self.lock:
+            self.chunk_requests += 1
+            return self.chunk_requests % self.drop_chunk_every == 0
+
+    def create_session(self, file_name, file_size, chunk_size):
+        """Register a new upload session and create its part file."""
+        chunk_count = max(1, -(-file_size // chunk_size))
+        session = {
+            "upload_id": uuid.uuid4().hex,
+            "file_name": file_name,
+            "file_size": file_size,
+            "chunk_size": chunk_size,
+            "chunk_count": chunk_count,
+            "received": set(),
+            "lock": threading.Lock()
+        }
+
+        part_path = self.parts_dir / f"{session['upload_id']}.part"
+        with open(part_path, "wb") as f:
+            f.truncate(file_size)
+
+        # Persist session metadata so it survives a restart
+        meta = {k: v for k, v in session.items() if k not in ("received", "lock")}
+        with open(self.parts_dir / f"{session['upload_id']}.json", "w") as f:
+            json.dump(meta, f)
+
+        with self.lock:
+            self.sessions[session["upload_id"]] = session
+        return session
+
+    def get_session(self, upload_id):
+        """Look up an upload session by ID."""
+        with self.lock:
+            return self.sessions.get(upload_id)
+
+    def write_chunk(self, session, index, data):
+        """Write chunk data at its offset in the part file."""
+        part_path = self.parts_dir / f"{session['upload_id']}.part"
+        with session["lock"]:
+            with open(part_path, "r+b") as f:
+                f.seek(index * session["chunk_size"])
+                f.write(data)
+            if index not in session["received"]:
+                # Record the chunk only after its data has been written
+                with open(self.parts_dir / f"{session['upload_id']}.acks", "a") as f:
+                    f.write(f"{index}\n")
+                session["received"].add(index)
+
+    def complete_session(self, session):
+        """Move a fully received part file into the storage directory."""
+        part_path = self.parts_dir / f"{session['upload_id']}.part"
+        dest_path = self.storage_dir / session["file_name"]
+        with session["lock"]:
+            # Index the content for duplicate checks
+            md5_hash = hashlib.md5()
+            with open(part_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    md5_hash.update(chunk)
+            digest = md5_hash.hexdigest()
+
+            os.replace(part_path, dest_path)
+            for suffix in (".json", ".acks"):
+                try:
+                    os.remove(self.parts_dir / f"{session['upload_id']}{suffix}")
+                except FileNotFoundError:
+                    pass
+        with self.lock:
+            self.sessions.pop(session["upload_id"], None)
+            if digest not in self.digests:
+                self.digests.add(digest)
+                with open(self.digests_path, "a") as f:
+                    f.write(f"{digest}\n")
+        return dest_path
+
+
+def main():
+    """Run the local upload server from the command line."""
+    parser = argparse.ArgumentParser(description="Local stand-in upload server")
+    parser.add_argument("--storage", default="received", help="Directory for completed uploads")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind")
+    parser.add_argument("--api-key", default=None, help="Require this bearer token")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--drop-chunk-every", type=int, default=0,
+                        help="Drop the connection on every Nth chunk (resume testing)")
+    args = parser.parse_args()
+
+    server = LocalUploadServer(args.storage, args.host, args.port, args.api_key,
+                               verbose=args.verbose, drop_chunk_every=args.drop_chunk_every)
+    server.start()
+    print(f"Upload server listening on {server.url} (storing in {server.storage_dir})")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1178 @@
+#!/usr/bin/env python3
+"""
+Workflow Steps for Automated Video Workflow
+
+The work behind each stage (scanning cards, importing, creating project
+folders, generating proxies, moving exports and uploading) as plain
+functions with no GUI dependencies. The tabs run them on their worker
+threads and the headless daemon runs them unattended. ingest_files()
+streams each imported file straight on to verification and proxying
+through a pipeline (see pipeline.py).
+
+Every step reports through the same three optional hooks:
+
+- job: a JobProgress from the progress bus, updated as work completes
+- log: a callable taking one human-readable message
+- is_cancelled: a callable returning True once the step should stop
+"""
+
+import os
+import re
+import errno
+import time
+import queue
+import shutil
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from bulk_io import IOSettings, SyncBatch, SourceReader, TargetFile, copy_data
+from copy_tuner import TunerSettings, start_tuner
+from disk_monitor import get_disk_monitor
+from hash_cache import get_hash_cache, hash_file
+from hash_service import StreamHasher
+from logger import log_event, new_job_id
+from metrics import get_metrics
+from pipeline import DEFAULT_QUEUE_SIZE, Pipeline
+from progress import get_progress_bus
+from tracing import annotate, job_span, traced
+
+# Used when the configuration does not list any
+VIDEO_EXTENSIONS = (".mp4", ".mov")
+
+# Directories and files skipped while scanning removable media
+SKIP_DIRS = {'.Trashes', '.fseventsd', '.Spotlight-V100', '$RECYCLE.BIN', 'System Volume Information'}
+SKIP_PREFIXES = ('._', '.DS_Store', 'Thumbs.db')
+
+# Cards keep clips a few levels deep; deeper trees are not camera media
+MAX_SCAN_DEPTH = 5
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Chunks queued for each destination of a multi-destination copy
+TARGET_BUFFER_CHUNKS = 16
+
+# Containers ffmpeg can decode from a pipe; MP4/QuickTime only with the index first
+STREAMABLE_EXTENSIONS = ('.mts', '.m2ts', '.ts', '.mpg', '.mpeg')
+MP4_EXTENSIONS = ('.mp4', '.mov', '.m4v')
+
+# Copy chunks queued for a streaming proxy encode before the copy waits for ffmpeg
+STREAM_BUFFER_CHUNKS = 32
+
+DEFAULT_FOLDERS = ('footage', 'proxies', 'exports', 'logs')
+
+
+def _log(log, message):
+    """Send a message to an optional log callable."""
+    if log is not None:
+        log(message)
+
+
+def _cancelled(is_cancelled):
+    """Whether an optional cancellation callable asks to stop."""
+    return is_cancelled is not None and is_cancelled()
+
+
+@traced()
+def scan_video_files(root, extensions=VIDEO_EXTENSIONS, max_depth=MAX_SCAN_DEPTH):
+    """
+    Find video files below a directory.
+
+    Hidden and system directories and files are skipped, as are
+    directories that cannot be read.
+
+    Args:
+        root (str): Directory to scan, e.g. the mount point of a card
+        extensions (iterable, optional): File extensions to match, with the dot
+        max_depth (int, optional): Deepest directory level to enter; None for no limit
+
+    Yields:
+        str: Path of each video file, as it is found
+    """
+    suffixes = tuple(ext.lower() for ext in extensions)
+    examined = 0
+
+    def scan(directory, depth):
+        nonlocal examined
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    examined += 1
+                    try:
+                        if entry.is_dir():
+                            name = entry.name
+                            if name.startswith('.') or name in SKIP_DIRS:
+                                continue
+                            if max_depth is None or depth < max_depth:
+                                yield from scan(entry.path, depth + 1)
+                        elif entry.is_file():
+                            name = entry.name
+                            if name.startswith(SKIP_PREFIXES):
+                                continue
+                            if name.lower().endswith(suffixes):
+                                yield entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            # Skip directories we can't read
+            return
+
+    start_time = time.monotonic()
+    try:
+        yield from scan(root, 0)
+    finally:
+        metrics = get_metrics()
+        metrics.scan_files.inc(examined)
+        metrics.scan_duration.observe(time.monotonic() - start_time)
+
+
+def cache_copy_digest(source, source_stat, digests, log=None):
+    """
+    Store the digests of a copied file's source in the shared hash cache.
+
+    The copies are cached by verify_copy once their own data has been
+    checked; until then a copy may not hold what was read.
+
+    Args:
+        source (str): Copied file
+        source_stat (os.stat_result): Stat of the source taken before reading it
+        digests (dict): Algorithm name to hex digest
+        log (callable, optional): Receives a message if caching fails
+    """
+    try:
+        # Skip the source if it changed while being read
+        get_hash_cache().put_if_unchanged(source, digests, source_stat)
+    except Exception as e:
+        _log(log, f"Could not cache digest for {os.path.basename(source)}: {e}")
+
+
+class TargetWriter:
+    """
+    Writes one copy of a file on its own thread.
+
+    Up to TARGET_BUFFER_CHUNKS chunks wait for a slow target before
+    write() blocks, so one slow drive holds the read back without
+    stalling the other targets until its buffer is full.
+    """
+
+    def __init__(self, path, io, size=None, sync=None, buffer_chunks=TARGET_BUFFER_CHUNKS):
+        """
+        Open the target file and start writing.
+
+        Args:
+            path (str): File to write
+            io (IOSettings): I/O mode and durability
+            size (int, optional): Expected final size, for preallocation
+            sync (SyncBatch, optional): Batch for "batch" durability
+            buffer_chunks (int, optional): Chunks queued before write() blocks
+        """
+        self.path = path
+        self.error = None
+        self.aborted = False
+        self.file = TargetFile(path, io, size, sync)
+        self.chunks = queue.Queue(maxsize=buffer_chunks)
+        self.thread = threading.Thread(target=self._write, name="copy-target", daemon=True)
+        self.thread.start()
+
+    def write(self, chunk):
+        """Queue the next chunk."""
+        self.chunks.put(chunk)
+
+    def _write(self):
+        """Write queued chunks until close(); after an error or abort, keep draining."""
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                break
+            if self.error is None and not self.aborted:
+                try:
+                    self.file.write(chunk)
+                except OSError as e:
+                    self.error = e
+        try:
+            if self.error is None and not self.aborted:
+                self.file.close()
+            else:
+                self.file.abort()
+        except OSError as e:
+            self.error = self.error or e
+
+    def close(self):
+        """Write out the remaining chunks and close the file."""
+        self.chunks.put(None)
+        self.thread.join()
+
+    def abort(self):
+        """Stop writing and discard the partial file."""
+        self.aborted = True
+        self.chunks.put(None)
+        self.thread.join()
+
+
+@traced()
+def copy_file(source, destination, job=None, job_id=None, log=None, chunk_size=COPY_CHUNK_SIZE, tee=None,
+              io=None, sync=None, record=None):
+    """
+    Copy a file, hashing it on the way so later stages never re-read it.
+
+    With several destinations the source is still read once; each block
+    is handed to a TargetWriter per destination.
+
+    Args:
+        source (str): File to copy
+        destination (str or list): Path of the copy, or paths of several copies
+        job (JobProgress, optional): Receives the copied bytes
+        job_id (str, optional): Job id used in log records
+        log (callable, optional): Receives messages
+        chunk_size (int, optional): Bytes read at a time
+        tee (callable, optional): Also receives each chunk read, e.g. StreamingProxy.write
+        io (IOSettings, optional): Page cache, preallocation and durability
+                                   settings; defaults to plain cached I/O
+        sync (SyncBatch, optional): Batch for "batch" durability
+        record (callable, optional): Receives the size of each chunk copied,
+                                     e.g. CopyTuner.record
+
+    Returns:
+        dict: Algorithm name to hex digest of the copied data
+
+    Raises:
+        OSError: If reading the source or writing any copy fails
+    """
+    destinations = [destination] if isinstance(destination, str) else list(destination)
+    io = io or IOSettings()
+    source_stat = os.stat(source)
+    start_time = time.monotonic()
+
+    # Hash on a worker thread while copying
+    hasher = StreamHasher(("md5",), background=True)
+
+    def pump(src, write):
+        copied = 0
+        while True:
+            chunk = src.read()
+            if not chunk:
+                break
+
+            write(chunk)
+            hasher.update(chunk)
+            if tee is not None:
+                tee(chunk)
+            copied += len(chunk)
+            if job is not None:
+                job.advance(0, len(chunk))
+            if record is not None:
+                record(len(chunk))
+        return copied
+
+    with SourceReader(source, io, chunk_size) as src:
+        if len(destinations) == 1:
+            dst = TargetFile(destinations[0], io, source_stat.st_size, sync)
+            try:
+                copied = pump(src, dst.write)
+            except BaseException:
+                dst.abort()
+                raise
+            dst.close()
+        else:
+            writers = []
+            try:
+                for path in destinations:
+                    writers.append(TargetWriter(path, io, source_stat.st_size, sync))
+
+                def write(chunk):
+                    for writer in writers:
+                        # Stop reading the source as soon as any copy fails
+                        if writer.error is not None:
+                            raise OSError(f"Writing {writer.path} failed: {writer.error}")
+                        writer.write(chunk)
+
+                copied = pump(src, write)
+            except BaseException:
+                for writer in writers:
+                    writer.abort()
+                raise
+            for writer in writers:
+                writer.close()
+            for writer in writers:
+                if writer.error is not None:
+                    raise OSError(f"Writing {writer.path} failed: {writer.error}")
+
+    elapsed = time.monotonic() - start_time
+    get_metrics().record_copy(copied, elapsed)
+    copies = f" to {len(destinations)} destinations" if len(destinations) > 1 else ""
+    log_event("import", f"Copied {os.path.basename(source)}{copies}", job_id=job_id,
+              file=source, bytes=copied, duration_ms=round(elapsed * 1000, 1))
+
+    annotate(file=source, bytes=copied, destinations=len(destinations))
+
+    # Record the source's digest in the shared hash cache
+    digests = hasher.hexdigests()
+    cache_copy_digest(source, source_stat, digests, log)
+    return digests
+
+
+class VerificationError(Exception):
+    """A copy's digest does not match the digest of the data read from the source."""
+
+
+class IngestFile:
+    """A file moving through the ingest pipeline."""
+
+    def __init__(self, source):
+        """
+        Args:
+            source (str): File on the card
+        """
+        self.source = source
+        self.size = os.path.getsize(source)
+        self.copy = None
+        self.backups = []
+        self.digests = None
+        self.verified = False
+        self.proxy = None
+        self.stream = None
+        self.error = None
+
+
+@traced()
+def verify_copy(path, digests, log=None):
+    """
+    Re-read a copy and compare it with the digests taken while copying.
+
+    A copy that matches has its digests stored in the shared hash cache,
+    so later duplicate checks need not read it again.
+
+    Args:
+        path (str): The copy
+        digests (dict): Algorithm name to expected hex digest
+        log (callable, optional): Receives a message if caching fails
+
+    Raises:
+        VerificationError: If any digest differs
+    """
+    annotate(file=path)
+    copy_stat = os.stat(path)
+    start_time = time.monotonic()
+    actual = hash_file(path, tuple(digests))
+    get_metrics().record_hash("verify", copy_stat.st_size, time.monotonic() - start_time)
+    for algorithm, expected in digests.items():
+        if actual[algorithm] != expected:
+            raise VerificationError(f"{algorithm} mismatch for {path}: expected {expected}, got {actual[algorithm]}")
+
+    try:
+        get_hash_cache().put_if_unchanged(path, actual, copy_stat)
+    except Exception as e:
+        _log(log, f"Could not cache digest for {path}: {e}")
+
+
+def backup_dirs(config, destination, base_dir):
+    """
+    Directories mirroring a destination under each configured backup root.
+
+    Args:
+        config (Mapping): Configuration snapshot; backup_paths lists the roots
+        destination (str): Primary destination directory
+        base_dir (str): Root of the primary storage that destination lies under
+
+    Returns:
+        list: One directory per backup root, e.g. <backup>/<date>/<project>/footage
+    """
+    relative = os.path.relpath(destination, base_dir)
+    return [os.path.join(root, relative) for root in config.get('backup_paths') or ()]
+
+
+def ingest_options(config, proxy_dir=None):
+    """
+    Build ingest_files() options from the configuration.
+
+    Args:
+        config (Mapping): Configuration snapshot
+        proxy_dir (str, optional): Where proxies go when create_proxies is set
+
+    Returns:
+        dict: Keyword arguments for ingest_files()
+    """
+    settings = config.get('pipeline') or {}
+    return {
+        "verify": settings.get('verify_copies', True),
+        "proxy_dir": proxy_dir if config.get('create_proxies') else None,
+        "proxy_settings": config.get('proxy_settings') or {},
+        "proxy_workers": settings.get('proxy_workers', 1),
+        "stream_proxies": settings.get('stream_proxies', True),
+        "queue_size": settings.get('queue_size', DEFAULT_QUEUE_SIZE),
+        "io": IOSettings.from_config(config),
+        "tuning": TunerSettings.from_config(config)
+    }
+
+
+@traced()
+def ingest_files(files, destination, job, job_id=None, log=None, is_cancelled=None,
+                 skip_existing=False, verify=True, backups=(), proxy_dir=None, proxy_settings=None,
+                 proxy_workers=1, stream_proxies=True, queue_size=DEFAULT_QUEUE_SIZE, io=None, tuning=None):
+    """
+    Import files, streaming each one on to verification and proxying.
+
+    Each file is verified and proxied as soon as its copy is done, while
+    the next file is being copied. Bounded queues between the stages hold
+    copying back if encoding falls behind. A file that fails a stage is
+    logged and skips the later stages; the other files carry on.
+
+    Each file is also copied into every backups directory from the same
+    read, and every copy is verified.
+
+    With stream_proxies, a file whose container can be decoded from a
+    pipe (see streamable_source) is fed to ffmpeg while it is copied, so
+    the card is read once for both the copy and the proxy. Other files,
+    and streamed encodes that fail, are proxied from the copy instead.
+
+    Copies are read and written under io (see bulk_io). With "batch"
+    durability they are synced together as they accumulate and before
+    this returns, so a finished import is on disk.
+
+    With tuning enabled, the chunk size and the number of files copied at
+    once adapt to the card and destination (see copy_tuner), starting
+    from the profile saved the last time the card was used.
+
+    Args:
+        files (list): Files to import
+        destination (str): Directory receiving the copies; created if missing
+        job (JobProgress): Progress of the copies; finished on return
+        job_id (str, optional): Job id used in log records
+        log (callable, optional): Receives messages
+        is_cancelled (callable, optional): Returns True to stop the pipeline
+        skip_existing (bool, optional): Skip copying files already copied, judged by name
+                                        and size; with verify they are still checked
+        verify (bool, optional): Re-read each copy and compare digests
+        backups (list, optional): Further directories receiving a copy of each file
+        proxy_dir (str, optional): Directory receiving proxies; None for no proxies
+        proxy_settings (Mapping, optional): resolution, codec and crf for proxies
+        proxy_workers (int, optional): Proxies encoded from copies at the same time
+        stream_proxies (bool, optional): Encode proxies from the copy stream where possible
+        queue_size (int, optional): Files allowed to wait in front of each stage
+        io (IOSettings, optional): Page cache and durability settings for the copies
+        tuning (TunerSettings, optional): Copy tuner limits; None for fixed settings
+
+    Returns:
+        list: IngestFile for each file, in the order given
+    """
+    bus = get_progress_bus()
+    jobs = [job]
+    io = io or IOSettings()
+    sync = SyncBatch(io)
+
+    try:
+        items = [IngestFile(path) for path in files]
+        for directory in [destination] + list(backups):
+            os.makedirs(directory, exist_ok=True)
+        # Progress is measured in bytes so large clips move the bar smoothly
+        job.set_total(total=len(items), total_bytes=sum(item.size for item in items))
+
+        tuner = None
+        if tuning is not None and tuning.enabled and items:
+            try:
+                sample = max(items, key=lambda item: item.size).source
+                tuner = start_tuner(sample, destination, tuning, log=log)
+            except OSError as e:
+                _log(log, f"Copy tuning unavailable, using fixed settings: {e}")
+
+        def copy(item):
+            file_name = os.path.basename(item.source)
+            dest_path = os.path.join(destination, file_name)
+            backup_paths = [os.path.join(directory, file_name) for directory in backups]
+            if skip_existing and all(os.path.isfile(path) and os.path.getsize(path) == item.size
+                                     for path in [dest_path] + backup_paths):
+                _log(log, f"Already imported {file_name}")
+                job.advance(1, item.size)
+                item.copy = dest_path
+                item.backups = backup_paths
+                return item
+
+            _log(log, f"Copying {file_name}...")
+            job.set_current(f"Copying: {file_name}")
+            if stream_proxies and proxy_dir is not None and streamable_source(item.source):
+                try:
+                    item.stream = StreamingProxy(
+                        proxy_path(item.source, proxy_dir), *proxy_arguments(proxy_settings)
+                    )
+                except OSError as e:
+                    _log(log, f"Could not start streaming proxy for {file_name}: {e}")
+
+            tee = item.stream.write if item.stream is not None else None
+            if tuner is None:
+                item.digests = copy_file(item.source, [dest_path] + backup_paths, job, job_id, log,
+                                         tee=tee, io=io, sync=sync)
+            else:
+                with tuner.slot():
+                    item.digests = copy_file(item.source, [dest_path] + backup_paths, job, job_id, log,
+                                             chunk_size=tuner.chunk_size, tee=tee, io=io, sync=sync,
+                                             record=tuner.record)
+            job.advance()
+            item.copy = dest_path
+            item.backups = backup_paths
+            return item
+
+        def on_error(stage, item, e):
+            item.error = f"{stage}: {e}"
+            if item.stream is not None:
+                item.stream.abort()
+                item.stream = None
+            _log(log, f"Error in {stage} of {os.path.basename(item.source)}: {e}")
+
+        pipeline = Pipeline(is_cancelled=is_cancelled, on_error=on_error, job_id=job_id)
+        # The tuner decides how many of the import workers copy at once
+        import_workers = tuning.max_workers if tuner is not None else 1
+        pipeline.add_stage("import", copy, workers=import_workers, queue_size=queue_size)
+        last = "import"
+
+        if verify:
+            verify_job = bus.start("verify", stage="import", job_id=job_id, total=len(items))
+            jobs.append(verify_job)
+
+            def check(item):
+                # A file skipped as already imported is checked against the
+                # card too; matching sizes don't prove an earlier copy finished
+                if not item.digests:
+                    item.digests = get_hash_cache().get_or_compute(item.source, ("md5",))
+                verify_job.set_current(f"Verifying: {os.path.basename(item.copy)}")
+                for path in [item.copy] + item.backups:
+                    verify_copy(path, item.digests, log)
+                    verify_job.advance(0, item.size)
+                item.verified = True
+                verify_job.advance()
+                return item
+
+            verify_job.set_total(total_bytes=sum(item.size for item in items) * (1 + len(backups)))
+            pipeline.add_stage("verify", check, after=last, queue_size=queue_size)
+            last = "verify"
+
+        if proxy_dir is not None:
+            os.makedirs(proxy_dir, exist_ok=True)
+            proxy_settings = proxy_settings or {}
+            proxy_job_id = new_job_id("proxy")
+            proxy_job = bus.start("proxy", job_id=proxy_job_id, total=len(items))
+            jobs.append(proxy_job)
+
+            def encode(item):
+                file_name = os.path.basename(item.copy)
+                dest_path = proxy_path(item.copy, proxy_dir)
+
+                if item.stream is not None:
+                    stream, item.stream = item.stream, None
+                    proxy_job.set_current(f"Finishing: {file_name}")
+                    if stream.close():
+                        log_event("proxy", f"Converted {file_name} while importing", job_id=proxy_job_id,
+                                  file=item.source, bytes=item.size,
+                                  duration_ms=round(stream.elapsed * 1000, 1))
+                        _log(log, f"Successfully converted {file_name} from the copy stream")
+                        item.proxy = stream.destination
+                        proxy_job.advance()
+                        return item
+                    _log(log, f"Streaming proxy of {file_name} failed, converting from the copy: {stream.error}")
+
+                _log(log, f"Converting {file_name}...")
+                proxy_job.set_current(f"Converting: {file_name}")
+
+                start_time = time.monotonic()
+                if convert_proxy(item.copy, dest_path, *proxy_arguments(proxy_settings), log=log):
+                    log_event("proxy", f"Converted {file_name}", job_id=proxy_job_id, file=item.copy,
+                              bytes=item.size, duration_ms=round((time.monotonic() - start_time) * 1000, 1))
+                    _log(log, f"Successfully converted {file_name}")
+                    item.proxy = dest_path
+                else:
+                    _log(log, f"Failed to convert {file_name}")
+                proxy_job.advance()
+                return item
+
+            pipeline.add_stage("proxy", encode, after=last, workers=proxy_workers, queue_size=queue_size)
+
+        # Sample the card and every destination so a slow device shows up
+        devices = {os.path.dirname(item.source) for item in items}
+        devices.update([destination, proxy_dir, *backups])
+        try:
+            with get_disk_monitor().track(devices), get_metrics().watch_pipeline(pipeline), \
+                    job_span("import", job_id):
+                result = pipeline.run(items)
+        finally:
+            # Streams left open by cancellation
+            for item in items:
+                if item.stream is not None:
+                    item.stream.abort()
+                    item.stream = None
+            sync.flush()
+        if tuner is not None and not result.cancelled:
+            tuner.finish()
+        if result.cancelled:
+            _log(log, "Import cancelled")
+        _log(log, f"Ingest summary: {result.summary()}")
+
+        error = f"{len(result.errors)} files failed" if result.errors else None
+        for stage_job in jobs:
+            stage_job.finish(error)
+        return items
+    except Exception as e:
+        for stage_job in jobs:
+            stage_job.finish(str(e))
+        raise
+
+
+@traced()
+def create_project_structure(base_dir, date_str, project_name, folders=DEFAULT_FOLDERS,
+                             template_path=None, log=None, is_cancelled=None):
+    """
+    Create a dated project directory with its subfolders.
+
+    Args:
+        base_dir (str): Root of the RAW storage
+        date_str (str): Date folder name, e.g. "2024-05-01"
+        project_name (str): Project folder name
+        folders (iterable, optional): Subfolders to create
+        template_path (str, optional): DaVinci template copied into the project
+        log (callable, optional): Receives messages
+        is_cancelled (callable, optional): Returns True to stop creating folders
+
+    Returns:
+        str: The project directory, or None if cancelled
+    """
+    project_dir = os.path.join(base_dir, date_str, project_name)
+    os.makedirs(project_dir, exist_ok=True)
+    _log(log, f"Created project directory: {project_dir}")
+
+    for folder in folders:
+        if _cancelled(is_cancelled):
+            _log(log, "Folder creation cancelled")
+            return None
+
+        folder_path = os.path.join(project_dir, folder)
+        os.makedirs(folder_path, exist_ok=True)
+        _log(log, f"Created folder: {folder_path}")
+
+    if template_path is not None:
+        try:
+            if template_path and Path(template_path).is_file():
+                template_file = Path(template_path)
+                dest_path = Path(project_dir) / template_file.name
+                shutil.copy2(template_file, dest_path)
+                _log(log, f"Copied DaVinci template to: {dest_path}")
+            else:
+                _log(log, "DaVinci template not found or not configured")
+        except Exception as e:
+            _log(log, f"Error copying DaVinci template: {e}")
+
+    return project_dir
+
+
+def proxy_path(source, dest_dir):
+    """Path of the proxy generated for a source file."""
+    base_name, _ = os.path.splitext(os.path.basename(source))
+    return os.path.join(dest_dir, f"{base_name}_proxy.mp4")
+
+
+def build_proxy_command(source, destination, resolution, codec, crf):
+    """
+    Build the ffmpeg command line that encodes a proxy.
+
+    Args:
+        source (str): Source clip
+        destination (str): Proxy file to write
+        resolution (str): Output size, e.g. "1280x720"
+        codec (str): Video codec, e.g. "h264"
+        crf (int): Constant rate factor
+
+    Returns:
+        list: ffmpeg arguments
+    """
+    return [
+        "ffmpeg",
+        "-i", source,
+        "-vf", f"scale={resolution}",
+        "-c:v", codec,
+        "-crf", str(crf),
+        "-preset", "fast",
+        "-c:a", "aac",
+        "-b:a", "128k",
+        "-y",  # Overwrite output files
+        destination
+    ]
+
+
+@traced()
+def convert_proxy(source, destination, resolution, codec, crf, log=None):
+    """
+    Encode a proxy with ffmpeg.
+
+    Args:
+        source (str): Source clip
+        destination (str): Proxy file to write
+        resolution (str): Output size, e.g. "1280x720"
+        codec (str): Video codec, e.g. "h264"
+        crf (int): Constant rate factor
+        log (callable, optional): Receives ffmpeg's error output on failure
+
+    Returns:
+        bool: True if the proxy was written
+    """
+    annotate(file=source)
+    start_time = time.monotonic()
+    try:
+        process = subprocess.run(
+            build_proxy_command(source, destination, resolution, codec, crf),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+        if process.returncode != 0:
+            _log(log, f"ffmpeg error: {process.stderr}")
+            get_metrics().record_proxy(False)
+            return False
+        get_metrics().record_proxy(True, encoded_frames(process.stderr), time.monotonic() - start_time)
+        return True
+    except Exception as e:
+        _log(log, f"Error converting file {source}: {e}")
+        get_metrics().record_proxy(False)
+        return False
+
+
+def encoded_frames(output):
+    """
+    Number of frames ffmpeg reports having encoded.
+
+    Args:
+        output (str): ffmpeg's error output, with its progress lines
+
+    Returns:
+        int: The last frame count reported, or None if there is none
+    """
+    counts = re.findall(r"frame=\s*(\d+)", output)
+    return int(counts[-1]) if counts else None
+
+
+def proxy_arguments(proxy_settings):
+    """(resolution, codec, crf) from proxy settings, with defaults."""
+    proxy_settings = proxy_settings or {}
+    return (proxy_settings.get('resolution', '1280x720'), proxy_settings.get('codec', 'h264'),
+            proxy_settings.get('crf', 23))
+
+
+def mp4_index_first(path):
+    """
+    Whether an MP4/QuickTime file has its index (moov) before its media (mdat).
+
+    ffmpeg can only decode such files from a pipe; cameras usually write
+    the index last.
+
+    Args:
+        path (str): File to inspect
+
+    Returns:
+        bool: True if moov comes before mdat
+    """
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        offset = 0
+        while offset + 8 <= file_size:
+            f.seek(offset)
+            header = f.read(16)
+            size = int.from_bytes(header[:4], 'big')
+            atom = header[4:8]
+            if atom == b'moov':
+                return True
+            if atom == b'mdat':
+                return False
+            if size == 1:
+                # 64-bit size follows the type
+                size = int.from_bytes(header[8:16], 'big')
+            elif size == 0:
+                # Atom runs to the end of the file
+                break
+            if size < 8:
+                break
+            offset += size
+    return False
+
+
+def streamable_source(path):
+    """
+    Whether ffmpeg can encode a file from its bytes in order, without seeking.
+
+    Args:
+        path (str): Source clip
+
+    Returns:
+        bool: True for transport streams and for MP4/QuickTime with the index first
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in STREAMABLE_EXTENSIONS:
+        return True
+    if ext in MP4_EXTENSIONS:
+        try:
+            return mp4_index_first(path)
+        except OSError:
+            return False
+    return False
+
+
+class StreamingProxy:
+    """
+    An ffmpeg proxy encode fed with the bytes of a copy in progress.
+
+    Chunks are queued to a feeder thread, so the copy only waits on ffmpeg
+    once STREAM_BUFFER_CHUNKS are pending. If ffmpeg stops reading, the
+    remaining chunks are dropped and close() reports failure; the copy is
+    never affected.
+    """
+
+    def __init__(self, destination, resolution, codec, crf, buffer_chunks=STREAM_BUFFER_CHUNKS):
+        """
+        Start ffmpeg.
+
+        Args:
+            destination (str): Proxy file to write
+            resolution (str): Output size, e.g. "1280x720"
+            codec (str): Video codec
+            crf (int): Constant rate factor
+            buffer_chunks (int, optional): Chunks queued before write() blocks
+
+        Raises:
+            OSError: If ffmpeg cannot be started
+        """
+        self.destination = destination
+        self.error = None
+        self.failed = False
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+        # A file rather than a pipe, so ffmpeg can never block on a full stderr
+        self.stderr = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            build_proxy_command("pipe:0", destination, resolution, codec, crf),
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self.stderr
+        )
+        self.chunks = queue.Queue(maxsize=buffer_chunks)
+        self.thread = threading.Thread(target=self._feed, name="proxy-stream", daemon=True)
+        self.thread.start()
+
+    def write(self, chunk):
+        """Queue the next chunk of the source for ffmpeg."""
+        if not self.failed:
+            self.chunks.put(chunk)
+
+    def _feed(self):
+        """Write queued chunks to ffmpeg's stdin until close()."""
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                break
+            if self.failed:
+                continue
+            try:
+                self.process.stdin.write(chunk)
+            except OSError:
+                # ffmpeg exited early; keep draining so write() never blocks
+                self.failed = True
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+
+    @traced()
+    def close(self):
+        """
+        Signal the end of the source and wait for ffmpeg to finish.
+
+        Returns:
+            bool: True if the proxy was written
+        """
+        self.chunks.put(None)
+        self.thread.join()
+        returncode = self.process.wait()
+        self.elapsed = time.monotonic() - self.started
+        self.stderr.seek(0)
+        output = self.stderr.read().decode('utf-8', 'replace').strip()
+        self.stderr.close()
+        if returncode != 0 or self.failed:
+            self.error = output.splitlines()[-1] if output else f"ffmpeg exited with status {returncode}"
+            self.failed = True
+        get_metrics().record_proxy(not self.failed, encoded_frames(output), self.elapsed)
+        return not self.failed
+
+    def abort(self):
+        """Stop ffmpeg and discard the partial proxy."""
+        self.failed = True
+        self.process.kill()
+        self.chunks.put(None)
+        self.thread.join()
+        self.process.wait()
+        self.stderr.close()
+        try:
+            os.remove(self.destination)
+        except OSError:
+            pass
+
+
+@traced()
+def generate_proxies(files, dest_dir, resolution, codec, crf, job, job_id=None, log=None, is_cancelled=None):
+    """
+    Encode a proxy for each file.
+
+    Args:
+        files (list): Source clips
+        dest_dir (str): Directory receiving the proxies; created if missing
+        resolution (str): Output size, e.g. "1280x720"
+        codec (str): Video codec
+        crf (int): Constant rate factor
+        job (JobProgress): Progress of the run; finished on return
+        job_id (str, optional): Job id used in log records
+        log (callable, optional): Receives messages
+        is_cancelled (callable, optional): Returns True to stop after the current file
+
+    Returns:
+        list: Paths of the proxies written
+    """
+    proxies = []
+    try:
+        os.makedirs(dest_dir, exist_ok=True)
+        job.set_total(total=len(files))
+
+        with get_disk_monitor().track({os.path.dirname(path) for path in files} | {dest_dir}):
+            for file_path in files:
+                if _cancelled(is_cancelled):
+                    _log(log, "Proxy generation cancelled")
+                    break
+
+                file_name = os.path.basename(file_path)
+                dest_path = proxy_path(file_path, dest_dir)
+
+                _log(log, f"Converting {file_name}...")
+                job.set_current(f"Converting: {file_name}")
+
+                start_time = time.monotonic()
+                if convert_proxy(file_path, dest_path, resolution, codec, crf, log):
+                    log_event("proxy", f"Converted {file_name}", job_id=job_id, file=file_path,
+                              bytes=os.path.getsize(file_path),
+                              duration_ms=round((time.monotonic() - start_time) * 1000, 1))
+                    _log(log, f"Successfully converted {file_name}")
+                    proxies.append(dest_path)
+                else:
+                    _log(log, f"Failed to convert {file_name}")
+
+                job.advance()
+
+        job.finish()
+        return proxies
+    except Exception as e:
+        job.finish(str(e))
+        raise
+
+
+def list_files(directory):
+    """Set of the regular files directly inside a directory."""
+    with os.scandir(directory) as entries:
+        return {entry.path for entry in entries if entry.is_file()}
+
+
+def export_destination(file_name, dest_dir, dated_folders=True, rename=True, now=None):
+    """
+    Choose where an export is filed, creating the dated folder if needed.
+
+    Args:
+        file_name (str): Name of the exported file
+        dest_dir (str): Root of the master storage
+        dated_folders (bool, optional): File under a folder named after the date
+        rename (bool, optional): Add a timestamp to the file name
+        now (datetime, optional): Time used for the date and timestamp
+
+    Returns:
+        str: Destination path
+    """
+    now = now or datetime.now()
+    if dated_folders:
+        dest_folder = os.path.join(dest_dir, now.strftime("%Y-%m-%d"))
+        os.makedirs(dest_folder, exist_ok=True)
+    else:
+        dest_folder = dest_dir
+
+    if rename:
+        base_name, ext = os.path.splitext(file_name)
+        file_name = f"{base_name}_{now.strftime('%Y%m%d_%H%M%S')}{ext}"
+
+    return os.path.join(dest_folder, file_name)
+
+
+@traced()
+def move_export(source_path, dest_dir, dated_folders=True, rename=True, job_id=None, log=None, io=None):
+    """
+    Move an exported file into master storage.
+
+    A move within one filesystem is a rename. Across filesystems the file
+    is copied under io (see bulk_io), so a large export neither floods
+    the page cache nor lands fragmented, and the original is removed once
+    the copy is complete.
+
+    Args:
+        source_path (str): Exported file
+        dest_dir (str): Root of the master storage
+        dated_folders (bool, optional): File under a folder named after the date
+        rename (bool, optional): Add a timestamp to the file name
+        job_id (str, optional): Job id used in log records
+        log (callable, optional): Receives messages
+        io (IOSettings, optional): Page cache and durability settings for
+                                   copies across filesystems
+
+    Returns:
+        str: Path the file was moved to
+    """
+    file_name = os.path.basename(source_path)
+    dest_path = export_destination(file_name, dest_dir, dated_folders, rename)
+
+    source_stat = os.stat(source_path)
+    start_time = time.monotonic()
+    try:
+        os.rename(source_path, dest_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        try:
+            with get_disk_monitor().track([source_path, os.path.dirname(dest_path)]):
+                copy_data(source_path, dest_path, io or IOSettings())
+            shutil.copystat(source_path, dest_path)
+        except BaseException:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            raise
+        os.remove(source_path)
+    # Pickup latency runs from the export's last write to the end of the move
+    annotate(file=dest_path, bytes=source_stat.st_size)
+    get_metrics().record_export(source_stat.st_size, time.time() - source_stat.st_mtime)
+    log_event("export", f"Moved {file_name}", job_id=job_id, file=dest_path,
+              bytes=source_stat.st_size, duration_ms=round((time.monotonic() - start_time) * 1000, 1))
+
+    # A move across devices creates a new inode; carry cached digests over
+    if os.stat(dest_path).st_ino != source_stat.st_ino:
+        try:
+            get_hash_cache().copy_entries(source_stat, dest_path)
+        except Exception as e:
+            _log(log, f"Could not carry over cached digest: {e}")
+
+    return dest_path
+
+
+@traced()
+def upload_files(files, api_endpoint, api_key, config, job, job_id=None, log=None,
+                 avoid_duplicates=True, cancel_event=None):
+    """
+    Upload files, skipping ones the server already has.
+
+    Args:
+        files (list): Files to upload
+        api_endpoint (str): Upload endpoint URL
+        api_key (str): API key
+        config (Mapping): Configuration snapshot
+        job (JobProgress): Progress of the upload; finished on return
+        job_id (str, optional): Job id used in log records
+        log (callable, optional): Receives messages
+        avoid_duplicates (bool, optional): Check digests against the server first
+        cancel_event (threading.Event, optional): Set to stop uploading
+
+    Returns:
+        list: UploadResult for each file attempted
+    """
+    # Imported here so the other steps don't load the HTTP stack
+    import logging
+
+    from config_manager import get_state_dir
+    from duplicate_checker import DuplicateChecker, get_known_digests
+    from hash_service import get_hash_service
+    from upload_engine import UploadEngine
+
+    results = []
+    try:
+        total_files = len(files)
+        to_upload = list(files)
+        job.set_total(total=total_files)
+
+        # One engine per run; its connection pool is shared with the duplicate checker
+        engine = UploadEngine.from_config(
+            api_key, config, logger=logging.getLogger("video_workflow.upload"),
+            state_dir=get_state_dir(config, 'uploads')
+        )
+        checker = DuplicateChecker(
+            engine.get_pool(api_endpoint), api_key, known_store=get_known_digests(config),
+            retry=engine.with_retries, logger=engine.logger
+        )
+        file_hashes = {}
+        _log(log, f"Upload bandwidth: {engine.bandwidth.describe()}")
+
+        try:
+            if avoid_duplicates:
+                # Hash all files in parallel up front; cached digests need no reads
+                _log(log, f"Hashing {total_files} files...")
+                job.set_current(f"Hashing {total_files} files...")
+                hashed = get_hash_service(config).hash_files(
+                    files, ("md5",), cache=get_hash_cache(config), purpose="upload"
+                )
+                file_hashes = {path: digests["md5"] for path, digests in hashed.items() if digests}
+
+                if cancel_event is not None and cancel_event.is_set():
+                    _log(log, "Upload cancelled")
+                    job.finish()
+                    return results
+
+                # Resolve every file in one batch instead of one request per file
+                duplicates = checker.check_many(file_hashes.values())
+                _log(log, f"Duplicate check: {checker.summary()}")
+
+                to_upload = []
+                for file_path in files:
+                    if duplicates.get(file_hashes.get(file_path)):
+                        _log(log, f"Skipping duplicate file: {os.path.basename(file_path)}")
+                        job.advance()
+                    else:
+                        to_upload.append(file_path)
+
+            # Upload remaining files concurrently, resuming interrupted sessions
+            progress_lock = threading.Lock()
+            job.set_total(total_bytes=sum(os.path.getsize(path) for path in to_upload))
+
+            def on_chunk_sent(file_path, bytes_sent, file_size):
+                # A plain store of the file's running total; an out-of-order
+                # report from another chunk thread only lags until the next one
+                job.set_item_bytes(file_path, bytes_sent)
+
+            def on_file_done(result):
+                file_name = os.path.basename(result.file_path)
+                if result.success:
+                    checker.record_uploaded(file_hashes.get(result.file_path), file_name)
+                    log_event("upload", f"Uploaded {file_name}", job_id=job_id,
+                              file=result.file_path, bytes=result.size - result.resumed_bytes,
+                              duration_ms=round(result.elapsed * 1000, 1))
+                    resumed = " (resumed)" if result.resumed_bytes else ""
+                    _log(log, f"Successfully uploaded {file_name}{resumed} "
+                              f"({result.throughput / (1024 * 1024):.1f} MB/s)")
+                    job.set_item_bytes(result.file_path, result.size)
+                else:
+                    _log(log, f"Failed to upload {file_name}: {result.error}")
+
+                with progress_lock:
+                    results.append(result)
+                    job.advance()
+
+            job.set_current(f"Uploading {len(to_upload)} files...")
+            engine.upload_files(
+                to_upload, api_endpoint,
+                progress_callback=on_chunk_sent,
+                file_callback=on_file_done,
+                cancel_event=cancel_event
+            )
+            _log(log, f"Upload summary: {engine.stats.summary()}")
+        finally:
+            engine.close()
+
+        if cancel_event is not None and cancel_event.is_set():
+            _log(log, "Upload cancelled")
+
+        job.finish()
+        return results
+    except Exception as e:
+        job.finish(str(e))
+        raise
@@ -0,0 +1,40 @@
+"""Tests for upload bandwidth scheduling."""
+
+import threading
+
+import bandwidth
+from bandwidth import BandwidthScheduler, MBIT, get_bandwidth_scheduler
+
+
+def config(limit_mbit, schedule=()):
+    return {"upload": {"bandwidth": {"limit_mbit": limit_mbit, "schedule": list(schedule)}}}
+
+
+def test_shared_scheduler_follows_config_edits(monkeypatch):
+    monkeypatch.setattr(bandwidth, "_shared_scheduler", None)
+
+    scheduler = get_bandwidth_scheduler(config(100))
+    assert scheduler.global_bucket.rate == 100 * MBIT
+
+    # A later caller with an edited config changes the same scheduler
+    assert get_bandwidth_scheduler(config(40)) is scheduler
+    assert scheduler.global_bucket.rate == 40 * MBIT
+
+    # Callers without a config leave the settings alone
+    get_bandwidth_scheduler()
+    assert scheduler.global_bucket.rate == 40 * MBIT
+
+
+def test_zero_rate_pauses_until_resumed():
+    scheduler = BandwidthScheduler({"limit_mbit": 100})
+    scheduler.set_override(0)
+    assert scheduler.describe().startswith("paused")
+
+    sent = threading.Event()
+    thread = threading.Thread(target=lambda: (scheduler.throttle("http://host/upload", 1000), sent.set()),
+                              daemon=True)
+    thread.start()
+    assert not sent.wait(0.3)
+
+    scheduler.set_override(None)
+    assert sent.wait(5)
@@ -0,0 +1,48 @@
+"""Tests for the compressing rotating log handler."""
+
+import logging
+import threading
+
+from log_rotation import CompressingRotatingFileHandler, SegmentCompressor, backup_paths, open_log
+
+
+def write(handler, message):
+    handler.emit(logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None))
+
+
+def test_rollover_is_not_blocked_by_compression(tmp_path, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    compress = SegmentCompressor._compress
+
+    def slow_compress(self, src, destination):
+        started.set()
+        assert release.wait(10)
+        compress(self, src, destination)
+
+    monkeypatch.setattr(SegmentCompressor, "_compress", slow_compress)
+    path = tmp_path / "workflow.log"
+    handler = CompressingRotatingFileHandler(str(path), backup_count=5)
+    try:
+        write(handler, "first")
+        handler.doRollover()
+        assert started.wait(10)
+
+        # The first segment is still compressing; rolling over again must not wait for it
+        write(handler, "second")
+        rollover = threading.Thread(target=handler.doRollover)
+        rollover.start()
+        rollover.join(5)
+        assert not rollover.is_alive()
+    finally:
+        release.set()
+        handler.close()
+
+    # The first segment moved to .2 while compressing and was compressed in its new place
+    backups = backup_paths(path)
+    assert [(number, p.endswith(".gz")) for number, p in backups] == [(1, True), (2, True)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["workflow.log", "workflow.log.1.gz", "workflow.log.2.gz"]
+    with open_log(backups[1][1]) as f:
+        assert f.read() == b"first\n"
+    with open_log(backups[0][1]) as f:
+        assert f.read() == b"second\n"
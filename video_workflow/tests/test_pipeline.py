@@ -0,0 +1,80 @@
+"""Tests for the staged pipeline."""
+
+import threading
+
+from pipeline import Pipeline
+
+
+def run_with_timeout(pipeline, items, timeout=10):
+    """Run a pipeline on a thread, failing the test instead of hanging."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(pipeline.run(items)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline run did not finish"
+    return result[0]
+
+
+def test_items_pass_through_every_stage():
+    pipeline = Pipeline()
+    pipeline.add_stage("double", lambda item: item * 2)
+    pipeline.add_stage("increment", lambda item: item + 1, after="double", workers=2)
+
+    result = run_with_timeout(pipeline, range(20))
+
+    assert sorted(result.outputs["increment"]) == [item * 2 + 1 for item in range(20)]
+    assert result.success
+
+
+def test_failed_item_skips_later_stages():
+    def check(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item
+
+    pipeline = Pipeline()
+    pipeline.add_stage("check", check)
+    pipeline.add_stage("keep", lambda item: item, after="check")
+
+    result = run_with_timeout(pipeline, range(6))
+
+    assert sorted(result.outputs["keep"]) == [0, 1, 2, 4, 5]
+    assert [(stage, item) for stage, item, _ in result.errors] == [("check", 3)]
+
+
+def test_raising_error_handler_does_not_hang_the_run():
+    def fail(item):
+        raise RuntimeError("stage failed")
+
+    def on_error(stage, item, e):
+        raise RuntimeError("handler failed")
+
+    pipeline = Pipeline(on_error=on_error)
+    pipeline.add_stage("fail", fail, queue_size=1)
+    pipeline.add_stage("after", lambda item: item, after="fail", queue_size=1)
+
+    result = run_with_timeout(pipeline, range(10))
+
+    assert len(result.errors) == 10
+    assert result.outputs["after"] == []
+
+
+def test_dead_worker_does_not_hang_the_run(monkeypatch):
+    pipeline = Pipeline()
+    pipeline.add_stage("first", lambda item: item, queue_size=1)
+    pipeline.add_stage("second", lambda item: item, after="first", queue_size=1)
+
+    # Fail outside the stage function, as a bug in the worker loop would
+    calls = []
+
+    def cancel_requested():
+        calls.append(None)
+        if threading.current_thread().name.startswith("pipeline-first") and len(calls) > 3:
+            raise RuntimeError("worker bug")
+        return pipeline.cancelled
+
+    monkeypatch.setattr(pipeline, "_cancel_requested", cancel_requested)
+
+    result = run_with_timeout(pipeline, range(50))
+
+    assert result.cancelled
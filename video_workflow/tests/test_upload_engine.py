@@ -0,0 +1,116 @@
+"""Tests for the upload engine against the local stand-in server."""
+
+import os
+import hashlib
+
+import pytest
+
+import upload_engine
+from upload_engine import UploadEngine
+from upload_server import LocalUploadServer
+
+CHUNK_SIZE = 64 * 1024
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    """Retry at once instead of waiting out the backoff."""
+    monkeypatch.setattr(upload_engine.time, "sleep", lambda seconds: None)
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = LocalUploadServer(tmp_path / "received", api_key="secret").start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def source(tmp_path):
+    # Several chunks with a short last one
+    path = tmp_path / "clip.mov"
+    path.write_bytes(os.urandom(CHUNK_SIZE * 5 + 1234))
+    return path
+
+
+def make_engine(tmp_path, api_key="secret", **kwargs):
+    return UploadEngine(api_key, chunk_size=CHUNK_SIZE, state_dir=tmp_path / "state", **kwargs)
+
+
+def md5(path):
+    return hashlib.md5(path.read_bytes()).hexdigest()
+
+
+def test_multi_chunk_upload_arrives_intact(tmp_path, server, source):
+    engine = make_engine(tmp_path)
+    try:
+        result = engine.upload_file(str(source), server.url)
+    finally:
+        engine.close()
+
+    assert result.success, result.error
+    assert result.size == source.stat().st_size
+    assert (server.storage_dir / source.name).read_bytes() == source.read_bytes()
+
+
+def test_dropped_chunks_are_resent(tmp_path, source, no_backoff):
+    server = LocalUploadServer(tmp_path / "received", drop_chunk_every=2).start()
+    engine = make_engine(tmp_path, max_retries=5)
+    try:
+        result = engine.upload_file(str(source), server.url)
+    finally:
+        engine.close()
+        server.stop()
+
+    assert result.success, result.error
+    assert server.chunk_requests > 6
+    assert (server.storage_dir / source.name).read_bytes() == source.read_bytes()
+
+
+def test_rejected_upload_is_reported(tmp_path, server, source):
+    engine = make_engine(tmp_path, api_key="wrong")
+    try:
+        result = engine.upload_file(str(source), server.url)
+    finally:
+        engine.close()
+
+    assert not result.success
+    assert "Invalid API key" in result.error
+    assert not (server.storage_dir / source.name).exists()
+
+
+def test_interrupted_upload_resumes_from_acknowledged_chunks(tmp_path, source, monkeypatch):
+    storage = tmp_path / "received"
+
+    # One chunk at a time without retries: chunks 0 and 1 arrive, then every
+    # request is dropped, so the upload fails with two chunks acknowledged
+    server = LocalUploadServer(storage).start()
+    port = server.httpd.server_address[1]
+    requests = []
+
+    def drop_after_two():
+        requests.append(None)
+        return len(requests) > 2
+
+    monkeypatch.setattr(server, "should_drop_chunk", drop_after_two)
+    engine = make_engine(tmp_path, max_retries=0, max_chunks_per_file=1)
+    try:
+        first = engine.upload_file(str(source), server.url)
+    finally:
+        engine.close()
+        server.stop()
+    assert not first.success
+
+    # Both sides restart; the session is picked up from their persisted state
+    server = LocalUploadServer(storage, port=port).start()
+    engine = make_engine(tmp_path)
+    try:
+        second = engine.upload_file(str(source), server.url)
+    finally:
+        engine.close()
+        server.stop()
+
+    assert second.success, second.error
+    assert second.resumed_bytes == 2 * CHUNK_SIZE
+    assert engine.stats.bytes_sent == source.stat().st_size - 2 * CHUNK_SIZE
+    assert md5(storage / source.name) == md5(source)